@@ -4,7 +4,18 @@ A library for working with data from AWS APIs
 
 # flake8: noqa: F401
 
-from . import client, models, utils
+from typing import TYPE_CHECKING
+
+from .utils.imports import lazy_loader
+
+# Subpackages are imported on first access, so importing the package is cheap
+__getattr__, __dir__, __all__ = lazy_loader(
+    __name__, submodules=["client", "models", "utils"]
+)
+__all__ += ["get_version"]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from . import client, models, utils
 
 __VERSION__ = "0.1.0-beta2"
 
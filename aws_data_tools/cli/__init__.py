@@ -7,23 +7,39 @@ import json
 import os
 import re
 import traceback
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
 from botocore.exceptions import ClientError, NoCredentialsError
 
 import click
-import click_completion
-import click_completion.core
 
 from .. import get_version
-from ..client import APIClient
-from ..models.organizations import Account, OrganizationDataBuilder
+from ..models.checkpoint import CheckpointJournal
+from ..models.dot import iter_dot
+from ..models.export import (
+    TABLE_FORMATS,
+    iter_graphml,
+    iter_mermaid,
+    write_lines,
+    write_tables,
+)
+from ..models.organizations import (
+    DEFAULT_PHASE_PRIORITIES,
+    Account,
+    Organization,
+    OrganizationDataBuilder,
+)
+from ..models.policy_loader import PolicyContentStore
+from ..models.snapshot import MAGIC as SNAPSHOT_MAGIC
 
 from ..utils.dynamodb import (
     deserialize_dynamodb_items,
     prepare_dynamodb_batch_put_request,
 )
 
+if TYPE_CHECKING:
+    from ..client import APIClient, Cassette
+
 
 def custom_startswith(string, incomplete):
     """A custom completion matching that supports case insensitive matching"""
@@ -33,18 +49,22 @@ def custom_startswith(string, incomplete):
     return string.startswith(incomplete)
 
 
-click_completion.core.startswith = custom_startswith
-click_completion.init()
+def init_completion():
+    """
+    Patch click with click-completion's shell completion support and return the
+    click_completion.core module. Only done when needed, since it's slow to import.
+    """
+    import click_completion
+    import click_completion.core
 
-completion_cmd_help = """Shell completion for click-completion-command
-Available shell types:
-    \b
-      %s
-      Default type: auto
-      """ % "\n  ".join(
-    "{:<12} {}".format(k, click_completion.core.shells[k])
-    for k in sorted(click_completion.core.shells.keys())
-)
+    click_completion.core.startswith = custom_startswith
+    click_completion.init()
+    return click_completion.core
+
+
+# Shells set this variable when they request completions
+if "_AWSDATA_COMPLETE" in os.environ:
+    init_completion()
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
 
@@ -67,8 +87,9 @@ def cli(ctx, debug):
     help="Case insensitive completion",
 )
 @click.pass_context
-def completion(ctx, case_insensitive, help=completion_cmd_help):
+def completion(ctx, case_insensitive):
     """Commands for shell completion"""
+    init_completion()
     extra_env = (
         {"_CLICK_COMPLETION_COMMAND_CASE_INSENSITIVE_COMPLETE": "ON"}
         if case_insensitive
@@ -82,7 +103,7 @@ def completion(ctx, case_insensitive, help=completion_cmd_help):
 def bash(ctx):
     """Print BASH completion script for sourcing"""
     extra_env = ctx.obj["EXTRA_ENV"]
-    click.echo(click_completion.core.get_code("bash", extra_env=extra_env))
+    click.echo(init_completion().get_code("bash", extra_env=extra_env))
 
 
 @completion.command()
@@ -90,7 +111,7 @@ def bash(ctx):
 def zsh(ctx):
     """Print ZSH completion script for sourcing"""
     extra_env = ctx.obj["EXTRA_ENV"]
-    click.echo(click_completion.core.get_code("zsh", extra_env=extra_env))
+    click.echo(init_completion().get_code("zsh", extra_env=extra_env))
 
 
 @completion.command()
@@ -98,7 +119,7 @@ def zsh(ctx):
 def fish(ctx):
     """Print fish completion script for sourcing"""
     extra_env = ctx.obj["EXTRA_ENV"]
-    click.echo(click_completion.core.get_code("fish", extra_env=extra_env))
+    click.echo(init_completion().get_code("fish", extra_env=extra_env))
 
 
 @completion.command()
@@ -106,7 +127,7 @@ def fish(ctx):
 def powershell(ctx):
     """Print Powershell completion script for sourcing"""
     extra_env = ctx.obj["EXTRA_ENV"]
-    click.echo(click_completion.core.get_code("powershell", extra_env=extra_env))
+    click.echo(init_completion().get_code("powershell", extra_env=extra_env))
 
 
 @cli.group()
@@ -126,14 +147,54 @@ def handle_error(ctx, err_msg, tb=None):
         ctx.exit(1)
 
 
+def parse_priorities(priorities: tuple[str, ...]) -> dict[str, int]:
+    """Parse PHASE=N options into priorities of fetch phases"""
+    ret = {}
+    for priority in priorities:
+        name, _, value = priority.partition("=")
+        if name not in DEFAULT_PHASE_PRIORITIES or not value.lstrip("-").isdigit():
+            raise click.BadParameter(
+                f"{priority!r} isn't PHASE=N with a phase in "
+                f"{', '.join(DEFAULT_PHASE_PRIORITIES)}",
+                param_hint="--priority",
+            )
+        ret[name] = int(value)
+    return ret
+
+
+def organizations_client(
+    rate_limit: Optional[float], cassette: Optional["Cassette"], max_workers: int = 0
+) -> "APIClient":
+    """
+    Return an Organizations client with a rate limit and cassette, from a default
+    client pool with connections for `max_workers` requests at once
+    """
+    from ..client import APIClient, get_default_client_pool
+    from ..client.pool import DEFAULT_MAX_CONCURRENCY
+
+    return APIClient(
+        "organizations",
+        client_pool=get_default_client_pool(max(max_workers, DEFAULT_MAX_CONCURRENCY)),
+        rate_limit=rate_limit,
+        cassette=cassette,
+    )
+
+
 @organization.command(short_help="Dump org data as JSON")
 @click.option(
     "--format",
     "-f",
     "format_",
     default="JSON",
-    type=click.Choice(["DOT", "JSON", "YAML"], case_sensitive=False),
-    help="The output format for the data",
+    type=click.Choice(
+        ["CSV", "DOT", "GRAPHML", "JSON", "MERMAID", "NDJSON", "PARQUET", "YAML"],
+        case_sensitive=False,
+    ),
+    help=(
+        "The output format for the data. CSV and PARQUET write node and edge tables "
+        "to the --out-file directory. NDJSON streams the structure of the org as "
+        "soon as it's fetched, followed by updates as nodes are enriched."
+    ),
 )
 @click.option(
     "--no-accounts",
@@ -147,21 +208,126 @@ def handle_error(ctx, err_msg, tb=None):
     is_flag=True,
     help="Exclude policy data from the model",
 )
+@click.option(
+    "--dedupe-policies",
+    default=False,
+    is_flag=True,
+    help=(
+        "Write each policy document once to a table keyed by content hash, and "
+        "reference it from policies and effective policies (JSON and YAML only)"
+    ),
+)
+@click.option(
+    "--policy-cache",
+    type=click.Path(dir_okay=False),
+    help="Cache the content of AWS managed policies in a file to reuse between runs",
+)
+@click.option(
+    "--priority",
+    "priorities",
+    multiple=True,
+    metavar="PHASE=N",
+    help=(
+        "Set the priority of a fetch phase (lower first), e.g., account_tags=0 "
+        "(repeatable). With NDJSON, each phase waits for higher priorities."
+    ),
+)
+@click.option(
+    "--plan",
+    "plan_only",
+    default=False,
+    is_flag=True,
+    help="Print the API calls the dump would make and its estimated runtime, and exit",
+)
+@click.option(
+    "--plan-from",
+    type=click.Path(exists=True, dir_okay=False),
+    help=(
+        "Plan from a previous JSON dump or snapshot of the org instead of list calls, "
+        "for exact counts"
+    ),
+)
+@click.option(
+    "--auto-workers",
+    default=False,
+    is_flag=True,
+    help="Plan the dump first, and size the worker pool for the rate limit",
+)
+@click.option(
+    "--rate-limit",
+    type=float,
+    help="Limit API requests per second",
+)
+@click.option(
+    "--record",
+    "record_path",
+    type=click.Path(dir_okay=False),
+    help="Record the API responses of the dump to a cassette file",
+)
+@click.option(
+    "--replay",
+    "replay_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Answer API calls from a cassette file instead of AWS",
+)
 @click.option("--out-file", "-o", help="File path to write data instead of stdout")
+@click.option(
+    "--checkpoint-dir",
+    type=click.Path(file_okay=False),
+    help="Journal completed fetches to a directory so the run can be resumed",
+)
+@click.option(
+    "--resume",
+    "resume_dir",
+    type=click.Path(file_okay=False),
+    help="Resume an interrupted run from its checkpoint directory",
+)
 @click.pass_context
 def dump_all(
     ctx: dict[str, Any],
     format_: str,
     no_accounts: bool,
     no_policies: bool,
+    dedupe_policies: bool,
+    policy_cache: str,
+    priorities: tuple[str, ...],
+    plan_only: bool,
+    plan_from: str,
+    auto_workers: bool,
+    rate_limit: float,
+    record_path: str,
+    replay_path: str,
     out_file: str,
+    checkpoint_dir: str,
+    resume_dir: str,
 ) -> None:
     """Dump a data representation of the organization"""
+    format_ = format_.upper()
+    if format_ in TABLE_FORMATS and out_file is None:
+        raise click.UsageError(f"--out-file is required for {format_}")
+    if dedupe_policies and format_ not in ["JSON", "YAML"]:
+        raise click.UsageError("--dedupe-policies requires the JSON or YAML format")
+    if format_ == "NDJSON" and (no_accounts or no_policies):
+        raise click.UsageError(
+            "--no-accounts and --no-policies aren't supported with NDJSON"
+        )
+    if record_path is not None and replay_path is not None:
+        raise click.UsageError("--record and --replay can't be used together")
+    phase_priorities = parse_priorities(priorities)
     err_msg = None
     tb = None
+    checkpoint = None
+    cassette = None
     try:
+        if plan_only:
+            # Planning doesn't touch the journal
+            checkpoint_dir = resume_dir = None
+        if resume_dir is not None:
+            checkpoint = CheckpointJournal(resume_dir, resume=True)
+        elif checkpoint_dir is not None:
+            checkpoint = CheckpointJournal(checkpoint_dir, resume=False)
         kwargs = {"init_all": True}
-        if no_accounts or no_policies:
+        if no_accounts or no_policies or format_ == "NDJSON":
             del kwargs["init_all"]
         if no_accounts:
             kwargs["init_accounts"] = False
@@ -172,17 +338,189 @@ def dump_all(
             kwargs["init_policies"] = False
             kwargs["init_policy_tags"] = False
             kwargs["init_policy_targets"] = False
-        odb = OrganizationDataBuilder(include_account_parents=True, **kwargs)
-        if format_ == "JSON":
-            s_func = odb.to_json
-        elif format_ == "YAML":
-            s_func = odb.to_yaml
-        elif format_ == "DOT":
-            s_func = odb.to_dot
+        policy_store = None
+        if policy_cache is not None:
+            policy_store = PolicyContentStore(policy_cache)
+        client = None
+        if record_path is not None or replay_path is not None:
+            from ..client import Cassette
+
+            if record_path is not None:
+                cassette = Cassette.record(record_path)
+            else:
+                cassette = Cassette.replay(replay_path)
+        if rate_limit is not None or cassette is not None:
+            client = organizations_client(rate_limit, cassette)
+        builder_kwargs = {
+            "client": client,
+            "include_account_parents": True,
+            "policy_store": policy_store,
+            "phase_priorities": phase_priorities,
+        }
+        if plan_only or auto_workers:
+            planner = OrganizationDataBuilder(**builder_kwargs)
+            # NDJSON streams a fetch_all() crawl
+            plan_kwargs = {"init_all": format_ == "NDJSON", **kwargs}
+            plan = planner.plan_crawl(
+                organization=(
+                    None if plan_from is None else load_organization(plan_from)
+                ),
+                **plan_kwargs,
+            )
+            if plan_only:
+                with click.open_file(out_file or "-", mode="w", encoding="utf-8") as f:
+                    f.write(plan.format())
+                return
+            builder_kwargs["max_workers"] = plan.recommended_max_workers
+            if client is not None:
+                builder_kwargs["client"] = organizations_client(
+                    rate_limit, cassette, max_workers=plan.recommended_max_workers
+                )
+        odb = OrganizationDataBuilder(
+            checkpoint=checkpoint,
+            **builder_kwargs,
+            **kwargs,
+        )
+        if format_ == "NDJSON":
+            if out_file is None:
+                out_file = "-"
+            with click.open_file(out_file, mode="w", encoding="utf-8") as f:
+                for event in odb.iter_crawl():
+                    f.write(f"{event.to_ndjson()}\n")
+                    f.flush()
+        elif format_ in TABLE_FORMATS:
+            write_tables(odb.dm, out_file, format_)
+        else:
+            if format_ == "JSON":
+                lines = [odb.to_json(dedupe_policies=dedupe_policies)]
+            elif format_ == "YAML":
+                lines = [odb.to_yaml(dedupe_policies=dedupe_policies)]
+            else:
+                exporters = {
+                    "DOT": iter_dot,
+                    "GRAPHML": iter_graphml,
+                    "MERMAID": iter_mermaid,
+                }
+                lines = exporters[format_](odb.dm)
+            if out_file is None:
+                out_file = "-"
+            with click.open_file(out_file, mode="w", encoding="utf-8") as f:
+                write_lines(lines, f)
+    except ClientError as exc_info:
+        err_msg = f"Service Error: {str(exc_info)}"
+    except NoCredentialsError:
+        err_msg = "Error: Unable to locate AWS credentials"
+    except Exception as exc_info:
+        err_msg = f"Unknown Error: {str(exc_info)}"
+        tb = traceback.format_exc()
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if cassette is not None and cassette.recording:
+            cassette.save()
+    handle_error(ctx, err_msg, tb)
+
+
+def load_organization(path: str) -> Organization:
+    """Load an organization from a JSON dump or a snapshot file"""
+    with open(path, "rb") as f:
+        is_snapshot = f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    if is_snapshot:
+        return Organization.from_snapshot(path)
+    with click.open_file(path, mode="r") as f:
+        return Organization.from_dict(json.load(f), convert_keys=False)
+
+
+@organization.command(short_help="Compare two dumps of the org")
+@click.argument("old_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--out-file", "-o", help="File path to write data instead of stdout")
+@click.pass_context
+def diff(
+    ctx: dict[str, Any],
+    old_file: str,
+    new_file: str,
+    out_file: str,
+) -> None:
+    """
+    Compare two JSON dumps or snapshots of the organization and stream the changes as
+    newline-delimited JSON
+    """
+    err_msg = None
+    tb = None
+    try:
+        old = load_organization(old_file)
+        new = load_organization(new_file)
         if out_file is None:
             out_file = "-"
-        with click.open_file(out_file, mode="wb") as f:
-            f.write(bytes(s_func(), "utf-8"))
+        with click.open_file(out_file, mode="w") as f:
+            for change in old.iter_diff(new):
+                f.write(f"{change.to_ndjson()}\n")
+    except Exception as exc_info:
+        err_msg = f"Unknown Error: {str(exc_info)}"
+        tb = traceback.format_exc()
+    handle_error(ctx, err_msg, tb)
+
+
+@organization.command(short_help="Dump several orgs through assumed roles")
+@click.option(
+    "--role-arn",
+    "-r",
+    "role_arns",
+    required=True,
+    multiple=True,
+    help="A role to assume in an organization's management account (repeatable)",
+)
+@click.option(
+    "--format",
+    "-f",
+    "format_",
+    default="NDJSON",
+    type=click.Choice(["JSON", "NDJSON"], case_sensitive=False),
+    help="NDJSON streams one node per line; JSON writes an object keyed by role ARN",
+)
+@click.option(
+    "--max-workers",
+    default=4,
+    show_default=True,
+    help="Number of organizations to crawl at once",
+)
+@click.option(
+    "--max-concurrency",
+    default=16,
+    show_default=True,
+    help="Number of API requests in flight at once across all organizations",
+)
+@click.option("--out-file", "-o", help="File path to write data instead of stdout")
+@click.pass_context
+def crawl(
+    ctx: dict[str, Any],
+    role_arns: list[str],
+    format_: str,
+    max_workers: int,
+    max_concurrency: int,
+    out_file: str,
+) -> None:
+    """Dump data for multiple organizations in parallel"""
+    err_msg = None
+    tb = None
+    from ..models.crawler import OrganizationCrawler
+
+    try:
+        crawler = OrganizationCrawler(
+            targets=list(role_arns),
+            max_workers=max_workers,
+            max_concurrency=max_concurrency,
+        )
+        if out_file is None:
+            out_file = "-"
+        with click.open_file(out_file, mode="w") as f:
+            if format_.upper() == "NDJSON":
+                for line in crawler.iter_ndjson():
+                    f.write(line)
+            else:
+                data = {k: org.to_dict() for k, org in crawler.crawl().items()}
+                f.write(json.dumps(data, default=str))
     except ClientError as exc_info:
         err_msg = f"Service Error: {str(exc_info)}"
     except NoCredentialsError:
@@ -209,6 +547,12 @@ def dump_all(
     is_flag=True,
     help="Include parent data for the accounts",
 )
+@click.option(
+    "--include-ancestors",
+    default=False,
+    is_flag=True,
+    help="Include the path of ancestors from the root for the accounts",
+)
 @click.option(
     "--include-tags",
     default=False,
@@ -226,6 +570,7 @@ def lookup_accounts(
     ctx: dict[str, Any],
     accounts: list[str],
     include_parents: bool,
+    include_ancestors: bool,
     include_effective_policies: bool,
     include_policies: bool,
     include_tags: bool,
@@ -248,9 +593,6 @@ def lookup_accounts(
             ctx,
             f"Invalid account IDs included in request: {str.join(' ', invalid_ids)}",
         )
-    odb = OrganizationDataBuilder()
-    odb.Connect()
-    odb.fetch_accounts(include_parents=include_parents)
 
     exclude_keys = []
     if not include_parents:
@@ -262,20 +604,37 @@ def lookup_accounts(
     if not include_tags:
         exclude_keys.append("tags")
 
-    if include_policies:
-        odb.fetch_policies()
-        odb.fetch_policy_targets()
-    if include_effective_policies:
-        odb.fetch_effective_policies(account_ids=account_ids)
-    if include_tags:
-        odb.fetch_account_tags(account_ids=account_ids)
-
-    data = [
-        {k: v for k, v in acct.to_dict().items() if k not in exclude_keys}
-        for acct in odb.dm.accounts
-        if acct.id in account_ids
-    ]
-    click.echo(json.dumps(data, default=str))
+    err_msg = None
+    tb = None
+    try:
+        odb = OrganizationDataBuilder()
+        odb.Connect()
+        # Only query the requested accounts instead of fetching the whole org
+        accts = odb.lookup_accounts(
+            account_ids,
+            include_parents=include_parents,
+            include_policies=include_policies,
+            include_effective_policies=include_effective_policies,
+            include_tags=include_tags,
+        )
+        ancestors = {}
+        if include_ancestors:
+            ancestors = odb.loader.fetch_ancestors([acct.id for acct in accts])
+        data = []
+        for acct in accts:
+            item = {k: v for k, v in acct.to_dict().items() if k not in exclude_keys}
+            if include_ancestors:
+                item["ancestors"] = [p.to_dict() for p in ancestors[acct.id]]
+            data.append(item)
+        click.echo(json.dumps(data, default=str))
+    except ClientError as exc_info:
+        err_msg = f"Service Error: {str(exc_info)}"
+    except NoCredentialsError:
+        err_msg = "Error: Unable to locate AWS credentials"
+    except Exception as exc_info:
+        err_msg = f"Unknown Error: {str(exc_info)}"
+        tb = traceback.format_exc()
+    handle_error(ctx, err_msg, tb)
 
 
 @organization.command()
@@ -298,6 +657,8 @@ def write_accounts_to_dynamodb(
         handle_error(err_msg="Data is not a list")
     odb.dm.accounts = [Account(**account) for account in data]
     accounts = odb.to_dynamodb(field_name="accounts")
+    from ..client import APIClient
+
     client = APIClient("dynamodb")
     ret = {"responses": []}
     # Group into batches of 25 since that's the max for BatchWriteItem
@@ -318,6 +679,8 @@ def read_accounts_from_dynamodb(
     table: str,
 ) -> None:
     """Fetch a list of accounts from a DynamoDB table"""
+    from ..client import APIClient
+
     client = APIClient("dynamodb")
     res = client.api("scan", table_name=table)
     accounts = [Account(**account) for account in deserialize_dynamodb_items(res)]
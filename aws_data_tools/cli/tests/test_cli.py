@@ -0,0 +1,183 @@
+import json
+from unittest import mock
+
+from click.testing import CliRunner
+from moto import mock_aws
+
+from aws_data_tools.cli import cli
+from aws_data_tools.client import APIClient, SessionPool
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+
+def test_diff(organizations_client, seeded_organization, tmp_path):
+    ids = seeded_organization
+    odb = OrganizationDataBuilder(
+        client=organizations_client, include_account_parents=True, init_all=True
+    )
+    old_path = tmp_path / "old.json"
+    old_path.write_text(odb.to_json())
+    organizations_client.api(
+        "tag_resource",
+        resource_id=ids["acmeinc-not-in-an-ou"],
+        tags=[{"Key": "Owner", "Value": "me"}],
+    )
+    odb.fetch_account_tags()
+    new_path = tmp_path / "new.snapshot"
+    odb.dm.to_snapshot(new_path)
+    result = CliRunner().invoke(
+        cli, ["organization", "diff", str(old_path), str(new_path)]
+    )
+    assert result.exit_code == 0, result.output
+    changes = [json.loads(line) for line in result.output.splitlines()]
+    assert changes == [
+        {
+            "node_id": ids["acmeinc-not-in-an-ou"],
+            "node_type": "ACCOUNT",
+            "change_type": "TAG_ADDED",
+            "attribute": "Owner",
+            "old": None,
+            "new": "me",
+        }
+    ]
+
+
+def test_lookup_accounts(organizations_client, seeded_organization, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    account_id = seeded_organization["acmeinc-elasticsearch-dev"]
+    result = CliRunner().invoke(
+        cli,
+        [
+            "organization",
+            "lookup-accounts",
+            "--accounts",
+            account_id,
+            "--include-parents",
+            "--include-ancestors",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    [account] = json.loads(result.output)
+    assert account["id"] == account_id
+    assert account["parent"]["id"] == seeded_organization["/Large BU/Logging/Dev"]
+    assert [a["id"] for a in account["ancestors"]] == [
+        seeded_organization[path]
+        for path in ["/", "/Large BU", "/Large BU/Logging", "/Large BU/Logging/Dev"]
+    ]
+    assert "tags" not in account
+
+
+def test_crawl(aws_credentials, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    role_arns = [
+        f"arn:aws:iam::{account_id}:role/OrganizationReader"
+        for account_id in ["111111111111", "222222222222"]
+    ]
+    with mock_aws():
+        pool = SessionPool()
+        for role_arn in role_arns:
+            client = pool.get(role_arn=role_arn).client("organizations")
+            client.create_organization(FeatureSet="ALL")
+        args = ["organization", "crawl", "--format", "JSON"]
+        for role_arn in role_arns:
+            args.extend(["--role-arn", role_arn])
+        # Effective policies aren't supported by moto
+        with mock.patch.object(OrganizationDataBuilder, "fetch_effective_policies"):
+            result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert sorted(data) == role_arns
+    assert [data[arn]["master_account_id"] for arn in role_arns] == [
+        "111111111111",
+        "222222222222",
+    ]
+
+
+def test_dump_all_resume(aws_credentials, monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    with mock_aws():
+        APIClient("organizations").api("create_organization", feature_set="ALL")
+        args = ["organization", "dump-all"]
+        first = CliRunner().invoke(cli, args + ["--checkpoint-dir", checkpoint_dir])
+        assert first.exit_code == 0, first.output
+    # Resuming a completed run replays the journal without any API calls
+    with mock.patch.object(APIClient, "api", side_effect=AssertionError):
+        resumed = CliRunner().invoke(cli, args + ["--resume", checkpoint_dir])
+    assert resumed.exit_code == 0, resumed.output
+    assert json.loads(resumed.output) == json.loads(first.output)
+
+
+def test_dump_all_plan(aws_credentials, monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        APIClient("organizations").api("create_organization", feature_set="ALL")
+        args = ["organization", "dump-all"]
+        with mock.patch.object(OrganizationDataBuilder, "fetch_all") as fetch_all:
+            result = CliRunner().invoke(cli, args + ["--plan", "--rate-limit", "5"])
+        assert result.exit_code == 0, result.output
+        fetch_all.assert_not_called()
+        assert "describe_organization" in result.output
+        assert "rate limit 5/s" in result.output
+        result = CliRunner().invoke(cli, args)
+        dump_path = tmp_path / "org.json"
+        dump_path.write_text(result.output)
+        result = CliRunner().invoke(
+            cli, args + ["--plan", "--plan-from", str(dump_path)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "(estimated)" not in result.output
+        result = CliRunner().invoke(cli, args + ["--auto-workers"])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == json.loads(dump_path.read_text())
+
+
+def test_dump_all_record_replay(aws_credentials, monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    cassette = str(tmp_path / "organization.json.gz")
+    args = ["organization", "dump-all"]
+    with mock_aws():
+        APIClient("organizations").api("create_organization", feature_set="ALL")
+        recorded = CliRunner().invoke(cli, args + ["--record", cassette])
+        assert recorded.exit_code == 0, recorded.output
+    replayed = CliRunner().invoke(cli, args + ["--replay", cassette])
+    assert replayed.exit_code == 0, replayed.output
+    assert json.loads(replayed.output) == json.loads(recorded.output)
+    result = CliRunner().invoke(
+        cli, args + ["--record", cassette, "--replay", cassette]
+    )
+    assert result.exit_code != 0
+
+
+def test_dump_all_formats(aws_credentials, monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        APIClient("organizations").api("create_organization", feature_set="ALL")
+        args = ["organization", "dump-all", "--format"]
+        result = CliRunner().invoke(cli, args + ["MERMAID"])
+        assert result.exit_code == 0, result.output
+        assert result.output.startswith("flowchart TD\n")
+        result = CliRunner().invoke(cli, args + ["CSV"])
+        assert result.exit_code != 0
+        assert "--out-file is required" in result.output
+        out_dir = tmp_path / "tables"
+        result = CliRunner().invoke(cli, args + ["CSV", "-o", str(out_dir)])
+        assert result.exit_code == 0, result.output
+        assert (out_dir / "nodes.csv").read_text().startswith("id,type,name,")
+        policy_cache = str(tmp_path / "policies.json")
+        result = CliRunner().invoke(
+            cli, args + ["JSON", "--policy-cache", policy_cache]
+        )
+        assert result.exit_code == 0, result.output
+        result = CliRunner().invoke(cli, args + ["JSON", "--dedupe-policies"])
+        assert result.exit_code == 0, result.output
+        assert "policy_documents" in json.loads(result.output)
+        result = CliRunner().invoke(cli, args + ["MERMAID", "--dedupe-policies"])
+        assert result.exit_code != 0
+        result = CliRunner().invoke(
+            cli, args + ["NDJSON", "--priority", "account_tags=0"]
+        )
+        assert result.exit_code == 0, result.output
+        events = [json.loads(line) for line in result.output.splitlines()]
+        assert events[0]["node_type"] == "ORGANIZATION"
+        result = CliRunner().invoke(cli, args + ["NDJSON", "--priority", "tags=0"])
+        assert result.exit_code != 0
@@ -2,4 +2,34 @@
 
 # flake8: noqa: F401
 
-from .client import APIClient
+from typing import TYPE_CHECKING
+
+from ..utils.imports import lazy_loader
+
+# Classes are imported on first access, since they depend on boto3
+__getattr__, __dir__, __all__ = lazy_loader(
+    __name__,
+    attributes={
+        "APIClient": "client",
+        "Cassette": "cassette",
+        "ClientPool": "pool",
+        "get_default_client_pool": "pool",
+        "HedgingPolicy": "hedging",
+        "RateLimiter": "ratelimit",
+        "ReplayProfile": "cassette",
+        "SessionPool": "session",
+        "SingleFlight": "singleflight",
+        "assume_role_session": "session",
+        "is_throttling_error": "retry",
+    },
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cassette import Cassette, ReplayProfile
+    from .client import APIClient
+    from .hedging import HedgingPolicy
+    from .pool import ClientPool, get_default_client_pool
+    from .ratelimit import RateLimiter
+    from .retry import is_throttling_error
+    from .session import SessionPool, assume_role_session
+    from .singleflight import SingleFlight
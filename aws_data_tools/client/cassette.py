@@ -0,0 +1,341 @@
+"""
+Record the responses of API calls to a cassette file, and replay them without AWS, with
+simulated latency and throttling, for offline crawls and repeatable benchmarks
+"""
+
+from collections import Counter
+from copy import deepcopy
+from dataclasses import dataclass, field
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+import random
+from threading import Lock
+import time
+from typing import Any, Optional
+
+from botocore.exceptions import ClientError
+from botocore.session import get_session
+
+from .ratelimit import RateLimiter
+from .retry import DEFAULT_BASE_DELAY, DEFAULT_MAX_ATTEMPTS, backoff_delay
+from .singleflight import call_key
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+CASSETTE_VERSION = 1
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed call isn't in the cassette"""
+
+
+@dataclass
+class ReplayProfile:
+    """How the simulated service behaves when a cassette is replayed"""
+
+    # Seconds each request takes, and overrides by API action
+    latency: float = field(default=0.0)
+    latencies: dict[str, float] = field(default_factory=dict)
+    # Scale each latency by a random factor between 1 - jitter and 1 + jitter
+    jitter: float = field(default=0.0)
+    # Requests per second the service accepts before throttling. Throttled requests
+    # are retried with backoff like botocore does, and raise a throttling error after
+    # `max_attempts`. None disables throttling.
+    rate_limit: Optional[float] = field(default=None)
+    rate_limit_burst: int = field(default=1)
+    max_attempts: int = field(default=DEFAULT_MAX_ATTEMPTS)
+    base_delay: float = field(default=DEFAULT_BASE_DELAY)
+    seed: Optional[int] = field(default=None)
+
+
+def _encode(value: Any) -> Any:
+    # botocore parses timestamps, so they're tagged to be parsed again on replay
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _strip(response: dict[str, Any]) -> dict[str, Any]:
+    # Request IDs and headers differ for every request and aren't used
+    return {k: v for k, v in response.items() if k != "ResponseMetadata"}
+
+
+class Cassette:
+    """
+    API calls and their responses, by service, action, and kwargs. In record mode,
+    clients wrapped with `record_client()` add each call they make, and `save()` (or
+    leaving the cassette's context) writes them to `path` as gzipped JSON. In replay
+    mode, the cassette is read from `path`, and clients from `replay_client()` answer
+    calls from it, without credentials or network access, taking the time `profile`
+    sets for each request. Both are safe to use from several threads.
+    """
+
+    def __init__(
+        self, path: str, mode: str = REPLAY, profile: Optional[ReplayProfile] = None
+    ):
+        if mode not in [RECORD, REPLAY]:
+            raise ValueError(f"mode must be {RECORD!r} or {REPLAY!r}")
+        self.path = path
+        self.mode = mode
+        self.profile = ReplayProfile() if profile is None else profile
+        self._interactions: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._lock = Lock()
+        self._random = random.Random(self.profile.seed)
+        self._bucket = None
+        if self.profile.rate_limit is not None:
+            self._bucket = RateLimiter(
+                self.profile.rate_limit, burst=self.profile.rate_limit_burst
+            )
+        self._requests: Counter = Counter()
+        self._throttled: Counter = Counter()
+        if mode == REPLAY:
+            self.__load()
+
+    @classmethod
+    def record(cls, path: str) -> "Cassette":
+        """Return a cassette that records calls, to be saved to `path`"""
+        return cls(path, mode=RECORD)
+
+    @classmethod
+    def replay(cls, path: str, profile: Optional[ReplayProfile] = None) -> "Cassette":
+        """Return a cassette that replays the calls recorded at `path`"""
+        return cls(path, mode=REPLAY, profile=profile)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self.recording:
+            self.save()
+
+    def __load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f, object_hook=_decode)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+        for interaction in data["interactions"]:
+            self.__add(interaction)
+
+    def __add(self, interaction: dict[str, Any]) -> None:
+        service = interaction["service"]
+        operation = interaction["operation"]
+        key = call_key(operation, interaction["params"])
+        with self._lock:
+            self._interactions[(service, *key)] = interaction
+
+    def save(self) -> None:
+        """Write the recorded calls to the cassette's path"""
+        with self._lock:
+            interactions = list(self._interactions.values())
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": interactions},
+                f,
+                default=_encode,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+
+    def add_response(
+        self,
+        service: str,
+        operation: str,
+        params: dict[str, Any],
+        response: dict[str, Any],
+        operation_name: str,
+    ) -> None:
+        """
+        Record the response to a request. Each page of a paginated call is a separate
+        request. `operation_name` is the name of the API action, e.g., ListAccounts for
+        list_accounts.
+        """
+        self.__add(
+            {
+                "service": service,
+                "operation": operation,
+                "params": deepcopy(params),
+                "response": _strip(response),
+                "operation_name": operation_name,
+            }
+        )
+
+    def add_error(
+        self, service: str, operation: str, params: dict[str, Any], exc: ClientError
+    ) -> None:
+        """Record the error a call raised"""
+        self.__add(
+            {
+                "service": service,
+                "operation": operation,
+                "params": deepcopy(params),
+                "error": _strip(exc.response),
+                "operation_name": exc.operation_name,
+            }
+        )
+
+    def record_client(self, client: Any) -> "RecordingClient":
+        """Wrap a botocore client so the calls it makes are recorded"""
+        return RecordingClient(client, self)
+
+    def replay_client(self, service: str) -> "ReplayClient":
+        """Return a stand-in for a botocore client that answers from the cassette"""
+        return ReplayClient(service, self)
+
+    def __latency(self, operation: str) -> float:
+        latency = self.profile.latencies.get(operation, self.profile.latency)
+        if self.profile.jitter > 0:
+            with self._lock:
+                latency *= self._random.uniform(
+                    1 - self.profile.jitter, 1 + self.profile.jitter
+                )
+        return latency
+
+    def __request(self, operation: str, operation_name: str) -> None:
+        """Take the time a request takes, including any throttled attempts"""
+        attempt = 0
+        while self._bucket is not None and not self._bucket.try_acquire():
+            attempt += 1
+            with self._lock:
+                self._throttled[operation] += 1
+            time.sleep(self.__latency(operation))
+            if attempt >= self.profile.max_attempts:
+                raise ClientError(
+                    {
+                        "Error": {
+                            "Code": "ThrottlingException",
+                            "Message": "Rate exceeded",
+                        }
+                    },
+                    operation_name,
+                )
+            time.sleep(backoff_delay(attempt - 1, self.profile.base_delay))
+        with self._lock:
+            self._requests[operation] += 1
+        time.sleep(self.__latency(operation))
+
+    def respond(
+        self, service: str, operation: str, params: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Replay the response to a recorded request, or raise its error"""
+        interaction = self._interactions.get((service, *call_key(operation, params)))
+        if interaction is None:
+            raise CassetteMiss(f"{service}.{operation}({params}) isn't in the cassette")
+        self.__request(operation, interaction["operation_name"])
+        if "error" in interaction:
+            raise ClientError(
+                deepcopy(interaction["error"]), interaction["operation_name"]
+            )
+        return deepcopy(interaction["response"])
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Return the number of replayed requests, and of attempts the simulated service
+        throttled, by API action
+        """
+        with self._lock:
+            return {
+                operation: {
+                    "requests": self._requests[operation],
+                    "throttled": self._throttled[operation],
+                }
+                for operation in sorted({*self._requests, *self._throttled})
+            }
+
+
+class RecordingClient:
+    """
+    A botocore client wrapper that records the requests made through it. Paginated
+    calls are recorded page by page, as ApiClient requests each page separately.
+    """
+
+    def __init__(self, client: Any, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+        self._service = client.meta.service_model.service_name
+
+    @property
+    def meta(self) -> Any:
+        return self._client.meta
+
+    def can_paginate(self, operation: str) -> bool:
+        return self._client.can_paginate(operation)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in self._client.meta.method_to_api_mapping:
+            return attr
+
+        def call(**kwargs):
+            try:
+                response = attr(**kwargs)
+            except ClientError as exc:
+                self._cassette.add_error(self._service, name, kwargs, exc)
+                raise
+            self._cassette.add_response(
+                self._service,
+                name,
+                kwargs,
+                response,
+                operation_name=self._client.meta.method_to_api_mapping[name],
+            )
+            return response
+
+        return call
+
+
+class ReplayClient:
+    """
+    Answers requests like a botocore client, from the responses in a cassette. The
+    service's model comes from an offline botocore client that never sends requests.
+    """
+
+    def __init__(self, service: str, cassette: Cassette):
+        self._service = service
+        self._cassette = cassette
+        self._model_client = get_session().create_client(
+            service,
+            region_name="us-east-1",
+            aws_access_key_id="replay",
+            aws_secret_access_key="replay",
+        )
+
+    @property
+    def meta(self) -> Any:
+        return self._model_client.meta
+
+    def can_paginate(self, operation: str) -> bool:
+        return self._model_client.can_paginate(operation)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(**kwargs):
+            return self._cassette.respond(self._service, name, kwargs)
+
+        return call
@@ -2,13 +2,25 @@
 Module containing classes that abstract interactions with boto3 sessions and clients
 """
 
+import asyncio
+from contextlib import nullcontext
 from dataclasses import InitVar, dataclass, field
+from functools import lru_cache, partial
 import logging
-from typing import Any, Union
+from threading import Semaphore
+from typing import Any, Iterator, Optional, Union
 
 from boto3.session import Session
 from botocore.client import BaseClient
-from humps import depascalize, pascalize
+from botocore.paginate import Paginator, PaginatorModel
+from botocore.session import get_session
+
+from ..utils.casing import pascal_keys, snake_keys
+from .cassette import Cassette
+from .hedging import HedgingPolicy
+from .pool import ClientPool
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight, call_key, is_read_only
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
@@ -16,6 +28,12 @@ logging.getLogger(__name__).addHandler(logging.NullHandler())
 _DEFAULT_PAGINATION_CONFIG = {"MaxItems": 500}
 
 
+@lru_cache(maxsize=None)
+def _paginator_model(service_name: str, api_version: str) -> PaginatorModel:
+    """Load the pagination configs of a service from botocore's data"""
+    return get_session().get_paginator_model(service_name, api_version)
+
+
 @dataclass
 class ApiClient:
     """
@@ -31,6 +49,104 @@ class ApiClient:
     client_kwargs: InitVar[dict[str, Any]] = field(default=None)
     session_kwargs: InitVar[dict[str, Any]] = field(default=None)
 
+    # Reuse a shared client (and session) from a ClientPool instead of creating one
+    client_pool: InitVar[ClientPool] = field(default=None)
+
+    # Maximum API requests per second (each page of a paginated call counts as one),
+    # shared by all threads using the client. None disables rate limiting.
+    rate_limit: Optional[float] = field(default=None)
+    rate_limit_burst: int = field(default=1)
+
+    # Caps the number of requests in flight at once. Can be shared between clients to
+    # apply a global limit, e.g., when crawling several organizations in parallel.
+    semaphore: Optional[Semaphore] = field(default=None, repr=False)
+
+    # Share one request between identical read-only calls (describe_*, get_*, list_*)
+    # that are in flight at the same time, before they reach the rate limiter
+    coalesce: bool = field(default=True)
+
+    # Opt in to hedging slow read-only calls with a duplicate request
+    hedging: Optional[HedgingPolicy] = field(default=None, repr=False)
+
+    # Record the responses to calls to a cassette, or answer calls from one without
+    # making requests
+    cassette: Optional[Cassette] = field(default=None, repr=False)
+
+    _rate_limiter: Optional[RateLimiter] = field(default=None, init=False, repr=False)
+    _single_flight: Optional[SingleFlight] = field(default=None, init=False, repr=False)
+
+    def throttle(self) -> None:
+        """Block until the rate limit allows another request"""
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
+    def iter_pages(self, func: str, **kwargs) -> Iterator[dict[str, Any]]:
+        """
+        Call a named API action and yield the raw responses, one per page if the
+        action supports pagination. Kwargs must be passed in PascalCase and keys in the
+        responses are not converted.
+        """
+        if not self.client.can_paginate(func):
+            yield self.__send(func, **kwargs)
+            return
+        if kwargs.get("PaginationConfig") is None:
+            kwargs.update(PaginationConfig=_DEFAULT_PAGINATION_CONFIG)
+        yield from self.__paginator(func).paginate(**kwargs)
+
+    def __paginator(self, func: str) -> Paginator:
+        """
+        Return a paginator for an action that sends the request for each page through
+        __send(), so pages are rate limited, hedged, and coalesced one at a time
+        """
+        service_model = self.client.meta.service_model
+        operation_name = self.client.meta.method_to_api_mapping[func]
+        config = _paginator_model(
+            service_model.service_name, service_model.api_version
+        ).get_paginator(operation_name)
+        return Paginator(
+            partial(self.__send, func),
+            config,
+            service_model.operation_model(operation_name),
+        )
+
+    def __send(self, func: str, **kwargs) -> dict[str, Any]:
+        """
+        Make a single request. Read-only requests are hedged, if enabled, and share
+        one request with identical requests in flight.
+        """
+        request = partial(self.__request, func, kwargs)
+        if not is_read_only(func):
+            return request()
+        if self.hedging is not None:
+            request = partial(self.hedging.call, func, request)
+        if self._single_flight is None:
+            return request()
+        return self._single_flight.do(call_key(func, kwargs), request)
+
+    def __request(self, func: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+        self.throttle()
+        with self.semaphore if self.semaphore is not None else nullcontext():
+            return getattr(self.client, func)(**kwargs)
+
+    def raw_api(
+        self, func: str, **kwargs
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        """
+        Call a named API action like api(), but return the raw botocore data without
+        converting keys to snake_case. Paginated responses are aggregated. Kwargs can
+        be passed in snake_case or PascalCase.
+        """
+        kwargs = pascal_keys(kwargs)
+        if self.client.can_paginate(func):
+            responses = []
+            for page in self.iter_pages(func, **kwargs):
+                metakeys = ["NextToken", "ResponseMetadata"]
+                key = [k for k in page.keys() if k not in metakeys][0]
+                responses.extend(page.get(key))
+            return responses
+        # TODO: Fix logging to use structlog globally
+        return next(self.iter_pages(func, **kwargs))
+
     def api(self, func: str, **kwargs) -> Union[dict[str, Any], list[dict[str, Any]]]:
         """
         Call a named API action by string. All arguments to the action should be passed
@@ -40,33 +156,61 @@ class ApiClient:
         If the API action is one that supports pagination, it is handled automaticaly.
         All paginated responses are fully aggregated and then returned.
         """
-        kwargs = {pascalize(key): value for key, value in kwargs.items()}
-        paginate = self.client.can_paginate(func)
-        if paginate:
-            paginator = self.client.get_paginator(func)
-            if kwargs.get("PaginationConfig") is None:
-                kwargs.update(PaginationConfig=_DEFAULT_PAGINATION_CONFIG)
-            page_iterator = paginator.paginate(**kwargs)
-            responses = []
-            for page in page_iterator:
-                page = depascalize(page)
-                metakeys = ["next_token", "response_metadata"]
-                key = [k for k in page.keys() if k not in metakeys][0]
-                responses.extend(page.get(key))
-            return responses
-        # TODO: Fix logging to use structlog globally
-        response = getattr(self.client, func)(**kwargs)
-        return depascalize(response)
+        return snake_keys(self.raw_api(func, **kwargs))
+
+    async def api_async(
+        self, func: str, **kwargs
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        """
+        Call a named API action like api() from an asyncio task, without blocking the
+        event loop. Identical read-only calls from tasks in the same loop share one
+        call.
+        """
+        call = partial(asyncio.to_thread, self.api, func, **kwargs)
+        if self._single_flight is None or not is_read_only(func):
+            return await call()
+        key = call_key(func, pascal_keys(kwargs))
+        return await self._single_flight.do_async(key, call)
+
+    def coalescing_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Return the number of read-only calls made and the number that were coalesced
+        into an identical call in flight, by API action
+        """
+        if self._single_flight is None:
+            return {}
+        return self._single_flight.stats()
 
-    def __post_init__(self, client_kwargs, session_kwargs):  # pragma: no cover
+    def __post_init__(
+        self, client_kwargs, session_kwargs, client_pool
+    ):  # pragma: no cover
         if client_kwargs is None:
             client_kwargs = {}
+        if self.client is None and self.cassette is not None:
+            if self.cassette.replaying:
+                self.client = self.cassette.replay_client(self.service)
+        if self.client is None and client_pool is not None:
+            if self.session is None:
+                self.session = client_pool.session_pool.get(
+                    session_kwargs=session_kwargs
+                )
+            self.client = client_pool.get(
+                self.service, session=self.session, **client_kwargs
+            )
         if session_kwargs is None:
             session_kwargs = {}
         if self.session is None:
             self.session = Session(**session_kwargs)
         if self.client is None:
             self.client = self.session.client(self.service, **client_kwargs)
+        if self.cassette is not None and self.cassette.recording:
+            self.client = self.cassette.record_client(self.client)
+        if self.coalesce:
+            self._single_flight = SingleFlight()
+        if self.rate_limit is not None:
+            self._rate_limiter = RateLimiter(
+                self.rate_limit, burst=self.rate_limit_burst
+            )
 
 
 # Support old naming
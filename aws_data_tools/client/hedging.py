@@ -0,0 +1,173 @@
+"""
+Hedged requests for read-only API calls. When a call is slower than most recent calls
+to the same action, a duplicate request is sent, and whichever returns first is used.
+"""
+
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import logging
+import math
+from threading import Event, Lock
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_MAX_HEDGE_RATE = 0.05
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_LATENCY_WINDOW = 200
+DEFAULT_MIN_HEDGE_DELAY = 0.01
+DEFAULT_MAX_HEDGE_WORKERS = 32
+
+
+class HedgingPolicy:
+    """
+    Sends a second request for a call that hasn't returned after the `percentile` of
+    recent latencies for its action, and returns the first response. The latencies of
+    the last `window` successful requests to each action are kept, and calls aren't
+    hedged until there are `min_samples` of them.
+
+    Hedges are capped at `max_hedge_rate` of calls, so when an API slows down for
+    everyone (e.g., while throttling), hedges don't multiply the load. The request
+    that loses is cancelled if it hasn't started, and its response is discarded if it
+    has. A policy can be shared by clients for the same API.
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        max_hedge_rate: float = DEFAULT_MAX_HEDGE_RATE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_LATENCY_WINDOW,
+        min_delay: float = DEFAULT_MIN_HEDGE_DELAY,
+        max_workers: int = DEFAULT_MAX_HEDGE_WORKERS,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 <= max_hedge_rate <= 1:
+            raise ValueError("max_hedge_rate must be between 0 and 1")
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = max(min_samples, 1)
+        self.window = window
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self._lock = Lock()
+        self._latencies: dict[str, deque] = {}
+        self._stats: dict[str, Counter] = {}
+        self._calls = 0
+        self._hedges = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def __record(self, action: str, seconds: float) -> None:
+        with self._lock:
+            latencies = self._latencies.setdefault(action, deque(maxlen=self.window))
+            latencies.append(seconds)
+
+    def __count(self, action: str, name: str) -> None:
+        self._stats.setdefault(action, Counter())[name] += 1
+
+    def delay(self, action: str) -> Optional[float]:
+        """
+        Return how long to wait for a call to an action before hedging it, or None if
+        there aren't enough recent latencies to tell
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(action, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return max(latencies[index], self.min_delay)
+
+    def __allow_hedge(self, action: str) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.max_hedge_rate * self._calls:
+                self.__count(action, "over_budget")
+                return False
+            self._hedges += 1
+            self.__count(action, "hedged")
+            return True
+
+    def __submit(self, action: str, func: Callable[[], T]) -> tuple[Future, Event]:
+        """
+        Run a function in the pool, and return its future and an event set when it
+        starts. Latencies are timed from then, so time queued for a worker isn't
+        counted.
+        """
+        started = Event()
+
+        def timed() -> T:
+            start = time.monotonic()
+            started.set()
+            result = func()
+            self.__record(action, time.monotonic() - start)
+            return result
+
+        return self._pool.submit(timed), started
+
+    def call(self, action: str, func: Callable[[], T]) -> T:
+        """Call a function that makes a request to an action, hedging it if it's slow"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hedge"
+                )
+            self._calls += 1
+            self.__count(action, "calls")
+        delay = self.delay(action)
+        primary, started = self.__submit(action, func)
+        if delay is None:
+            return primary.result()
+        # The delay starts when the request does, not while it waits for a worker
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if len(done) > 0 or not self.__allow_hedge(action):
+            return primary.result()
+        logging.getLogger(__name__).debug(
+            f"Hedging {action} after {delay:.3f}s without a response"
+        )
+        pending = {primary, self.__submit(action, func)[0]}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None or len(pending) == 0:
+                break
+        for future in pending:
+            future.cancel()
+        if winner is None:
+            # Both requests failed, so raise the error from the original one
+            return primary.result()
+        if winner is not primary:
+            with self._lock:
+                self.__count(action, "hedge_won")
+        return winner.result()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Return, by action, the number of calls, hedged calls, hedges that returned
+        first, hedges skipped for the budget, and the current hedge delay
+        """
+        with self._lock:
+            actions = sorted(self._stats)
+            counts = {action: dict(self._stats[action]) for action in actions}
+        return {
+            action: {
+                "calls": counts[action].get("calls", 0),
+                "hedged": counts[action].get("hedged", 0),
+                "hedge_won": counts[action].get("hedge_won", 0),
+                "over_budget": counts[action].get("over_budget", 0),
+                "delay": self.delay(action),
+            }
+            for action in actions
+        }
+
+    def shutdown(self) -> None:
+        """Stop the threads used to make requests, once requests in flight finish"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -0,0 +1,205 @@
+"""
+A thread-safe pool of botocore clients with connection pools sized for concurrent use
+"""
+
+from dataclasses import dataclass, field
+import logging
+from threading import Lock
+from typing import Any, Optional
+
+from boto3.session import Session
+from botocore.client import BaseClient
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+
+from .session import SessionPool
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# botocore defaults to 10 connections per client
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+@dataclass
+class ClientStats:
+    """Request and connection usage for a pooled client"""
+
+    service: str
+    region_name: Optional[str]
+    max_pool_connections: int
+
+    requests: int = field(default=0)
+    in_flight: int = field(default=0)
+    peak_in_flight: int = field(default=0)
+    # Requests sent while every pooled connection was already in use. These open a
+    # connection that is discarded afterwards, so the pool should be larger.
+    saturated_requests: int = field(default=0)
+
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
+
+    @property
+    def utilization(self) -> float:
+        """The peak fraction of pooled connections in use at once"""
+        return self.peak_in_flight / self.max_pool_connections
+
+    def on_send(self, **kwargs) -> None:
+        with self._lock:
+            if self.in_flight >= self.max_pool_connections:
+                self.saturated_requests += 1
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def on_response(self, **kwargs) -> None:
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "service": self.service,
+                "region_name": self.region_name,
+                "max_pool_connections": self.max_pool_connections,
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "saturated_requests": self.saturated_requests,
+                "utilization": self.utilization,
+            }
+
+
+def config_key(config: Config) -> tuple[tuple[str, str], ...]:
+    """
+    Return a hashable key for a client config's option values. Configs are compared
+    by value, since their reprs include the object's id.
+    """
+    return tuple(
+        (name, repr(getattr(config, name))) for name in sorted(Config.OPTION_DEFAULTS)
+    )
+
+
+def credentials_key(session: Session) -> Any:
+    """
+    Return a hashable key for a session's credentials. Refreshable credentials are
+    keyed by identity, since their keys change whenever they're refreshed.
+    """
+    credentials = session.get_credentials()
+    if credentials is None:
+        return None
+    if isinstance(credentials, RefreshableCredentials):
+        return credentials
+    frozen = credentials.get_frozen_credentials()
+    return (frozen.access_key, frozen.secret_key, frozen.token)
+
+
+class ClientPool:
+    """
+    A thread-safe pool of botocore clients keyed by service, region, and credentials.
+    Each client's HTTP connection pool is sized for `max_concurrency` requests at once
+    and uses TCP keep-alive. Clients are safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        config: Config = None,
+        session_pool: SessionPool = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.session_pool = session_pool if session_pool is not None else SessionPool()
+        self.config = Config(
+            max_pool_connections=max_concurrency,
+            tcp_keepalive=True,
+            retries={"mode": "standard"},
+        )
+        if config is not None:
+            self.config = self.config.merge(config)
+        self._lock = Lock()
+        self._clients: dict[Any, BaseClient] = {}
+        self._stats: dict[Any, ClientStats] = {}
+
+    def get(
+        self,
+        service: str,
+        session: Session = None,
+        region_name: str = None,
+        **client_kwargs,
+    ) -> BaseClient:
+        """
+        Return a pooled client for a service. Clients are created from the session
+        (or a default pooled session) the first time they're requested.
+        """
+        if session is None:
+            session = self.session_pool.get(region_name=region_name)
+        region_name = region_name or session.region_name
+        config = self.config
+        if client_kwargs.get("config") is not None:
+            config = config.merge(client_kwargs.pop("config"))
+        key = (
+            service,
+            region_name,
+            credentials_key(session),
+            config_key(config),
+            tuple(sorted((k, repr(v)) for k, v in client_kwargs.items())),
+        )
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+            client = session.client(
+                service, region_name=region_name, config=config, **client_kwargs
+            )
+            stats = ClientStats(
+                service=service,
+                region_name=region_name,
+                max_pool_connections=config.max_pool_connections,
+            )
+            client.meta.events.register("before-send", stats.on_send)
+            client.meta.events.register("response-received", stats.on_response)
+            self._clients[key] = client
+            self._stats[key] = stats
+            return client
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return request and connection usage for each pooled client"""
+        with self._lock:
+            stats = list(self._stats.values())
+        return [s.to_dict() for s in stats]
+
+    @property
+    def saturated(self) -> bool:
+        """Whether any client has needed more connections than its pool holds"""
+        return any(s["saturated_requests"] > 0 for s in self.stats())
+
+    def clear(self) -> None:
+        """Remove all clients from the pool"""
+        with self._lock:
+            self._clients.clear()
+            self._stats.clear()
+
+
+_default_pools: dict[int, ClientPool] = {}
+_default_session_pool = None
+_default_pool_lock = Lock()
+
+
+def get_default_client_pool(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> ClientPool:
+    """
+    Return a process-wide client pool sized for `max_concurrency` requests at once,
+    used by default by OrganizationDataBuilder.Connect(). The pools for each size
+    share sessions.
+    """
+    global _default_session_pool
+    with _default_pool_lock:
+        if _default_session_pool is None:
+            _default_session_pool = SessionPool()
+        pool = _default_pools.get(max_concurrency)
+        if pool is None:
+            pool = ClientPool(
+                max_concurrency=max_concurrency, session_pool=_default_session_pool
+            )
+            _default_pools[max_concurrency] = pool
+        return pool
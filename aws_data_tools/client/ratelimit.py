@@ -0,0 +1,54 @@
+"""
+Client-side rate limiting for API calls shared across threads
+"""
+
+import logging
+from threading import Lock
+import time
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket that allows `rate` calls per second on average, with
+    bursts of up to `burst` calls
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self) -> float:
+        """Block until a call is allowed. Returns the number of seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            # Reserve the token now and sleep outside the lock, so other threads can
+            # queue up behind this one
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self) -> bool:
+        """Take a token without blocking, and return whether one was available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
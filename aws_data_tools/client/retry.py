@@ -0,0 +1,73 @@
+"""
+Classify API errors and compute backoff delays for retries
+"""
+
+import logging
+import random
+from typing import Any
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "SlowDown",
+    ]
+)
+
+# Errors caused by the caller's credentials or permissions rather than a request
+AUTH_ERROR_CODES = frozenset(
+    [
+        "AccessDenied",
+        "AccessDeniedException",
+        "ExpiredToken",
+        "ExpiredTokenException",
+        "InvalidClientTokenId",
+        "UnrecognizedClientException",
+        "SignatureDoesNotMatch",
+    ]
+)
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20.0
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """Check if an exception is an API error caused by throttling"""
+    # Imported here so importing the module doesn't import botocore
+    from botocore.exceptions import ClientError
+
+    if not isinstance(exc, ClientError):
+        return False
+    return exc.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    """Check if an exception is an API error caused by credentials or permissions"""
+    from botocore.exceptions import ClientError
+
+    if not isinstance(exc, ClientError):
+        return False
+    return exc.response.get("Error", {}).get("Code") in AUTH_ERROR_CODES
+
+
+def retry_attempts(response: dict[str, Any]) -> int:
+    """Return the number of times botocore retried the request for a raw response"""
+    return response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+) -> float:
+    """Return a random delay before a retry, with exponential backoff and full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
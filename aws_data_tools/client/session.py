@@ -0,0 +1,119 @@
+"""
+Pooled boto3 sessions, including sessions for assumed roles with credentials that
+refresh automatically
+"""
+
+import logging
+from threading import Lock
+from typing import Any, Optional
+
+from boto3.session import Session
+from botocore.credentials import RefreshableCredentials
+from botocore.session import get_session
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+_DEFAULT_ROLE_SESSION_NAME = "aws-data-tools"
+_DEFAULT_DURATION_SECONDS = 3600
+
+
+def assume_role_session(
+    role_arn: str,
+    base_session: Session = None,
+    role_session_name: str = _DEFAULT_ROLE_SESSION_NAME,
+    duration_seconds: int = _DEFAULT_DURATION_SECONDS,
+    external_id: str = None,
+    region_name: str = None,
+) -> Session:
+    """
+    Return a session for an assumed role. The credentials are refreshed with another
+    AssumeRole call before they expire, so the session can be used for long crawls.
+    """
+    if base_session is None:
+        base_session = Session()
+    sts = base_session.client("sts")
+    kwargs = {
+        "RoleArn": role_arn,
+        "RoleSessionName": role_session_name,
+        "DurationSeconds": duration_seconds,
+    }
+    if external_id is not None:
+        kwargs["ExternalId"] = external_id
+
+    def refresh() -> dict[str, str]:
+        logging.getLogger(__name__).debug(f"Assuming role {role_arn}")
+        credentials = sts.assume_role(**kwargs)["Credentials"]
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+    botocore_session = get_session()
+    botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+        metadata=refresh(), refresh_using=refresh, method="sts-assume-role"
+    )
+    region_name = region_name or base_session.region_name
+    if region_name is not None:
+        botocore_session.set_config_variable("region", region_name)
+    return Session(botocore_session=botocore_session)
+
+
+class SessionPool:
+    """
+    A thread-safe cache of boto3 sessions, keyed by role ARN or session kwargs, so
+    sessions and their credentials are reused across clients
+    """
+
+    def __init__(self, base_session: Session = None):
+        self.base_session = base_session
+        self._lock = Lock()
+        self._sessions: dict[Any, Session] = {}
+
+    @staticmethod
+    def key(role_arn: str = None, session_kwargs: dict[str, Any] = None, **kwargs):
+        """Return the cache key for a role ARN or session kwargs"""
+        items = {**(session_kwargs or {}), **kwargs}
+        return (role_arn, tuple(sorted(items.items())))
+
+    def get(
+        self,
+        role_arn: str = None,
+        session_kwargs: dict[str, Any] = None,
+        external_id: str = None,
+        region_name: str = None,
+    ) -> Session:
+        """
+        Return a pooled session. If a role ARN is passed, the role is assumed using the
+        base session (or a session created from session_kwargs).
+        """
+        key = self.key(
+            role_arn, session_kwargs, external_id=external_id, region_name=region_name
+        )
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                return session
+            if session_kwargs is not None:
+                kwargs = dict(session_kwargs)
+                if region_name is not None:
+                    kwargs.setdefault("region_name", region_name)
+                session = Session(**kwargs)
+            else:
+                session = self.base_session or Session(region_name=region_name)
+            if role_arn is not None:
+                session = assume_role_session(
+                    role_arn,
+                    base_session=session,
+                    external_id=external_id,
+                    region_name=region_name,
+                )
+            self._sessions[key] = session
+            return session
+
+    def clear(self) -> None:
+        """Remove all sessions from the pool"""
+        with self._lock:
+            self._sessions.clear()
@@ -0,0 +1,134 @@
+"""
+Coalescing of identical API calls that are in flight at the same time, so concurrent
+callers share one request and its result
+"""
+
+import asyncio
+from collections import Counter
+from copy import deepcopy
+from dataclasses import dataclass, field
+import json
+import logging
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from weakref import WeakKeyDictionary
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# Only calls to read-only actions are coalesced. Identical calls to other actions are
+# separate requests, so each one takes effect.
+READ_ONLY_PREFIXES = ("describe_", "get_", "list_")
+
+
+def is_read_only(func: str) -> bool:
+    """Check if a named API action only reads data, from its name"""
+    return func.startswith(READ_ONLY_PREFIXES)
+
+
+def call_key(func: str, kwargs: dict[str, Any]) -> tuple[str, str]:
+    """Return a key for an API call that's equal for calls with equal kwargs"""
+    return func, json.dumps(kwargs, sort_keys=True, default=str)
+
+
+@dataclass
+class _Flight:
+    """A call in flight, and its outcome (or asyncio task) once it completes"""
+
+    done: Event = field(default_factory=Event)
+    result: Any = field(default=None)
+    error: Optional[BaseException] = field(default=None)
+    waiters: int = field(default=0)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that make a call with the same key
+    as one in flight wait for it and get a copy of its result, or its error, instead of
+    making their own. Works for threads, and for asyncio tasks with `do_async()`.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._tasks: WeakKeyDictionary = WeakKeyDictionary()
+        self._calls: Counter = Counter()
+        self._coalesced: Counter = Counter()
+
+    def __count(self, key: Hashable, coalesced: bool) -> None:
+        name = key[0] if isinstance(key, tuple) else key
+        if coalesced:
+            self._coalesced[name] += 1
+        else:
+            self._calls[name] += 1
+
+    def __forget(self, tasks: dict[Hashable, _Flight], key: Hashable) -> None:
+        with self._lock:
+            tasks.pop(key, None)
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Call a function, or wait for the call in flight with the same key"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+            self.__count(key, coalesced=not leader)
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # Each caller gets its own copy, so changes don't leak between them
+            return deepcopy(flight.result)
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return deepcopy(flight.result) if flight.waiters > 0 else flight.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await a coroutine function, or wait for the call in flight in the same event
+        loop with the same key. Only coalesced calls are counted, since the function
+        usually makes its call through `do()`, which counts it.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            flight = tasks.get(key)
+            leader = flight is None
+            if leader:
+                flight = tasks[key] = _Flight()
+                flight.result = loop.create_task(func())
+                flight.result.add_done_callback(lambda _: self.__forget(tasks, key))
+            else:
+                flight.waiters += 1
+                self.__count(key, coalesced=True)
+        # Shielded, so a cancelled caller doesn't cancel the call for the others
+        result = await asyncio.shield(flight.result)
+        return deepcopy(result) if flight.waiters > 0 else result
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Return the number of calls made and the number coalesced into a call in flight,
+        by API action
+        """
+        with self._lock:
+            names = sorted(set(self._calls) | set(self._coalesced))
+            return {
+                name: {"calls": self._calls[name], "coalesced": self._coalesced[name]}
+                for name in names
+            }
+
+    @property
+    def coalesced(self) -> int:
+        """The total number of calls that were coalesced into a call in flight"""
+        with self._lock:
+            return sum(self._coalesced.values())
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import time
+from unittest import mock
+
+from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+import pytest
+
+from aws_data_tools.client import APIClient, Cassette, ReplayProfile
+from aws_data_tools.client.cassette import CassetteMiss
+from aws_data_tools.client.retry import is_throttling_error
+from aws_data_tools.conftest import EffectivePolicyApiClient
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+
+@pytest.fixture
+def cassette_path(
+    tmp_path, apiclient_session_kwargs, organizations_client, seeded_organization
+) -> str:
+    """A cassette recorded from a crawl of the seeded organization"""
+    path = str(tmp_path / "organization.json.gz")
+    with Cassette.record(path) as cassette:
+        client = EffectivePolicyApiClient(
+            "organizations", session_kwargs=apiclient_session_kwargs, cassette=cassette
+        )
+        odb = OrganizationDataBuilder(
+            client=client, include_account_parents=True, init_all=True
+        )
+        with pytest.raises(ClientError):
+            client.api("describe_account", account_id="000000000000")
+    (tmp_path / "organization.json").write_text(odb.to_json())
+    return path
+
+
+def replay_client(path: str, **kwargs) -> APIClient:
+    return APIClient(
+        "organizations",
+        cassette=Cassette.replay(path, ReplayProfile(**kwargs)),
+        coalesce=False,
+    )
+
+
+class TestCassette:
+    """Test recording API calls and replaying them offline"""
+
+    def test_replay_crawl(self, cassette_path, tmp_path):
+        client = EffectivePolicyApiClient(
+            "organizations", cassette=Cassette.replay(cassette_path)
+        )
+        # Replaying doesn't make any requests
+        with mock.patch.object(
+            BaseClient, "_make_api_call", side_effect=AssertionError
+        ):
+            odb = OrganizationDataBuilder(
+                client=client, include_account_parents=True, init_all=True
+            )
+            with pytest.raises(ClientError) as exc_info:
+                client.api("describe_account", account_id="000000000000")
+            with pytest.raises(CassetteMiss):
+                client.api("describe_account", account_id="111111111111")
+        assert odb.to_json() == (tmp_path / "organization.json").read_text()
+        assert exc_info.value.response["Error"]["Code"] == "AccountNotFoundException"
+        # Timestamps are replayed as parsed by botocore
+        accounts = client.raw_api("list_accounts")
+        assert isinstance(accounts[0]["JoinedTimestamp"], datetime)
+        stats = client.cassette.stats()
+        assert stats["describe_account"] == {"requests": 1, "throttled": 0}
+        assert stats["list_roots"] == {"requests": 1, "throttled": 0}
+
+    def test_latency(self, cassette_path):
+        client = replay_client(cassette_path, latency=0.1)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: client.api("list_roots"), range(4)))
+        # Requests wait concurrently
+        assert 0.1 <= time.perf_counter() - start < 0.3
+
+    def test_throttling(self, cassette_path):
+        client = replay_client(
+            cassette_path, rate_limit=20, max_attempts=10, base_delay=0.05
+        )
+        for _ in range(3):
+            client.api("list_roots")
+        assert client.cassette.stats()["list_roots"]["throttled"] > 0
+        client = replay_client(cassette_path, rate_limit=1, max_attempts=1)
+        client.api("list_roots")
+        with pytest.raises(ClientError) as exc_info:
+            client.api("list_roots")
+        assert is_throttling_error(exc_info.value)
+        assert exc_info.value.operation_name == "ListRoots"
+
+    def test_modes(self, tmp_path):
+        with pytest.raises(ValueError):
+            Cassette(str(tmp_path / "cassette.json.gz"), mode="rewind")
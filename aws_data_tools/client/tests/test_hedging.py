@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Event, Lock, Thread
+import time
+
+import pytest
+
+from aws_data_tools.client import APIClient, HedgingPolicy
+from aws_data_tools.utils.tags import query_tags
+
+
+class FakeOrganizationsHandler(BaseHTTPRequestHandler):
+    """
+    Answers ListTagsForResource requests with a tag per page, over the server's number
+    of `pages`. The first request for each (resource ID, page) in the server's
+    `stalls` stalls, and requests sent again for it don't.
+    """
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        page = int(request.get("NextToken", 1))
+        key = (request["ResourceId"], page)
+        with self.server.lock:
+            self.server.requests += 1
+            stall = key in self.server.stalls
+            self.server.stalls.discard(key)
+        if stall:
+            self.server.release.wait(5)
+        response = {"Tags": [{"Key": f"tag{page}", "Value": "sre"}]}
+        if page < self.server.pages:
+            response["NextToken"] = str(page + 1)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_endpoint():
+    """A local Organizations endpoint that can stall selected requests"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOrganizationsHandler)
+    server.daemon_threads = True
+    server.lock = Lock()
+    server.requests = 0
+    server.pages = 1
+    server.stalls = set()
+    server.release = Event()
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def sleeper(seconds: float, result: str = "ok"):
+    def func():
+        time.sleep(seconds)
+        return result
+
+    return func
+
+
+def warm_up(policy: HedgingPolicy, action: str = "op", n: int = 10) -> None:
+    for _ in range(n):
+        policy.call(action, sleeper(0.001))
+
+
+class TestHedgingPolicy:
+    """Test hedging slow calls"""
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            HedgingPolicy(percentile=100)
+        with pytest.raises(ValueError):
+            HedgingPolicy(max_hedge_rate=2)
+
+    def test_delay(self):
+        policy = HedgingPolicy(min_samples=10, min_delay=0.05)
+        assert policy.delay("op") is None
+        warm_up(policy)
+        assert policy.delay("op") == 0.05
+        assert policy.delay("other") is None
+
+    def test_hedge_wins(self):
+        policy = HedgingPolicy(min_samples=10, max_hedge_rate=0.5)
+        warm_up(policy)
+        attempts = []
+
+        def func():
+            attempts.append(1)
+            # The first attempt stalls, the hedge returns right away
+            time.sleep(1 if len(attempts) == 1 else 0)
+            return len(attempts)
+
+        start = time.monotonic()
+        assert policy.call("op", func) == 2
+        assert time.monotonic() - start < 0.5
+        stats = policy.stats()["op"]
+        assert (stats["calls"], stats["hedged"], stats["hedge_won"]) == (11, 1, 1)
+        policy.shutdown()
+
+    def test_budget(self):
+        policy = HedgingPolicy(min_samples=10, max_hedge_rate=0.1)
+        warm_up(policy)
+        # 11 calls allow one hedge, so the second slow call isn't hedged
+        policy.call("op", sleeper(0.05))
+        policy.call("op", sleeper(0.2))
+        stats = policy.stats()["op"]
+        assert (stats["hedged"], stats["over_budget"]) == (1, 1)
+
+    def test_fast_error_not_hedged(self):
+        policy = HedgingPolicy(min_samples=10, max_hedge_rate=1)
+        warm_up(policy)
+
+        def fail():
+            raise RuntimeError("failed")
+
+        with pytest.raises(RuntimeError):
+            policy.call("op", fail)
+        assert policy.stats()["op"]["hedged"] == 0
+
+    def test_queued_time_not_counted(self):
+        policy = HedgingPolicy(min_samples=10, max_hedge_rate=1, max_workers=1)
+        warm_up(policy)
+        # The call waits for the only worker, busy with a slow call to another
+        # action, then returns quickly, so it isn't hedged
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(policy.call, "slow", sleeper(0.2))
+            time.sleep(0.05)
+            assert policy.call("op", sleeper(0.001)) == "ok"
+        assert policy.stats()["op"]["hedged"] == 0
+        assert policy.delay("op") < 0.1
+
+
+def hedged_client(fake_endpoint, policy: HedgingPolicy) -> APIClient:
+    return APIClient(
+        "organizations",
+        client_kwargs={
+            "endpoint_url": f"http://127.0.0.1:{fake_endpoint.server_port}",
+            "region_name": "us-east-1",
+        },
+        hedging=policy,
+    )
+
+
+class TestClientHedging:
+    """Test hedging calls made with an APIClient"""
+
+    def test_stalled_requests_hedged(self, aws_credentials, fake_endpoint):
+        # The 25th, 35th, and 45th lookups stall until the end of the test. Other
+        # requests are rarely slow enough to be hedged, but can be, so hedge counts
+        # are checked against bounds.
+        fake_endpoint.stalls = {(f"{i:012d}", 1) for i in [25, 35, 45]}
+        policy = HedgingPolicy(min_samples=20, max_hedge_rate=0.2, min_delay=0.05)
+        client = hedged_client(fake_endpoint, policy)
+        start = time.monotonic()
+        for i in range(1, 51):
+            tags = client.api("list_tags_for_resource", resource_id=f"{i:012d}")
+            assert tags == [{"key": "tag1", "value": "sre"}]
+        assert time.monotonic() - start < 4
+        stats = policy.stats()["list_tags_for_resource"]
+        assert stats["calls"] == 50
+        assert stats["hedge_won"] >= 3
+        assert stats["hedged"] <= policy.max_hedge_rate * stats["calls"]
+
+    def test_stalled_tag_page_hedged(self, aws_credentials, fake_endpoint):
+        # The second page of the 15th lookup stalls until the end of the test
+        fake_endpoint.pages = 2
+        fake_endpoint.stalls = {(f"{15:012d}", 2)}
+        policy = HedgingPolicy(min_samples=20, max_hedge_rate=0.1, min_delay=0.05)
+        client = hedged_client(fake_endpoint, policy)
+        start = time.monotonic()
+        for i in range(1, 21):
+            tags = query_tags(client, f"{i:012d}")
+            assert tags == {"tag1": "sre", "tag2": "sre"}
+        assert time.monotonic() - start < 4
+        stats = policy.stats()["list_tags_for_resource"]
+        assert stats["calls"] == 40
+        assert 1 <= stats["hedge_won"] <= stats["hedged"]
+        assert stats["hedged"] <= policy.max_hedge_rate * stats["calls"]
+        # Pages were sent again one at a time, not by repeating the whole lookup
+        assert 40 + stats["hedge_won"] <= fake_endpoint.requests
+        assert fake_endpoint.requests <= 40 + stats["hedged"]
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.session import Session
+from botocore.config import Config
+from moto import mock_aws
+import pytest
+
+from aws_data_tools.client import APIClient, ClientPool, get_default_client_pool
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+
+@pytest.fixture
+def session(aws_credentials):
+    return Session(region_name="us-east-1")
+
+
+class TestClientPool:
+    """Test the ClientPool class"""
+
+    def test_clients_are_shared(self, session):
+        pool = ClientPool(max_concurrency=32)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(
+                    lambda _: pool.get("organizations", session=session), range(16)
+                )
+            )
+        assert all(client is clients[0] for client in clients)
+        other_region = pool.get(
+            "organizations", session=session, region_name="us-west-2"
+        )
+        assert other_region is not clients[0]
+        assert len(pool.stats()) == 2
+
+    def test_clients_keyed_by_credentials(self, session):
+        pool = ClientPool()
+        other = Session(
+            aws_access_key_id="other",
+            aws_secret_access_key="other",
+            region_name="us-east-1",
+        )
+        assert pool.get("organizations", session=session) is not pool.get(
+            "organizations", session=other
+        )
+
+    def test_config(self, session):
+        pool = ClientPool(max_concurrency=32, config=Config(read_timeout=5))
+        client = pool.get("organizations", session=session)
+        assert client.meta.config.max_pool_connections == 32
+        assert client.meta.config.tcp_keepalive is True
+        assert client.meta.config.read_timeout == 5
+
+    def test_clients_keyed_by_config_values(self, session):
+        pool = ClientPool()
+        client = pool.get(
+            "organizations", session=session, config=Config(read_timeout=5)
+        )
+        assert (
+            pool.get("organizations", session=session, config=Config(read_timeout=5))
+            is client
+        )
+        assert (
+            pool.get("organizations", session=session, config=Config(read_timeout=6))
+            is not client
+        )
+
+    def test_default_pools(self, aws_credentials):
+        pool = get_default_client_pool()
+        assert get_default_client_pool() is pool
+        large = get_default_client_pool(32)
+        assert large.max_concurrency == 32
+        assert large.session_pool is pool.session_pool
+        # Builders size the default pool for their workers
+        odb = OrganizationDataBuilder(max_workers=32)
+        odb.Connect()
+        assert odb.client.client.meta.config.max_pool_connections == 32
+
+    def test_stats(self, session):
+        pool = ClientPool(max_concurrency=2)
+        with mock_aws():
+            client = APIClient("organizations", session=session, client_pool=pool)
+            client.api("create_organization", feature_set="ALL")
+            client.api("describe_organization")
+        [stats] = pool.stats()
+        assert stats["requests"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["peak_in_flight"] == 1
+        assert stats["saturated_requests"] == 0
+        assert pool.saturated is False
+
+    def test_saturation(self, session):
+        pool = ClientPool(max_concurrency=2)
+        client = pool.get("organizations", session=session)
+        # Simulate 3 requests in flight at once
+        for _ in range(3):
+            client.meta.events.emit("before-send.organizations.ListRoots", request=None)
+        [stats] = pool.stats()
+        assert stats["peak_in_flight"] == 3
+        assert stats["saturated_requests"] == 1
+        assert stats["utilization"] == 1.5
+        assert pool.saturated is True
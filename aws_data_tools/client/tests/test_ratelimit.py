@@ -0,0 +1,59 @@
+from unittest import mock
+
+import pytest
+
+from aws_data_tools.client import APIClient, RateLimiter
+
+
+class TestRateLimiter:
+    """Test the RateLimiter class"""
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+    def test_burst_then_wait(self):
+        clock = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        with mock.patch("time.monotonic", lambda: clock[0]), mock.patch(
+            "time.sleep", sleep
+        ):
+            limiter = RateLimiter(rate=2, burst=2)
+            assert limiter.acquire() == 0
+            assert limiter.acquire() == 0
+            assert limiter.acquire() == pytest.approx(0.5)
+            clock[0] += 1
+            assert limiter.acquire() == 0
+        assert sleeps == [pytest.approx(0.5)]
+
+    def test_try_acquire(self):
+        clock = [100.0]
+        with mock.patch("time.monotonic", lambda: clock[0]):
+            limiter = RateLimiter(rate=2, burst=1)
+            assert limiter.try_acquire()
+            assert not limiter.try_acquire()
+            clock[0] += 0.5
+            assert limiter.try_acquire()
+
+    def test_client_throttles_each_page(self, aws_credentials):
+        client = APIClient(
+            "organizations", client_kwargs={"region_name": "us-east-1"}, rate_limit=10
+        )
+        pages = [
+            {"Accounts": [{"Id": "1"}], "NextToken": "page2"},
+            {"Accounts": [{"Id": "2"}]},
+        ]
+        with mock.patch.object(
+            client.client, "list_accounts", side_effect=pages
+        ) as list_accounts, mock.patch.object(
+            client._rate_limiter, "acquire"
+        ) as acquire:
+            assert client.api("list_accounts") == [{"id": "1"}, {"id": "2"}]
+        assert list_accounts.call_args.kwargs["NextToken"] == "page2"
+        # One call per page
+        assert acquire.call_count == 2
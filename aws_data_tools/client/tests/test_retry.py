@@ -0,0 +1,16 @@
+from botocore.exceptions import ClientError
+
+from aws_data_tools.client import is_throttling_error
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code}}, "DescribeEffectivePolicy")
+
+
+class TestRetry:
+    """Test classifying API errors for retries"""
+
+    def test_is_throttling_error(self):
+        assert is_throttling_error(client_error("TooManyRequestsException"))
+        assert not is_throttling_error(client_error("AccessDeniedException"))
+        assert not is_throttling_error(ValueError())
@@ -0,0 +1,141 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import time
+from unittest import mock
+
+import pytest
+
+from aws_data_tools.client import APIClient, SingleFlight
+
+
+def blocking_client(release: Event, response: dict) -> mock.Mock:
+    """A mock botocore client whose calls block until `release` is set"""
+    client = mock.Mock()
+    client.can_paginate.return_value = False
+
+    def call(**kwargs):
+        release.wait(5)
+        return response
+
+    client.describe_organization.side_effect = call
+    client.create_account.side_effect = call
+    return client
+
+
+class TestSingleFlight:
+    """Test coalescing identical calls in flight"""
+
+    def test_threads_share_one_call(self):
+        release = Event()
+        calls = []
+        flight = SingleFlight()
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return {"id": "o-1"}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, ("op", "{}"), func) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+        assert len(calls) == 1
+        assert results == [{"id": "o-1"}] * 4
+        # Callers get their own copies
+        assert len({id(r) for r in results}) == 4
+        assert flight.stats() == {"op": {"calls": 1, "coalesced": 3}}
+        assert flight.coalesced == 3
+        # Calls after the one in flight completes are made again
+        flight.do(("op", "{}"), func)
+        assert len(calls) == 2
+
+    def test_error_shared(self):
+        release = Event()
+        flight = SingleFlight()
+
+        def func():
+            release.wait(5)
+            raise RuntimeError("failed")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "op", func) for _ in range(3)]
+            time.sleep(0.1)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+    def test_async_tasks_share_one_call(self):
+        calls = []
+        flight = SingleFlight()
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ["r-1"]
+
+        async def main():
+            return await asyncio.gather(
+                *[flight.do_async(("op", "{}"), func) for _ in range(5)]
+            )
+
+        assert asyncio.run(main()) == [["r-1"]] * 5
+        assert len(calls) == 1
+        assert flight.stats() == {"op": {"calls": 0, "coalesced": 4}}
+
+
+class TestClientCoalescing:
+    """Test coalescing calls made with an APIClient"""
+
+    def call_all(self, client: APIClient, release: Event, func: str) -> list:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(client.api, func) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            return [f.result() for f in futures]
+
+    def test_read_only_calls_coalesced(self, aws_credentials):
+        release = Event()
+        response = {"Organization": {"Id": "o-1"}}
+        client = APIClient("organizations", client=blocking_client(release, response))
+        results = self.call_all(client, release, "describe_organization")
+        assert results == [{"organization": {"id": "o-1"}}] * 4
+        assert client.client.describe_organization.call_count == 1
+        assert client.coalescing_stats() == {
+            "describe_organization": {"calls": 1, "coalesced": 3}
+        }
+
+    def test_other_calls_not_coalesced(self, aws_credentials):
+        release = Event()
+        client = APIClient("organizations", client=blocking_client(release, {}))
+        self.call_all(client, release, "create_account")
+        assert client.client.create_account.call_count == 4
+        assert client.coalescing_stats() == {}
+
+    def test_disabled(self, aws_credentials):
+        release = Event()
+        client = APIClient(
+            "organizations", client=blocking_client(release, {}), coalesce=False
+        )
+        self.call_all(client, release, "describe_organization")
+        assert client.client.describe_organization.call_count == 4
+
+    def test_api_async(self, aws_credentials):
+        release = Event()
+        response = {"Organization": {"Id": "o-1"}}
+        client = APIClient("organizations", client=blocking_client(release, response))
+
+        async def main():
+            tasks = [
+                asyncio.create_task(client.api_async("describe_organization"))
+                for _ in range(4)
+            ]
+            await asyncio.sleep(0.1)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        assert asyncio.run(main()) == [{"organization": {"id": "o-1"}}] * 4
+        assert client.client.describe_organization.call_count == 1
+        assert client.coalescing_stats()["describe_organization"]["coalesced"] == 3
@@ -1,11 +1,119 @@
+from collections import Counter
+import json
 import os
 from pathlib import Path
+from threading import Lock, local
 
+from botocore.exceptions import ClientError
+from moto import mock_aws
 import pytest
 
+from aws_data_tools.client import APIClient
 
 FIXTURES_PATH = Path(__file__).parent.absolute() / "fixtures"
 
+# Policies seeded into the test organization, keyed by name. Each is attached to the
+# listed OU paths or account names.
+SEEDED_POLICIES = {
+    "RootTags": {
+        "type": "TAG_POLICY",
+        "content": {"tags": {"costcenter": {"tag_key": {"@@assign": "CostCenter"}}}},
+        "targets": ["/"],
+    },
+    "LargeBuTags": {
+        "type": "TAG_POLICY",
+        "content": {"tags": {"team": {"tag_key": {"@@assign": "Team"}}}},
+        "targets": ["/Large BU"],
+    },
+    "ServicesOptOut": {
+        "type": "AISERVICES_OPT_OUT_POLICY",
+        "content": {
+            "services": {"default": {"opt_out_policy": {"@@assign": "optOut"}}}
+        },
+        "targets": ["/GrumpySysadmins/Services"],
+    },
+    "ForgottenChildTags": {
+        "type": "TAG_POLICY",
+        "content": {"tags": {"owner": {"tag_key": {"@@assign": "Owner"}}}},
+        "targets": ["acmeinc-forgotten-child"],
+    },
+}
+
+
+def read_paths(filename: str) -> list[str]:
+    """Read a fixture file containing a list of OU or account paths"""
+    with open(FIXTURES_PATH / filename, "r") as f:
+        return [line.rstrip("\n") for line in f.readlines() if line.strip() != ""]
+
+
+def parent_path(path: str) -> str:
+    """Return the parent path for an OU or account path"""
+    parent = path.rsplit("/", 1)[0]
+    return "/" if parent == "" else parent
+
+
+class EffectivePolicyApiClient(APIClient):
+    """
+    An APIClient that counts calls and emulates DescribeEffectivePolicy, which moto
+    doesn't implement. The emulated policy content lists the policies of the requested
+    type attached at each level of the target's ancestor path. Calls made to emulate
+    DescribeEffectivePolicy aren't counted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = Counter()
+        self._calls_lock = Lock()
+        self._local = local()
+
+    def count(self, func: str) -> None:
+        if not getattr(self._local, "emulating", False):
+            with self._calls_lock:
+                self.calls[func] += 1
+
+    def iter_pages(self, func: str, **kwargs):
+        self.count(func)
+        return super().iter_pages(func, **kwargs)
+
+    def api(self, func: str, **kwargs):
+        if func == "describe_effective_policy":
+            self.count(func)
+            self._local.emulating = True
+            try:
+                return self.describe_effective_policy(**kwargs)
+            finally:
+                self._local.emulating = False
+        return super().api(func, **kwargs)
+
+    def attached(self, policy_type: str, target_id: str) -> list[str]:
+        """Return the IDs of policies of a type attached directly to a target"""
+        data = super().api(
+            "list_policies_for_target", target_id=target_id, filter=policy_type
+        )
+        return sorted(policy["id"] for policy in data)
+
+    def describe_effective_policy(self, policy_type: str, target_id: str):
+        levels = []
+        node_id = target_id
+        while node_id is not None:
+            levels.insert(0, self.attached(policy_type, node_id))
+            parents = super().api("list_parents", child_id=node_id)
+            node_id = parents[0]["id"] if len(parents) > 0 else None
+        levels = [level for level in levels if len(level) > 0]
+        if len(levels) == 0:
+            raise ClientError(
+                {"Error": {"Code": "EffectivePolicyNotFoundException"}},
+                "DescribeEffectivePolicy",
+            )
+        return {
+            "effective_policy": {
+                "last_updated_timestamp": "2021-11-23 00:00:00+00:00",
+                "policy_content": json.dumps(levels),
+                "policy_type": policy_type,
+                "target_id": target_id,
+            }
+        }
+
 
 @pytest.fixture(scope="session")
 def apiclient_client_kwargs():
@@ -28,3 +136,57 @@ def aws_credentials():
     os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
     os.environ["AWS_SECURITY_TOKEN"] = "testing"
     os.environ["AWS_SESSION_TOKEN"] = "testing"
+
+
+@pytest.fixture
+def organizations_client(aws_credentials, apiclient_session_kwargs):
+    """A call-counting Organizations client backed by moto"""
+    with mock_aws():
+        yield EffectivePolicyApiClient(
+            "organizations", session_kwargs=apiclient_session_kwargs
+        )
+
+
+@pytest.fixture
+def seeded_organization(organizations_client) -> dict[str, str]:
+    """
+    Create a test organization from the OU and account path fixtures, with the
+    policies in SEEDED_POLICIES attached. Returns a map of path or name to node ID.
+    """
+    client = organizations_client
+    client.api("create_organization", feature_set="ALL")
+    root_id = client.api("list_roots")[0]["id"]
+    for policy_type in ["AISERVICES_OPT_OUT_POLICY", "TAG_POLICY"]:
+        client.api("enable_policy_type", root_id=root_id, policy_type=policy_type)
+    ids = {"/": root_id}
+    for path in read_paths("ou_paths.txt"):
+        ids[path] = client.api(
+            "create_organizational_unit",
+            name=path.rsplit("/", 1)[1],
+            parent_id=ids[parent_path(path)],
+        )["organizational_unit"]["id"]
+    for path in read_paths("account_paths.txt"):
+        name = path.rsplit("/", 1)[1]
+        account_id = client.api(
+            "create_account", account_name=name, email=f"{name}@example.com"
+        )["create_account_status"]["account_id"]
+        client.api(
+            "move_account",
+            account_id=account_id,
+            destination_parent_id=ids[parent_path(path)],
+            source_parent_id=root_id,
+        )
+        ids[name] = account_id
+    for name, policy in SEEDED_POLICIES.items():
+        policy_id = client.api(
+            "create_policy",
+            content=json.dumps(policy["content"]),
+            description=name,
+            name=name,
+            type=policy["type"],
+        )["policy"]["policy_summary"]["id"]
+        ids[name] = policy_id
+        for target in policy["targets"]:
+            client.api("attach_policy", policy_id=policy_id, target_id=ids[target])
+    client.calls.clear()
+    return ids
@@ -4,10 +4,35 @@ Package containing dataclass representations of AWS API data
 
 # flake8: noqa: F401
 
-from . import (
-    base,
-    config,
-    organizations,
-    sns,
-    sqs,
+from typing import TYPE_CHECKING
+
+from ..utils.imports import lazy_loader
+
+# Submodules are imported on first access, so using one model doesn't import the
+# dependencies of all the others
+__getattr__, __dir__, __all__ = lazy_loader(
+    __name__,
+    submodules=[
+        "base",
+        "checkpoint",
+        "config",
+        "crawler",
+        "diff",
+        "dot",
+        "effective_policies",
+        "export",
+        "lazy",
+        "organizations",
+        "phases",
+        "planner",
+        "policy_documents",
+        "policy_loader",
+        "snapshot",
+        "sns",
+        "sqs",
+        "streaming",
+    ],
 )
+
+if TYPE_CHECKING:  # pragma: no cover
+    from . import base, config, organizations, sns, sqs
@@ -2,28 +2,65 @@
 Base classes for data models
 """
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, fields
 import json
 import logging
 from typing import Any, Union
 
 from dacite import from_dict
-from humps import decamelize, depascalize
-import yaml
 
-from ..utils.dynamodb import serialize_dynamodb_item, serialize_dynamodb_items
+from ..utils.casing import snake_keys
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
+def add_slots(cls: type) -> type:
+    """
+    Recreate a dataclass with __slots__ for its fields, so instances don't carry a
+    per-instance __dict__. Equivalent to `@dataclass(slots=True)`, which requires
+    Python 3.10. Must be applied on top of the @dataclass decorator.
+    """
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # Remove default values, which would otherwise conflict with the slots
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    slotted = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted.__qualname__ = cls.__qualname__
+    # Point any closures that reference the original class (e.g., the __class__ cell
+    # used by zero-argument super()) at the new class
+    for value in cls_dict.values():
+        if isinstance(value, property):
+            funcs = [value.fget, value.fset, value.fdel]
+        else:
+            funcs = [getattr(value, "__func__", value)]
+        for func in funcs:
+            for cell in getattr(func, "__closure__", None) or []:
+                if cell.cell_contents is cls:
+                    cell.cell_contents = slotted
+    return slotted
+
+
 @dataclass
 class ModelBase:
     """Base class for all models with helpers for serialization"""
 
+    # Allows subclasses to use add_slots(). Subclasses without slots still get a
+    # __dict__ as usual.
+    __slots__ = ()
+
     @classmethod
-    def from_dict(cls, data: dict[str, Any], **kwargs):
-        """Initialize the model from a dictionary"""
-        return from_dict(data_class=cls, data=decamelize(depascalize(data)), **kwargs)
+    def from_dict(cls, data: dict[str, Any], convert_keys: bool = True, **kwargs):
+        """
+        Initialize the model from a dictionary. Keys are converted to snake_case unless
+        `convert_keys` is False, e.g., for data that was serialized with `to_dict()`.
+        """
+        if convert_keys:
+            data = snake_keys(data)
+        return from_dict(data_class=cls, data=data, **kwargs)
 
     def to_dict(
         self, field_name: str = None
@@ -53,6 +90,9 @@ class ModelBase:
         self, **kwargs
     ) -> Union[dict[str, Any], list[dict[str, Any]]]:  # pragma: no cover
         """Serialize the dataclass or field to a DynamoDB Item or list of Items"""
+        # Imported here since the serializers depend on boto3
+        from ..utils.dynamodb import serialize_dynamodb_item, serialize_dynamodb_items
+
         data = self.to_dict(**kwargs)
         if isinstance(data, list):
             return serialize_dynamodb_items(items=data)
@@ -77,6 +117,8 @@ class ModelBase:
 
     def to_yaml(self, escape: bool = False, **kwargs) -> str:  # pragma: no cover
         """Serialize the dataclass instance to a YAML string"""
+        import yaml
+
         data = yaml.dump(self.to_dict(**kwargs))
         if escape:
             return data.replace('"', '"').replace("\n", "\\n")
@@ -87,4 +129,6 @@ class ModelBase:
         """Deserialize the YAML string to an instance of the dataclass"""
         # Try to remove any escape characters from the string based on the assumption
         # that it could have escape characters
+        import yaml
+
         return cls.from_dict(yaml.safe_load(s.replace('\\"', '"')), **kwargs)
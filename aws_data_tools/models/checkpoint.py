@@ -0,0 +1,96 @@
+"""
+Checkpoint completed fetch units to a local journal so an interrupted crawl can resume
+"""
+
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Optional
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+JOURNAL_FILENAME = "journal.ndjson"
+
+
+def checkpoint_key(*parts: Any) -> str:
+    """
+    Return a stable journal key for a unit of work, like an API call and its kwargs
+    """
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class CheckpointJournal:
+    """
+    An append-only journal of completed fetch units, stored as one line of JSON per
+    unit in a directory. Each unit is written and flushed as soon as it completes, so
+    a crawl that dies can be resumed and only the remaining units are fetched.
+
+    With `resume=False`, any existing journal in the directory is discarded. Entries
+    loaded from an existing journal are kept in memory; new entries are only written.
+    """
+
+    def __init__(self, directory: str, resume: bool = True, fsync: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, JOURNAL_FILENAME)
+        self.fsync = fsync
+        self._entries: dict[tuple[str, str], Any] = {}
+        self._lock = Lock()
+        if resume and os.path.exists(self.path):
+            self.__load()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        # A crash can leave a partial last line. Start new entries on a fresh line.
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def __load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.getLogger(__name__).debug(
+                        f"Skipping incomplete journal entry in {self.path}"
+                    )
+                    continue
+                self._entries[(entry["kind"], entry["key"])] = entry["data"]
+        logging.getLogger(__name__).info(
+            f"Resuming from {len(self._entries)} checkpointed units in {self.path}"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, unit: tuple[str, str]) -> bool:
+        return unit in self._entries
+
+    def get(self, kind: str, key: str, default: Any = None) -> Optional[Any]:
+        """Return the data for a unit loaded from the journal"""
+        return self._entries.get((kind, key), default)
+
+    def record(self, kind: str, key: str, data: Any) -> None:
+        """Append a completed unit to the journal"""
+        line = json.dumps(
+            {"kind": kind, "key": key, "data": data},
+            separators=(",", ":"),
+            default=str,
+        )
+        with self._lock:
+            self._file.write(f"{line}\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,159 @@
+"""
+Crawl multiple organizations in parallel, e.g., through roles in each management
+account
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import json
+import logging
+from threading import BoundedSemaphore
+from typing import Any, Iterator, Optional, Union
+
+from ..client import APIClient
+from ..client.pool import ClientPool
+from ..client.session import SessionPool
+from .base import ModelBase
+from .organizations import _SERVICE_NAME, Organization, OrganizationDataBuilder
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+_DEFAULT_BUILDER_KWARGS = {"init_all": True, "include_account_parents": True}
+
+
+@dataclass
+class OrganizationTarget(ModelBase):
+    """
+    How to connect to an organization's management (or delegated administrator)
+    account: a role to assume, explicit session kwargs (credentials or a profile), or
+    both. With neither, the default credentials are used.
+    """
+
+    role_arn: Optional[str] = field(default=None)
+    session_kwargs: Optional[dict[str, Any]] = field(default=None, repr=False)
+    external_id: Optional[str] = field(default=None, repr=False)
+    region_name: Optional[str] = field(default=None)
+
+    # A label for the organization in results. Defaults to the role ARN.
+    name: Optional[str] = field(default=None)
+
+    @property
+    def key(self) -> str:
+        """The key for the organization in crawl results"""
+        return self.name or self.role_arn or "default"
+
+
+def organization_records(key: str, organization: Organization) -> Iterator[dict]:
+    """
+    Yield a record for an organization and each of its nodes, labeled with the target
+    key and node type
+    """
+    org_data = organization.to_dict()
+    nodes = {
+        "ROOT": org_data.pop("root", None),
+        "ORGANIZATIONAL_UNIT": org_data.pop("organizational_units", None),
+        "ACCOUNT": org_data.pop("accounts", None),
+        "POLICY": org_data.pop("policies", None),
+    }
+    yield {"organization": key, "node_type": "ORGANIZATION", "data": org_data}
+    for node_type, data in nodes.items():
+        if data is None:
+            continue
+        for node in data if isinstance(data, list) else [data]:
+            yield {"organization": key, "node_type": node_type, "data": node}
+
+
+@dataclass
+class OrganizationCrawler:
+    """
+    Crawls a list of organizations in parallel threads. Sessions are pooled and shared
+    across crawls, assumed role credentials refresh before they expire, and the total
+    number of API requests in flight across all organizations is capped by
+    `max_concurrency`.
+    """
+
+    targets: list[Union[str, OrganizationTarget]]
+
+    # Number of organizations crawled at once
+    max_workers: int = field(default=4)
+    # Number of API requests in flight at once, across all organizations
+    max_concurrency: int = field(default=16)
+
+    # Passed to OrganizationDataBuilder to control what data to fetch
+    builder_kwargs: dict[str, Any] = field(
+        default_factory=lambda: dict(_DEFAULT_BUILDER_KWARGS)
+    )
+    client_kwargs: Optional[dict[str, Any]] = field(default=None)
+    session_pool: SessionPool = field(default_factory=SessionPool, repr=False)
+    # Defaults to a pool with connections for max_concurrency requests per client
+    client_pool: Optional[ClientPool] = field(default=None, repr=False)
+
+    _semaphore: BoundedSemaphore = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.targets = [
+            OrganizationTarget(role_arn=t) if isinstance(t, str) else t
+            for t in self.targets
+        ]
+        keys = [target.key for target in self.targets]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Organization targets must have unique names")
+        self._semaphore = BoundedSemaphore(self.max_concurrency)
+        if self.client_pool is None:
+            self.client_pool = ClientPool(
+                max_concurrency=self.max_concurrency, session_pool=self.session_pool
+            )
+
+    def client_for(self, target: OrganizationTarget) -> APIClient:
+        """Return an Organizations client for a target, using a pooled session"""
+        session = self.session_pool.get(
+            role_arn=target.role_arn,
+            session_kwargs=target.session_kwargs,
+            external_id=target.external_id,
+            region_name=target.region_name,
+        )
+        client = self.client_pool.get(
+            _SERVICE_NAME, session=session, **(self.client_kwargs or {})
+        )
+        return APIClient(
+            _SERVICE_NAME, client=client, session=session, semaphore=self._semaphore
+        )
+
+    def crawl_target(self, target: OrganizationTarget) -> Organization:
+        """Crawl a single organization"""
+        logging.getLogger(__name__).info(f"Crawling organization {target.key}")
+        builder = OrganizationDataBuilder(
+            client=self.client_for(target), **self.builder_kwargs
+        )
+        if builder.dm is None:
+            builder.fetch_organization()
+        return builder.dm
+
+    def iter_crawl(self) -> Iterator[tuple[str, Organization]]:
+        """Crawl all organizations, yielding (key, organization) as each completes"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.crawl_target, target): target.key
+                for target in self.targets
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def crawl(self) -> dict[str, Organization]:
+        """Crawl all organizations and return the models keyed by target"""
+        results = dict(self.iter_crawl())
+        return {target.key: results[target.key] for target in self.targets}
+
+    def iter_ndjson(self) -> Iterator[str]:
+        """
+        Crawl all organizations and yield one line of JSON per node, merged across
+        organizations as each crawl completes
+        """
+        for key, organization in self.iter_crawl():
+            for record in organization_records(key, organization):
+                yield f"{json.dumps(record, default=str)}\n"
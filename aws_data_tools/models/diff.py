@@ -0,0 +1,232 @@
+"""
+Compute typed change sets between two organization models
+"""
+
+from dataclasses import dataclass, field
+import json
+import logging
+from typing import Any, Iterator
+
+from .base import ModelBase
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+ADDED = "ADDED"
+REMOVED = "REMOVED"
+MODIFIED = "MODIFIED"
+MOVED = "MOVED"
+POLICY_ATTACHED = "POLICY_ATTACHED"
+POLICY_DETACHED = "POLICY_DETACHED"
+TAG_ADDED = "TAG_ADDED"
+TAG_REMOVED = "TAG_REMOVED"
+TAG_CHANGED = "TAG_CHANGED"
+
+# Fields compared as plain values for each node type
+_ACCOUNT_FIELDS = [
+    "arn",
+    "email",
+    "joined_method",
+    "joined_timestamp",
+    "name",
+    "status",
+]
+_OU_FIELDS = ["arn", "name"]
+_POLICY_FIELDS = ["arn", "aws_managed", "description", "name", "type"]
+
+
+@dataclass
+class Change(ModelBase):
+    """A single change to a node in an organization"""
+
+    node_id: str
+    node_type: str
+    change_type: str
+
+    attribute: str = field(default=None)
+    old: Any = field(default=None)
+    new: Any = field(default=None)
+
+    def to_ndjson(self) -> str:
+        """Serialize the change as a single line of JSON"""
+        return json.dumps(self.to_dict(), default=str)
+
+
+@dataclass
+class OrganizationDiff(ModelBase):
+    """A set of changes between two organizations"""
+
+    changes: list[Change] = field(default_factory=list)
+
+    def by_node(self) -> dict[str, list[Change]]:
+        """Return changes grouped by node ID"""
+        ret = {}
+        for change in self.changes:
+            ret.setdefault(change.node_id, []).append(change)
+        return ret
+
+    def to_ndjson(self) -> str:
+        """Serialize the changes as newline-delimited JSON"""
+        return "".join(f"{change.to_ndjson()}\n" for change in self.changes)
+
+
+def _parent_id(organization, node) -> str:
+    """Return the parent ID of an OU or account"""
+    parent = node.parent
+    if parent is None and organization._child_parent_tree is not None:
+        parent = organization._child_parent_tree.get(node.id)
+    return None if parent is None else parent.id
+
+
+def _diff_values(
+    node_id: str, node_type: str, name: str, old: Any, new: Any
+) -> Iterator[Change]:
+    if old != new:
+        yield Change(node_id, node_type, MODIFIED, attribute=name, old=old, new=new)
+
+
+def _diff_policies(
+    node_id: str, node_type: str, old: list[Any], new: list[Any]
+) -> Iterator[Change]:
+    """Yield attach/detach changes between two lists of PolicySummaryForTarget"""
+    old_ids = {p.id: p.type for p in old or []}
+    new_ids = {p.id: p.type for p in new or []}
+    for policy_id, policy_type in old_ids.items():
+        if policy_id not in new_ids:
+            yield Change(
+                node_id, node_type, POLICY_DETACHED, policy_type, old=policy_id
+            )
+    for policy_id, policy_type in new_ids.items():
+        if policy_id not in old_ids:
+            yield Change(
+                node_id, node_type, POLICY_ATTACHED, policy_type, new=policy_id
+            )
+
+
+def _diff_tags(
+    node_id: str, node_type: str, old: dict[str, str], new: dict[str, str]
+) -> Iterator[Change]:
+    """Yield tag changes between two tag dicts"""
+    old = old or {}
+    new = new or {}
+    for key, value in old.items():
+        if key not in new:
+            yield Change(node_id, node_type, TAG_REMOVED, attribute=key, old=value)
+        elif new[key] != value:
+            yield Change(
+                node_id, node_type, TAG_CHANGED, attribute=key, old=value, new=new[key]
+            )
+    for key, value in new.items():
+        if key not in old:
+            yield Change(node_id, node_type, TAG_ADDED, attribute=key, new=value)
+
+
+def _effective_policy_map(account) -> dict[str, str]:
+    return {p.policy_type: p.policy_content for p in account.effective_policies or []}
+
+
+def _diff_node(old_org, new_org, node_type: str, old, new) -> Iterator[Change]:
+    """Yield changes between two versions of the same OU, account, or policy"""
+    if node_type == "POLICY":
+        node_id = new.policy_summary.id
+        for name in _POLICY_FIELDS:
+            yield from _diff_values(
+                node_id,
+                node_type,
+                name,
+                getattr(old.policy_summary, name),
+                getattr(new.policy_summary, name),
+            )
+        yield from _diff_values(node_id, node_type, "content", old.content, new.content)
+        yield from _diff_tags(node_id, node_type, old.tags, new.tags)
+        return
+    node_id = new.id
+    fields = _ACCOUNT_FIELDS if node_type == "ACCOUNT" else _OU_FIELDS
+    for name in fields:
+        yield from _diff_values(
+            node_id, node_type, name, getattr(old, name), getattr(new, name)
+        )
+    old_parent = _parent_id(old_org, old)
+    new_parent = _parent_id(new_org, new)
+    if old_parent != new_parent:
+        yield Change(
+            node_id,
+            node_type,
+            MOVED,
+            attribute="parent",
+            old=old_parent,
+            new=new_parent,
+        )
+    yield from _diff_policies(node_id, node_type, old.policies, new.policies)
+    yield from _diff_tags(node_id, node_type, old.tags, new.tags)
+    if node_type == "ACCOUNT":
+        old_effective = _effective_policy_map(old)
+        new_effective = _effective_policy_map(new)
+        for p_type in sorted(set(old_effective) | set(new_effective)):
+            yield from _diff_values(
+                node_id,
+                node_type,
+                f"effective_policies.{p_type}",
+                old_effective.get(p_type),
+                new_effective.get(p_type),
+            )
+
+
+def _diff_root(old_org, new_org) -> Iterator[Change]:
+    old, new = old_org.root, new_org.root
+    if old is None and new is None:
+        return
+    if old is None or new is None or old.id != new.id:
+        if old is not None:
+            yield Change(old.id, "ROOT", REMOVED)
+        if new is not None:
+            yield Change(new.id, "ROOT", ADDED)
+        return
+    old_types = {p.type: p.status for p in old.policy_types or []}
+    new_types = {p.type: p.status for p in new.policy_types or []}
+    for p_type in sorted(set(old_types) | set(new_types)):
+        yield from _diff_values(
+            new.id,
+            "ROOT",
+            f"policy_types.{p_type}",
+            old_types.get(p_type),
+            new_types.get(p_type),
+        )
+    yield from _diff_policies(new.id, "ROOT", old.policies, new.policies)
+    yield from _diff_tags(
+        new.id, "ROOT", getattr(old, "tags", None), getattr(new, "tags", None)
+    )
+
+
+def iter_changes(old_org, new_org) -> Iterator[Change]:
+    """
+    Yield changes from one organization to another. Nodes are matched by ID using each
+    organization's index maps, so this runs in linear time in the number of nodes.
+    """
+    for org in [old_org, new_org]:
+        if None in [
+            org._account_index_map,
+            org._ou_index_map,
+            org._policy_index_map,
+        ]:
+            org.build_indexes()
+    yield from _diff_root(old_org, new_org)
+    for node_type, collection, index_field in [
+        ("ORGANIZATIONAL_UNIT", "organizational_units", "_ou_index_map"),
+        ("ACCOUNT", "accounts", "_account_index_map"),
+        ("POLICY", "policies", "_policy_index_map"),
+    ]:
+        old_nodes = getattr(old_org, collection) or []
+        new_nodes = getattr(new_org, collection) or []
+        old_index = getattr(old_org, index_field) or {}
+        new_index = getattr(new_org, index_field) or {}
+        for node_id in old_index:
+            if node_id not in new_index:
+                yield Change(node_id, node_type, REMOVED)
+        for node_id, i in new_index.items():
+            if node_id not in old_index:
+                yield Change(node_id, node_type, ADDED)
+                continue
+            yield from _diff_node(
+                old_org, new_org, node_type, old_nodes[old_index[node_id]], new_nodes[i]
+            )
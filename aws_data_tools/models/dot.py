@@ -0,0 +1,118 @@
+"""
+Write organizations as GraphViz DOT diagrams in pure Python
+
+Layout hints are added the same way as GraphViz's `unflatten` tool, so wide trees render
+with staggered rows instead of a single very wide one, without piping the source
+through the external binary.
+"""
+
+import logging
+from typing import IO, Any, Iterator
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+DEFAULT_STAGGER = 10
+DEFAULT_CHAIN = 10
+
+SHAPES = {"ROOT": "circle", "ORGANIZATIONAL_UNIT": "box", "ACCOUNT": "ellipse"}
+
+
+def quote(value: Any) -> str:
+    """Return a value as a quoted DOT ID"""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def iter_dot(
+    organization,
+    root_id: str = None,
+    stagger: int = DEFAULT_STAGGER,
+    fanout: bool = True,
+    chain: int = DEFAULT_CHAIN,
+    name: str = "Organization",
+) -> Iterator[str]:
+    """
+    Yield the lines of a DOT digraph of an organization's root, OUs, and accounts, or
+    only the subtree under the node `root_id`.
+
+    Matches `unflatten -l <stagger> [-f] -c <chain>`: the minimum length of edges to
+    leaves (and, with `fanout`, to nodes with a single child) is staggered between 1
+    and `stagger`, and up to `chain` disconnected nodes are linked into chains by
+    invisible edges. Values below 1 disable staggering or chaining.
+    """
+    nodes = {}
+    if organization.root is not None:
+        nodes[organization.root.id] = ("ROOT", organization.root)
+    for n_type, group in [
+        ("ORGANIZATIONAL_UNIT", organization.organizational_units),
+        ("ACCOUNT", organization.accounts),
+    ]:
+        for node in group or []:
+            # Nodes without parent data can't be placed in the tree
+            if node.parent is not None:
+                nodes[node.id] = (n_type, node)
+    children = {}
+    for node_id, (n_type, node) in nodes.items():
+        if n_type != "ROOT" and node.parent.id in nodes:
+            children.setdefault(node.parent.id, []).append(node_id)
+
+    if root_id is None:
+        included = nodes
+        tops = {node_id for node_id, (n_type, _) in nodes.items() if n_type == "ROOT"}
+    else:
+        if root_id not in nodes:
+            raise ValueError(f"{root_id} is not a node in the organization tree")
+        subtree = set()
+        pending = [root_id]
+        while len(pending) > 0:
+            node_id = pending.pop()
+            subtree.add(node_id)
+            pending.extend(children.get(node_id, []))
+        included = {k: v for k, v in nodes.items() if k in subtree}
+        tops = {root_id}
+
+    def indegree(node_id: str) -> int:
+        return 0 if node_id in tops else 1
+
+    def outdegree(node_id: str) -> int:
+        return len(children.get(node_id, []))
+
+    yield f"digraph {quote(name)} {{\n"
+    for node_id, (n_type, node) in included.items():
+        yield (
+            f"\t{quote(node_id)} "
+            f"[label={quote(node.name)} shape={SHAPES[n_type]}]\n"
+        )
+    chain_node, chain_size = None, 0
+    for node_id in included:
+        degree = indegree(node_id) + outdegree(node_id)
+        if degree == 0:
+            if chain < 1:
+                continue
+            if chain_node is None:
+                chain_node = node_id
+                continue
+            yield f"\t{quote(chain_node)} -> {quote(node_id)} [style=invis]\n"
+            chain_size += 1
+            if chain_size < chain:
+                chain_node = node_id
+            else:
+                chain_node, chain_size = None, 0
+            continue
+        count = 0
+        for child_id in children.get(node_id, []):
+            attrs = ""
+            is_leaf = outdegree(child_id) == 0
+            is_chain_node = outdegree(child_id) == 1
+            if degree > 1 and stagger >= 1 and (is_leaf or (fanout and is_chain_node)):
+                attrs = f" [minlen={count % stagger + 1}]"
+                count += 1
+            yield f"\t{quote(node_id)} -> {quote(child_id)}{attrs}\n"
+    yield "}\n"
+
+
+def write_dot(organization, f: IO[str], **kwargs) -> None:
+    """Stream a DOT digraph of an organization to a text file object"""
+    for line in iter_dot(organization, **kwargs):
+        f.write(line)
@@ -0,0 +1,184 @@
+"""
+Concurrent DescribeEffectivePolicy calls for many (target, policy type) pairs
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import logging
+from threading import Lock
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from ..client.retry import is_auth_error, retry_attempts
+from ..utils.tags import DEFAULT_MAX_WORKERS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..client import APIClient
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+_EFFECTIVE_POLICY_NOT_FOUND = "EffectivePolicyNotFoundException"
+
+# A (target ID, policy type) pair
+Request = tuple[str, str]
+
+
+@dataclass
+class EffectivePolicyTypeStats:
+    """Call counts and timing for DescribeEffectivePolicy calls of one policy type"""
+
+    policy_type: str
+    calls: int = field(default=0)
+    found: int = field(default=0)
+    not_found: int = field(default=0)
+    failed: int = field(default=0)
+    # Attempts botocore retried, e.g., when throttled
+    retries: int = field(default=0)
+    # Total time spent in calls of this type, including retries. Calls run
+    # concurrently, so this can exceed the wall-clock time of the fetch.
+    seconds: float = field(default=0.0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "policy_type": self.policy_type,
+            "calls": self.calls,
+            "found": self.found,
+            "not_found": self.not_found,
+            "failed": self.failed,
+            "retries": self.retries,
+            "seconds": self.seconds,
+        }
+
+
+@dataclass
+class EffectivePolicyResults:
+    """The results of fetching effective policies for a list of requests"""
+
+    # Effective policy data (in snake_case) for each request, or None if the target
+    # has no effective policy of the type
+    policies: dict[Request, Optional[dict[str, Any]]] = field(default_factory=dict)
+    # Requests that failed after retries, and the service error that was raised
+    errors: dict[Request, Exception] = field(default_factory=dict)
+    stats: dict[str, EffectivePolicyTypeStats] = field(default_factory=dict)
+    seconds: float = field(default=0.0)
+
+    def update(self, other: "EffectivePolicyResults") -> None:
+        """Merge the results of another fetch into these results"""
+        self.policies.update(other.policies)
+        for request in other.policies:
+            self.errors.pop(request, None)
+        self.errors.update(other.errors)
+        for p_type, other_stats in other.stats.items():
+            stats = self.stats.setdefault(p_type, EffectivePolicyTypeStats(p_type))
+            for name in ["calls", "found", "not_found", "failed", "retries", "seconds"]:
+                setattr(stats, name, getattr(stats, name) + getattr(other_stats, name))
+        self.seconds += other.seconds
+
+
+@dataclass
+class EffectivePolicyFetcher:
+    """
+    Fetches effective policies for (target, policy type) pairs concurrently, with up
+    to `max_workers` calls in flight. Throttled calls are retried by the client's
+    botocore retry config. Service errors for a request are recorded in the results
+    instead of raised, so one bad target doesn't abort a crawl. Errors caused by the
+    caller's credentials or permissions are raised.
+    """
+
+    client: "APIClient" = field(repr=False)
+    max_workers: int = field(default=DEFAULT_MAX_WORKERS)
+
+    def describe(self, target_id: str, p_type: str) -> Optional[dict[str, Any]]:
+        """
+        Describe the effective policy of a type for a target. Returns None if the
+        target has no effective policy of that type.
+        """
+        return self.__describe(target_id, p_type)[0]
+
+    def __describe(
+        self, target_id: str, p_type: str
+    ) -> tuple[Optional[dict[str, Any]], int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            data = self.client.api(
+                "describe_effective_policy", policy_type=p_type, target_id=target_id
+            )
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == _EFFECTIVE_POLICY_NOT_FOUND:
+                return None, retry_attempts(exc.response)
+            raise
+        metadata = data.get("response_metadata", {})
+        return data["effective_policy"], metadata.get("retry_attempts", 0)
+
+    def fetch(
+        self,
+        requests: Iterable[Request],
+        on_result: Callable[[Request, Optional[dict[str, Any]]], None] = None,
+    ) -> EffectivePolicyResults:
+        """
+        Fetch the effective policy for each (target ID, policy type) request. If
+        given, `on_result` is called with each successful request and its data as soon
+        as it completes, e.g., to checkpoint it.
+        """
+        from botocore.exceptions import ClientError
+
+        requests = list(dict.fromkeys(requests))
+        results = EffectivePolicyResults()
+        for _, p_type in requests:
+            results.stats.setdefault(p_type, EffectivePolicyTypeStats(p_type))
+        lock = Lock()
+
+        def fetch_one(request: Request) -> Optional[dict[str, Any]]:
+            target_id, p_type = request
+            stats = results.stats[p_type]
+            start = time.monotonic()
+            try:
+                data, retries = self.__describe(target_id, p_type)
+                error = None
+            except ClientError as exc:
+                if is_auth_error(exc):
+                    raise
+                data, error = None, exc
+                retries = retry_attempts(exc.response)
+            elapsed = time.monotonic() - start
+            with lock:
+                stats.calls += 1
+                stats.retries += retries
+                stats.seconds += elapsed
+                if error is not None:
+                    stats.failed += 1
+                    results.errors[request] = error
+                else:
+                    results.policies[request] = data
+                    if data is None:
+                        stats.not_found += 1
+                    else:
+                        stats.found += 1
+            if error is None and on_result is not None:
+                on_result(request, data)
+            return data
+
+        start = time.monotonic()
+        if len(requests) <= 1 or self.max_workers <= 1:
+            for request in requests:
+                fetch_one(request)
+        else:
+            workers = min(self.max_workers, len(requests))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fetch_one, requests))
+        results.seconds = time.monotonic() - start
+
+        logger = logging.getLogger(__name__)
+        for stats in results.stats.values():
+            logger.info(
+                f"Fetched {stats.calls} effective {stats.policy_type} policies in "
+                f"{stats.seconds:.2f}s of calls ({stats.retries} retries, "
+                f"{stats.failed} failed)"
+            )
+        for (target_id, p_type), error in results.errors.items():
+            logger.warning(
+                f"Failed to fetch the effective {p_type} for {target_id}: {error}"
+            )
+        return results
@@ -0,0 +1,266 @@
+"""
+Stream organizations to graph and table formats for loading into other tools: node and
+edge tables (CSV, or Parquet if pyarrow is installed), GraphML, and Mermaid
+"""
+
+import csv
+import json
+import logging
+import os
+from typing import IO, Any, Iterator
+
+from .organizations import DependencyError, Organization
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+NODE_COLUMNS = [
+    "id",
+    "type",
+    "name",
+    "arn",
+    "parent_id",
+    "email",
+    "status",
+    "joined_method",
+    "joined_timestamp",
+    "policy_type",
+    "aws_managed",
+    "description",
+    "tags",
+]
+EDGE_COLUMNS = ["source_id", "target_id", "type", "policy_type"]
+
+# Edge types
+CHILD = "CHILD"
+POLICY_TARGET = "POLICY_TARGET"
+
+TABLE_FORMATS = ["CSV", "PARQUET"]
+
+# Rows per record batch when writing Parquet
+PARQUET_BATCH_SIZE = 10000
+
+
+def _parent_child_tree(organization: Organization) -> dict[str, list]:
+    """Return the parent to children map, building it from node data if needed"""
+    if organization._parent_child_tree is None:
+        organization.build_indexes()
+    return organization._parent_child_tree
+
+
+def _tree_nodes(organization: Organization) -> Iterator[tuple[str, Any]]:
+    """Yield (node type, node) for the root, OUs, and accounts"""
+    if organization.root is not None:
+        yield "ROOT", organization.root
+    for ou in organization.organizational_units or []:
+        yield "ORGANIZATIONAL_UNIT", ou
+    for account in organization.accounts or []:
+        yield "ACCOUNT", account
+
+
+def iter_node_rows(organization: Organization) -> Iterator[dict[str, Any]]:
+    """
+    Yield a row for each root, OU, account, and policy. Fields that don't apply to a
+    node type are None, and tags are encoded as a JSON object.
+    """
+    _parent_child_tree(organization)
+    # Accounts don't always have their parent populated, but it's known from the tree
+    parents = organization._child_parent_tree or {}
+    for n_type, node in _tree_nodes(organization):
+        parent = getattr(node, "parent", None) or parents.get(node.id)
+        tags = getattr(node, "tags", None)
+        yield {
+            "id": node.id,
+            "type": n_type,
+            "name": node.name,
+            "arn": node.arn,
+            "parent_id": None if parent is None else parent.id,
+            "email": getattr(node, "email", None),
+            "status": getattr(node, "status", None),
+            "joined_method": getattr(node, "joined_method", None),
+            "joined_timestamp": getattr(node, "joined_timestamp", None),
+            "policy_type": None,
+            "aws_managed": None,
+            "description": None,
+            "tags": None if tags is None else json.dumps(tags),
+        }
+    for policy in organization.policies or []:
+        summary = policy.policy_summary
+        yield {
+            "id": summary.id,
+            "type": "POLICY",
+            "name": summary.name,
+            "arn": summary.arn,
+            "parent_id": None,
+            "email": None,
+            "status": None,
+            "joined_method": None,
+            "joined_timestamp": None,
+            "policy_type": summary.type,
+            "aws_managed": summary.aws_managed,
+            "description": summary.description,
+            "tags": None if policy.tags is None else json.dumps(policy.tags),
+        }
+
+
+def iter_edge_rows(organization: Organization) -> Iterator[dict[str, Any]]:
+    """
+    Yield a row for each parent to child edge in the OU tree, then for each policy
+    attachment (from the policy to its target)
+    """
+    for parent_id, children in _parent_child_tree(organization).items():
+        for child in children:
+            yield {
+                "source_id": parent_id,
+                "target_id": child.id,
+                "type": CHILD,
+                "policy_type": None,
+            }
+    for _, node in _tree_nodes(organization):
+        for policy in node.policies or []:
+            yield {
+                "source_id": policy.id,
+                "target_id": node.id,
+                "type": POLICY_TARGET,
+                "policy_type": policy.type,
+            }
+
+
+def write_csv(organization: Organization, nodes_f: IO[str], edges_f: IO[str]) -> None:
+    """Stream the node and edge tables to text file objects as CSV"""
+    for f, columns, rows in [
+        (nodes_f, NODE_COLUMNS, iter_node_rows(organization)),
+        (edges_f, EDGE_COLUMNS, iter_edge_rows(organization)),
+    ]:
+        writer = csv.DictWriter(f, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_parquet(organization: Organization, nodes_path: str, edges_path: str) -> None:
+    """Write the node and edge tables as Parquet files. Requires pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise DependencyError(
+            "Writing Parquet requires the pyarrow library: pip install pyarrow"
+        )
+
+    def schema(columns: list[str]) -> "pa.Schema":
+        return pa.schema(
+            [(c, pa.bool_() if c == "aws_managed" else pa.string()) for c in columns]
+        )
+
+    for path, columns, rows in [
+        (nodes_path, NODE_COLUMNS, iter_node_rows(organization)),
+        (edges_path, EDGE_COLUMNS, iter_edge_rows(organization)),
+    ]:
+        with pq.ParquetWriter(path, schema(columns)) as writer:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == PARQUET_BATCH_SIZE:
+                    writer.write_table(
+                        pa.Table.from_pylist(batch, schema=writer.schema)
+                    )
+                    batch = []
+            if len(batch) > 0:
+                writer.write_table(pa.Table.from_pylist(batch, schema=writer.schema))
+
+
+def write_tables(organization: Organization, directory: str, format_: str) -> None:
+    """
+    Write the node and edge tables to `nodes.<ext>` and `edges.<ext>` in a directory,
+    as CSV or PARQUET
+    """
+    format_ = format_.upper()
+    if format_ not in TABLE_FORMATS:
+        raise ValueError(f"Table format must be one of {TABLE_FORMATS}")
+    os.makedirs(directory, exist_ok=True)
+    ext = format_.lower()
+    nodes_path = os.path.join(directory, f"nodes.{ext}")
+    edges_path = os.path.join(directory, f"edges.{ext}")
+    if format_ == "PARQUET":
+        write_parquet(organization, nodes_path, edges_path)
+        return
+    with open(nodes_path, "w", newline="", encoding="utf-8") as nodes_f, open(
+        edges_path, "w", newline="", encoding="utf-8"
+    ) as edges_f:
+        write_csv(organization, nodes_f, edges_f)
+
+
+def iter_graphml(organization: Organization) -> Iterator[str]:
+    """Yield the lines of a GraphML document with all node and edge table columns"""
+    # Imported here since xml.sax.saxutils imports urllib, which is slow to import
+    from xml.sax.saxutils import escape, quoteattr
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    for column in NODE_COLUMNS[1:]:
+        attr_type = "boolean" if column == "aws_managed" else "string"
+        yield (
+            f'  <key id="{column}" for="node" attr.name="{column}" '
+            f'attr.type="{attr_type}"/>\n'
+        )
+    for column in EDGE_COLUMNS[2:]:
+        yield (
+            f'  <key id="edge_{column}" for="edge" attr.name="{column}" '
+            'attr.type="string"/>\n'
+        )
+    yield '  <graph id="Organization" edgedefault="directed">\n'
+    for row in iter_node_rows(organization):
+        yield f"    <node id={quoteattr(row['id'])}>\n"
+        for column in NODE_COLUMNS[1:]:
+            value = row[column]
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = str(value).lower()
+            yield f'      <data key="{column}">{escape(str(value))}</data>\n'
+        yield "    </node>\n"
+    for row in iter_edge_rows(organization):
+        yield (
+            f"    <edge source={quoteattr(row['source_id'])} "
+            f"target={quoteattr(row['target_id'])}>\n"
+        )
+        for column in EDGE_COLUMNS[2:]:
+            if row[column] is not None:
+                yield f'      <data key="edge_{column}">{escape(row[column])}</data>\n'
+        yield "    </edge>\n"
+    yield "  </graph>\n"
+    yield "</graphml>\n"
+
+
+def _mermaid_id(node_id: str) -> str:
+    """Return a node ID that Mermaid can parse, since IDs can't contain hyphens"""
+    return node_id.replace("-", "_")
+
+
+def _mermaid_label(value: str) -> str:
+    return '"' + str(value).replace('"', "#quot;") + '"'
+
+
+def iter_mermaid(organization: Organization) -> Iterator[str]:
+    """
+    Yield the lines of a Mermaid flowchart of the OU tree. The root is drawn as a
+    circle, OUs as boxes, and accounts as rounded boxes.
+    """
+    shapes = {
+        "ROOT": ("((", "))"),
+        "ORGANIZATIONAL_UNIT": ("[", "]"),
+        "ACCOUNT": ("(", ")"),
+    }
+    yield "flowchart TD\n"
+    for n_type, node in _tree_nodes(organization):
+        start, end = shapes[n_type]
+        yield f"    {_mermaid_id(node.id)}{start}{_mermaid_label(node.name)}{end}\n"
+    for parent_id, children in _parent_child_tree(organization).items():
+        for child in children:
+            yield f"    {_mermaid_id(parent_id)} --> {_mermaid_id(child.id)}\n"
+
+
+def write_lines(lines: Iterator[str], f: IO[str]) -> None:
+    """Stream lines from one of the iter_* exporters to a text file object"""
+    for line in lines:
+        f.write(line)
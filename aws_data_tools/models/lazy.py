@@ -0,0 +1,390 @@
+"""
+Lazily-loaded organization nodes
+
+Nodes created by a NodeLoader only hold the data returned by the API call that created
+them. Other fields (tags, policies, effective policies, parents, children, policy
+content, and policy targets) are fetched the first time they're accessed. Loads are
+batched: accessing a field on one node also loads that field for other nodes of the
+same type that are still waiting for it, concurrently, up to `batch_size` nodes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional, TypeVar, Union
+from weakref import WeakValueDictionary
+
+from ..client import APIClient, get_default_client_pool
+from ..client.pool import DEFAULT_MAX_CONCURRENCY
+from ..utils.tags import DEFAULT_MAX_WORKERS, query_tags_bulk
+from .effective_policies import EffectivePolicyFetcher
+from .organizations import (
+    _SERVICE_NAME,
+    VALID_EFFECTIVE_POLICY_TYPES,
+    Account,
+    EffectivePolicy,
+    OrganizationalUnit,
+    ParChild,
+    Policy,
+    PolicySummaryForTarget,
+    PolicyTargetSummary,
+    Root,
+)
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# Default maximum number of nodes to load a field for at once
+DEFAULT_BATCH_SIZE = 100
+
+# Fields that are loaded on first access for each type of node
+LAZY_FIELDS = {
+    "ACCOUNT": ["effective_policies", "parent", "policies", "tags"],
+    "ORGANIZATIONAL_UNIT": ["children", "parent", "policies", "tags"],
+    "ROOT": ["children", "policies", "tags"],
+    "POLICY": ["content", "tags", "targets"],
+}
+
+T = TypeVar("T")
+Node = Union[Account, OrganizationalUnit, Policy, Root]
+
+
+def node_id(node: Node) -> str:
+    """Return the ID of a root, OU, account, or policy"""
+    if isinstance(node, Policy):
+        return node.policy_summary.id
+    return node.id
+
+
+def node_type(node: Node) -> str:
+    """Return the type of a root, OU, account, or policy"""
+    if isinstance(node, Account):
+        return "ACCOUNT"
+    if isinstance(node, OrganizationalUnit):
+        return "ORGANIZATIONAL_UNIT"
+    if isinstance(node, Root):
+        return "ROOT"
+    if isinstance(node, Policy):
+        return "POLICY"
+    raise TypeError(f"Unsupported node type {type(node).__name__}")
+
+
+class LazyNode:
+    """
+    Mixin for node models that loads unset fields through a NodeLoader when they're
+    first accessed
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails, i.e., for fields that haven't loaded
+        if name.startswith("_") or name not in LAZY_FIELDS[node_type(self)]:
+            raise AttributeError(name)
+        try:
+            loader = object.__getattribute__(self, "_loader")
+        except AttributeError:
+            raise AttributeError(name) from None
+        loader.load(self, name)
+        return object.__getattribute__(self, name)
+
+    @property
+    def loaded_fields(self) -> list[str]:
+        """Names of lazy fields that have been loaded"""
+        return [
+            name for name in LAZY_FIELDS[node_type(self)] if not self.__is_pending(name)
+        ]
+
+    def __is_pending(self, name: str) -> bool:
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return True
+        return False
+
+    def __repr__(self) -> str:
+        # Avoid loading fields just to print a node
+        lazy_fields = LAZY_FIELDS[node_type(self)]
+        values = ", ".join(
+            f"{f}={object.__getattribute__(self, f)!r}"
+            for f in self.__dataclass_fields__
+            if f not in lazy_fields or not self.__is_pending(f)
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class LazyAccount(LazyNode, Account):
+    __slots__ = ("_loader", "__weakref__")
+
+
+class LazyOrganizationalUnit(LazyNode, OrganizationalUnit):
+    __slots__ = ("_loader", "__weakref__")
+
+
+class LazyRoot(LazyNode, Root):
+    __slots__ = ("_loader", "__weakref__")
+
+
+class LazyPolicy(LazyNode, Policy):
+    __slots__ = ("_loader", "__weakref__")
+
+
+class NodeLoader:
+    """
+    Creates lazily-loaded nodes and loads their fields on demand. Loaders can be shared
+    between threads, and all nodes created by a loader share its client.
+    """
+
+    def __init__(
+        self,
+        client: APIClient = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        if client is None:
+            client = APIClient(
+                _SERVICE_NAME,
+                client_pool=get_default_client_pool(
+                    max(max_workers, DEFAULT_MAX_CONCURRENCY)
+                ),
+            )
+        self.client = client
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._enabled_policy_types = None
+        self._lock = Lock()
+        # Memoized ListParents results, shared by all lookups through this loader
+        self._parents: dict[str, Optional[ParChild]] = {}
+        # Nodes waiting for a field to load, keyed by (node type, field name). Nodes
+        # are weakly referenced, so the loader doesn't keep discarded nodes alive.
+        self._pending: dict[tuple[str, str], WeakValueDictionary] = {}
+        self._loaders: dict[str, Callable[[list[str], str], dict[str, Any]]] = {
+            "children": self.fetch_children,
+            "content": self.fetch_policy_content,
+            "effective_policies": self.fetch_effective_policies,
+            "parent": self.fetch_parents,
+            "policies": self.fetch_policies,
+            "tags": self.fetch_tags,
+            "targets": self.fetch_policy_targets,
+        }
+
+    def map(self, func: Callable[..., T], items: Iterable[Any]) -> list[T]:
+        """Call a function for each item concurrently and return the results in order"""
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(func, items))
+
+    @property
+    def enabled_policy_types(self) -> list[str]:
+        """Policy types enabled on the root"""
+        if self._enabled_policy_types is None:
+            root = self.client.api("list_roots")[0]
+            self._enabled_policy_types = [
+                p["type"] for p in root["policy_types"] if p["status"] == "ENABLED"
+            ]
+        return self._enabled_policy_types
+
+    def wrap(self, node: LazyNode) -> LazyNode:
+        """Mark unset lazy fields on a node as pending, so they load on access"""
+        n_type = node_type(node)
+        n_id = node_id(node)
+        node._loader = self
+        with self._lock:
+            for name in LAZY_FIELDS[n_type]:
+                if getattr(node, name) is None:
+                    delattr(node, name)
+                    pending = self._pending.setdefault(
+                        (n_type, name), WeakValueDictionary()
+                    )
+                    pending[n_id] = node
+        return node
+
+    def load(self, node: LazyNode, name: str) -> None:
+        """Load a field for a node, along with other nodes waiting for the same field"""
+        n_type = node_type(node)
+        n_id = node_id(node)
+        with self._lock:
+            pending = self._pending.get((n_type, name), {})
+            batch = {n_id: node}
+            for other_id, other in list(pending.items()):
+                if len(batch) >= self.batch_size:
+                    break
+                batch[other_id] = other
+            for other_id in batch:
+                pending.pop(other_id, None)
+        try:
+            data = self._loaders[name](list(batch), n_type)
+        except Exception:
+            # Put the batch back so the next access retries
+            with self._lock:
+                pending = self._pending.setdefault(
+                    (n_type, name), WeakValueDictionary()
+                )
+                for other_id, other in batch.items():
+                    if other is not node:
+                        pending[other_id] = other
+            raise
+        for other_id, other in batch.items():
+            setattr(other, name, data.get(other_id))
+
+    def load_all(self, nodes: Iterable[LazyNode]) -> None:
+        """Load every pending field for a list of nodes"""
+        for node in nodes:
+            for name in LAZY_FIELDS[node_type(node)]:
+                getattr(node, name)
+
+    def get_parent(self, child_id: str) -> Optional[ParChild]:
+        """Return the parent of an OU or account. Results are memoized."""
+        with self._lock:
+            if child_id in self._parents:
+                return self._parents[child_id]
+        data = self.client.api("list_parents", child_id=child_id)
+        parent = ParChild.from_dict(data[0]) if len(data) > 0 else None
+        with self._lock:
+            self._parents[child_id] = parent
+        return parent
+
+    def get_ancestors(self, node_id: str) -> list[ParChild]:
+        """
+        Return the ancestors of an OU or account, starting from the root. Ancestors
+        shared with previously looked up nodes don't require any API calls.
+        """
+        ancestors = []
+        parent = self.get_parent(node_id)
+        while parent is not None:
+            ancestors.insert(0, parent)
+            if parent.type == "ROOT":
+                break
+            parent = self.get_parent(parent.id)
+        return ancestors
+
+    def describe_account(self, account_id: str) -> dict[str, Any]:
+        """Return the raw DescribeAccount data for an account"""
+        return self.client.api("describe_account", account_id=account_id)["account"]
+
+    # Constructors for lazy nodes
+
+    def account(self, account_id: str) -> LazyAccount:
+        """Return a lazily-loaded account"""
+        return self.wrap(LazyAccount.from_dict(self.describe_account(account_id)))
+
+    def accounts(self, account_ids: Iterable[str]) -> list[LazyAccount]:
+        """Return lazily-loaded accounts, described concurrently"""
+        data = self.map(self.describe_account, dict.fromkeys(account_ids))
+        # Wrap in order, so pending fields load in batches of neighbouring accounts
+        return [self.wrap(LazyAccount.from_dict(d)) for d in data]
+
+    def organizational_unit(self, ou_id: str) -> LazyOrganizationalUnit:
+        """Return a lazily-loaded OU"""
+        data = self.client.api(
+            "describe_organizational_unit", organizational_unit_id=ou_id
+        )["organizational_unit"]
+        return self.wrap(LazyOrganizationalUnit.from_dict(data))
+
+    def root(self) -> LazyRoot:
+        """Return the lazily-loaded root of the organization"""
+        data = self.client.api("list_roots")[0]
+        return self.wrap(LazyRoot.from_dict(data))
+
+    def policy(self, policy_id: str) -> LazyPolicy:
+        """Return a lazily-loaded policy, including its content"""
+        data = self.client.api("describe_policy", policy_id=policy_id)["policy"]
+        return self.wrap(LazyPolicy.from_dict(data))
+
+    # Field loaders, which return the field value for each node ID
+
+    def fetch_tags(self, ids: list[str], n_type: str = None) -> dict[str, Any]:
+        """Fetch tags for each of a list of nodes"""
+        return query_tags_bulk(self.client, ids, max_workers=self.max_workers)
+
+    def fetch_parents(self, ids: list[str], n_type: str = None) -> dict[str, Any]:
+        """Fetch the parent of each of a list of OUs or accounts"""
+
+        return dict(zip(ids, self.map(self.get_parent, ids)))
+
+    def fetch_ancestors(self, ids: list[str], n_type: str = None) -> dict[str, Any]:
+        """Fetch the ancestors of each of a list of OUs or accounts"""
+        return dict(zip(ids, self.map(self.get_ancestors, ids)))
+
+    def fetch_children(self, ids: list[str], n_type: str = None) -> dict[str, Any]:
+        """Fetch the child OUs and accounts of each of a list of roots or OUs"""
+        child_types = ["ORGANIZATIONAL_UNIT", "ACCOUNT"]
+        requests = [(i, c_type) for i in ids for c_type in child_types]
+
+        def children(request: tuple[str, str]) -> list[ParChild]:
+            parent_id, child_type = request
+            data = self.client.api(
+                "list_children", parent_id=parent_id, child_type=child_type
+            )
+            return [ParChild(id=child["id"], type=child["type"]) for child in data]
+
+        ret = {i: [] for i in ids}
+        for (parent_id, _), result in zip(requests, self.map(children, requests)):
+            ret[parent_id].extend(result)
+        return ret
+
+    def fetch_policies(self, ids: list[str], n_type: str = None) -> dict[str, Any]:
+        """Fetch the policies attached directly to each of a list of targets"""
+        requests = [(i, p_type) for i in ids for p_type in self.enabled_policy_types]
+
+        def policies(request: tuple[str, str]) -> list[PolicySummaryForTarget]:
+            target_id, p_type = request
+            data = self.client.api(
+                "list_policies_for_target", target_id=target_id, filter=p_type
+            )
+            return [PolicySummaryForTarget(id=p["id"], type=p["type"]) for p in data]
+
+        ret = {i: [] for i in ids}
+        for (target_id, _), result in zip(requests, self.map(policies, requests)):
+            ret[target_id].extend(result)
+        return ret
+
+    def fetch_effective_policies(
+        self, ids: list[str], n_type: str = None
+    ) -> dict[str, Any]:
+        """
+        Fetch effective policies of all enabled types for each of a list of nodes.
+        Raises the first service error, so the batch stays unloaded and is retried.
+        """
+        p_types = [
+            p_type
+            for p_type in self.enabled_policy_types
+            if p_type in VALID_EFFECTIVE_POLICY_TYPES
+        ]
+        fetcher = EffectivePolicyFetcher(
+            client=self.client, max_workers=self.max_workers
+        )
+        results = fetcher.fetch((i, p_type) for i in ids for p_type in p_types)
+        if results.errors:
+            raise next(iter(results.errors.values()))
+        ret = {i: [] for i in ids}
+        for i in ids:
+            for p_type in p_types:
+                data = results.policies.get((i, p_type))
+                if data is not None:
+                    ret[i].append(EffectivePolicy.from_dict(data))
+        return ret
+
+    def fetch_policy_content(
+        self, ids: list[str], n_type: str = None
+    ) -> dict[str, Any]:
+        """Fetch the content of each of a list of policies"""
+
+        def content(policy_id: str) -> str:
+            data = self.client.api("describe_policy", policy_id=policy_id)
+            return data["policy"]["content"]
+
+        return dict(zip(ids, self.map(content, ids)))
+
+    def fetch_policy_targets(
+        self, ids: list[str], n_type: str = None
+    ) -> dict[str, Any]:
+        """Fetch the targets of each of a list of policies"""
+
+        def targets(policy_id: str) -> list[PolicyTargetSummary]:
+            data = self.client.api("list_targets_for_policy", policy_id=policy_id)
+            return [PolicyTargetSummary.from_dict(target) for target in data]
+
+        return dict(zip(ids, self.map(targets, ids)))
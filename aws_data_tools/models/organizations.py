@@ -2,28 +2,82 @@
 Dataclass builders and models for working with AWS Organizations APIs
 """
 
-from dataclasses import dataclass, field, InitVar
+from dataclasses import dataclass, field, InitVar, replace
+import json
 import logging
-from typing import Any, Union
+import random
+import sys
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator, Optional, Union
 
 from dacite.config import Config
 
-try:
-    import graphviz
-except ImportError:
-    graphviz = None
-
-from ..client import APIClient
-from ..utils.tags import query_tags
-from .base import ModelBase
+from ..utils.casing import snake_keys
+from ..utils.policies import PolicyNode, evaluate_policies
+from ..utils.tags import DEFAULT_MAX_WORKERS, iter_tags
+from .base import ModelBase, add_slots
+from .checkpoint import CheckpointJournal, checkpoint_key
+from .dot import iter_dot, write_dot
+from .effective_policies import EffectivePolicyFetcher, EffectivePolicyResults
+from .phases import (
+    DEFAULT_MAX_PHASE_WORKERS,
+    Phase,
+    PhaseTiming,
+    format_plan,
+    run_phases,
+)
+from .policy_documents import (
+    DOCUMENTS_KEY,
+    content_hash,
+    dedupe_documents,
+    expand_documents,
+)
+from .policy_loader import (
+    PolicyContentStore,
+    PolicyLoader,
+    get_default_policy_store,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    # Imported when needed, since the client depends on boto3
+    from ..client import APIClient
+    from .lazy import NodeLoader
+    from .planner import CrawlPlan
+    from .streaming import CrawlEvent
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
 _SERVICE_NAME = "organizations"
-_OU_MAXDEPTH = 5
+
+# Read-only API actions whose results are checkpointed
+_CHECKPOINT_ACTIONS = ("describe_", "list_")
+
+# The deepest OUs can be nested under the root
+OU_MAXDEPTH = 5
+
+# Priorities of the fetch phases, lowest first: the structure of the organization
+# (root, OUs, and accounts with their parents), then policies and their targets, then
+# tags, and then effective policies
+DEFAULT_PHASE_PRIORITIES = {
+    "organization": 0,
+    "ous": 0,
+    "accounts": 0,
+    "policies": 1,
+    "policy_targets": 1,
+    "root_tags": 2,
+    "ou_tags": 2,
+    "account_tags": 2,
+    "policy_tags": 2,
+    "effective_policies": 3,
+}
 
 
+def _intern(value: Any) -> Any:
+    """Intern strings that repeat across many nodes, like types and statuses"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@add_slots
 @dataclass
 class ParChild(ModelBase):
     """A parent or child representation for a node"""
@@ -34,13 +88,14 @@ class ParChild(ModelBase):
     _valid_types = ["ACCOUNT", "ORGANIZATIONAL_UNIT", "ROOT"]
 
     def __post_init__(self):
+        self.type = _intern(self.type)
         if self.type not in self._valid_types:
             raise Exception(
                 f"Invalid type {self.type}. Valid types: {self._valid_types}."
             )
 
 
-_VALID_POLICY_TYPES = [
+VALID_POLICY_TYPES = [
     "AISERVICES_OPT_OUT_POLICY",
     "BACKUP_POLICY",
     "SERVICE_CONTROL_POLICY",
@@ -48,17 +103,17 @@ _VALID_POLICY_TYPES = [
 ]
 
 # Effective policies
-_VALID_EFFECTIVE_POLICY_TYPES = [
+VALID_EFFECTIVE_POLICY_TYPES = [
     policy_type
-    for policy_type in _VALID_POLICY_TYPES
+    for policy_type in VALID_POLICY_TYPES
     if policy_type != "SERVICE_CONTROL_POLICY"
 ]
 
 
 def get_valid_policy_types(effective: bool = True) -> list[str]:
     if effective:
-        return _VALID_EFFECTIVE_POLICY_TYPES
-    return _VALID_POLICY_TYPES
+        return VALID_EFFECTIVE_POLICY_TYPES
+    return VALID_POLICY_TYPES
 
 
 def get_valid_effective_policy_types() -> list[str]:
@@ -69,6 +124,11 @@ class InvalidEffectivePolicyType(TypeError):
     pass
 
 
+class DependencyError(Exception):
+    pass
+
+
+@add_slots
 @dataclass
 class EffectivePolicy(ModelBase):
     """An effective policy applied to a node (root, OU, or account)"""
@@ -98,7 +158,7 @@ class EffectivePolicy(ModelBase):
 
     @classmethod
     def fetch_data(
-        cls, policy_type: str, target_id: str, client: APIClient, **kwargs
+        cls, policy_type: str, target_id: str, client: "APIClient", **kwargs
     ) -> dict[str]:
         """Return raw dict from DescribeEffectivePolicy API call"""
         cls.__ensure_valid_policy_type(policy_type)
@@ -118,10 +178,11 @@ class EffectivePolicy(ModelBase):
         # boto3 returns the "joined_method" as datetime.datetime, which can't
         # serialize cleanly for DynamoDB. Passing this custom config tells dacite to
         # cast any fields that are supposed to be strings to strings.
-        return super().from_dict(*args, config=Config(cast=[str]))
+        return super().from_dict(*args, config=Config(cast=[str]), **kwargs)
 
     def __post_init__(self):
         self.__ensure_valid_policy_type(self.policy_type)
+        self.policy_type = _intern(self.policy_type)
 
 
 @dataclass
@@ -184,7 +245,7 @@ class PolicySummary(ModelBase):
     name: str
     type: str
 
-    description: str = field(default=None)
+    description: Optional[str] = field(default=None)
 
     _valid_types = [
         "AISERVICES_OPT_OUT_POLICY",
@@ -200,6 +261,7 @@ class PolicySummary(ModelBase):
             )
 
 
+@add_slots
 @dataclass
 class PolicySummaryForTarget(ModelBase):
     """A policy id and type for a policy attached to a target"""
@@ -207,7 +269,11 @@ class PolicySummaryForTarget(ModelBase):
     id: str
     type: str
 
+    def __post_init__(self):
+        self.type = _intern(self.type)
+
 
+@add_slots
 @dataclass
 class PolicyTargetSummary(ModelBase):
     """A summary of a target attached to a policy. Returned by ListPoliciesForTarget"""
@@ -224,6 +290,7 @@ class PolicyTargetSummary(ModelBase):
     ]
 
     def __post_init__(self):
+        self.type = _intern(self.type)
         if self.type not in self._valid_types:
             raise Exception(
                 f"Invalid type {self.type}. Valid types: {self._valid_types}."
@@ -238,6 +305,7 @@ class PolicyTypeSummary(ModelBase):
     type: str
 
 
+@add_slots
 @dataclass
 class Policy(ModelBase):
     """A policy in an organization"""
@@ -247,13 +315,14 @@ class Policy(ModelBase):
     # We allow content to be None because ListPolicies doesn't return the content data.
     # Instead you have to DescribePolicy to get the content. Listing policies generally
     # needs to be done first to get the IDs.
-    content: str = field(default=None)
+    content: Optional[str] = field(default=None)
 
     # Optional properties generally populated after initialization
-    tags: dict[str, str] = field(default=None)
-    targets: list[PolicyTargetSummary] = field(default=None)
+    tags: Optional[dict[str, str]] = field(default=None)
+    targets: Optional[list[PolicyTargetSummary]] = field(default=None)
 
 
+@add_slots
 @dataclass
 class Root(ModelBase):
     """The root in an organization"""
@@ -264,8 +333,9 @@ class Root(ModelBase):
     policy_types: list[PolicyTypeSummary]
 
     # Optional properties generally populated after initialization
-    children: list[ParChild] = field(default=None)
-    policies: list[PolicySummaryForTarget] = field(default=None)
+    children: Optional[list[ParChild]] = field(default=None)
+    policies: Optional[list[PolicySummaryForTarget]] = field(default=None)
+    tags: Optional[dict[str, str]] = field(default=None)
 
     def to_parchild_dict(self) -> dict[str, str]:
         """Return the root as a ParChild (parent) dict"""
@@ -275,34 +345,94 @@ class Root(ModelBase):
         """Return the root as a ParChild (parent) object"""
         return ParChild.from_dict(self.to_parchild_dict())
 
-    def fetch_tags(self) -> None:
-        raise NotImplementedError
-        # data = query_tags(client=AddApiClientHere, resource_id=self.id)
-        # return data
-
-    def fetch_policies(self) -> None:
-        raise NotImplementedError
+    def __loader(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> "NodeLoader":
+        """
+        Return the loader to fetch with: the one passed, the one a lazy root was
+        created by, or a new one
+        """
+        if loader is not None:
+            return loader
+        # Lazy roots reuse the loader that created them, unless given another client
+        own = getattr(self, "_loader", None)
+        if own is not None and client in [None, own.client]:
+            return own
+        # Imported here since the lazy module depends on this one
+        from .lazy import NodeLoader
+
+        return NodeLoader(client=client)
+
+    def fetch_tags(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> None:
+        """Fetch tags for the root"""
+        self.tags = self.__loader(client, loader).fetch_tags([self.id])[self.id]
 
-    def fetch_child_ous(self) -> None:
-        raise NotImplementedError
+    def fetch_policies(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> None:
+        """Fetch policies of all enabled types attached to the root"""
+        loader = self.__loader(client, loader)
+        self.policies = loader.fetch_policies([self.id])[self.id]
 
-    def fetch_child_accounts(self) -> None:
-        raise NotImplementedError
+    def __fetch_children(
+        self, client: "APIClient", loader: "NodeLoader", child_type: str
+    ) -> None:
+        children = self.__loader(client, loader).fetch_children([self.id])[self.id]
+        if child_type is not None:
+            children = [
+                *(c for c in self.children or [] if c.type != child_type),
+                *(c for c in children if c.type == child_type),
+            ]
+        self.children = children
 
-    def fetch_children(self) -> None:
-        raise NotImplementedError
+    def fetch_child_ous(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> None:
+        """Fetch the OUs directly under the root, keeping any child accounts"""
+        self.__fetch_children(client, loader, "ORGANIZATIONAL_UNIT")
 
-    def fetch(self) -> None:
-        raise NotImplementedError
+    def fetch_child_accounts(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> None:
+        """Fetch the accounts directly under the root, keeping any child OUs"""
+        self.__fetch_children(client, loader, "ACCOUNT")
 
-    def fetch_all(self) -> None:
-        raise NotImplementedError
+    def fetch_children(
+        self, client: "APIClient" = None, loader: "NodeLoader" = None
+    ) -> None:
+        """Fetch the OUs and accounts directly under the root"""
+        self.__fetch_children(client, loader, None)
+
+    def fetch(self, client: "APIClient" = None) -> None:
+        """Refresh the root's properties and policy types"""
+        root = self.from_api(client=client)
+        self.arn = root.arn
+        self.id = root.id
+        self.name = root.name
+        self.policy_types = root.policy_types
+
+    def fetch_all(self, client: "APIClient" = None) -> None:
+        """Refresh the root and fetch its children, policies, and tags"""
+        # One loader, and client, for all of the calls
+        loader = self.__loader(client)
+        self.fetch(client=loader.client)
+        self.fetch_children(loader=loader)
+        self.fetch_policies(loader=loader)
+        self.fetch_tags(loader=loader)
 
     @classmethod
-    def from_api(cls):
-        raise NotImplementedError
+    def from_api(cls, client: "APIClient" = None) -> "Root":
+        """Return the root of the organization from the ListRoots API"""
+        if client is None:
+            from ..client import APIClient
+
+            client = APIClient(_SERVICE_NAME)
+        return cls.from_dict(client.api("list_roots")[0])
 
 
+@add_slots
 @dataclass
 class OrganizationalUnit(ModelBase):
     """An organizational unit in an organization"""
@@ -312,10 +442,10 @@ class OrganizationalUnit(ModelBase):
     name: str
 
     # Optional properties generally populated after initialization
-    children: list[ParChild] = field(default=None)
-    parent: ParChild = field(default=None)
-    policies: list[PolicySummaryForTarget] = field(default=None)
-    tags: dict[str, str] = field(default=None)
+    children: Optional[list[ParChild]] = field(default=None)
+    parent: Optional[ParChild] = field(default=None)
+    policies: Optional[list[PolicySummaryForTarget]] = field(default=None)
+    tags: Optional[dict[str, str]] = field(default=None)
 
     def to_parchild_dict(self) -> dict[str, str]:
         """Return the OU as a ParChild (parent) dict"""
@@ -326,6 +456,7 @@ class OrganizationalUnit(ModelBase):
         return ParChild.from_dict(self.to_parchild_dict())
 
 
+@add_slots
 @dataclass
 class Account(ModelBase):
     """An account in an organization"""
@@ -339,10 +470,14 @@ class Account(ModelBase):
     status: str
 
     # Optional properties generally populated after initialization
-    effective_policies: list[EffectivePolicy] = field(default=None)
-    parent: ParChild = field(default=None)
-    policies: list[PolicySummaryForTarget] = field(default=None)
-    tags: dict[str, str] = field(default=None)
+    effective_policies: Optional[list[EffectivePolicy]] = field(default=None)
+    parent: Optional[ParChild] = field(default=None)
+    policies: Optional[list[PolicySummaryForTarget]] = field(default=None)
+    tags: Optional[dict[str, str]] = field(default=None)
+
+    def __post_init__(self):
+        self.joined_method = _intern(self.joined_method)
+        self.status = _intern(self.status)
 
     def to_parchild_dict(self) -> dict[str, str]:
         """Return the account as a ParChild (parent) dict"""
@@ -357,11 +492,7 @@ class Account(ModelBase):
         # boto3 returns the "joined_method" as datetime.datetime, which can't
         # serialize cleanly for DynamoDB. Passing this custom config tells dacite to
         # cast any fields that are supposed to be strings to strings.
-        return super().from_dict(*args, config=Config(cast=[str]))
-
-
-class DependencyError(Exception):
-    pass
+        return super().from_dict(*args, config=Config(cast=[str]), **kwargs)
 
 
 @dataclass
@@ -370,23 +501,23 @@ class Organization(ModelBase):
 
     # We allow all these fields to default to None so we can support initializing an
     # organization object with empty data.
-    arn: str = field(default=None)
-    available_policy_types: list[PolicyTypeSummary] = field(default=None)
-    feature_set: str = field(default=None)
-    id: str = field(default=None)
-    master_account_arn: str = field(default=None)
-    master_account_email: str = field(default=None)
-    master_account_id: str = field(default=None)
+    arn: Optional[str] = field(default=None)
+    available_policy_types: Optional[list[PolicyTypeSummary]] = field(default=None)
+    feature_set: Optional[str] = field(default=None)
+    id: Optional[str] = field(default=None)
+    master_account_arn: Optional[str] = field(default=None)
+    master_account_email: Optional[str] = field(default=None)
+    master_account_id: Optional[str] = field(default=None)
 
     # TODO: These collections should be converted to container data classes to be able
     # to better able to handle operations against specific fields. Currently,
     # serializing/deserializing these collections indepently requires passing the
     # "field_name" kwarg to the `to_dict()` function from ModelBase. It's already
     # getting hacky.
-    accounts: list[Account] = field(default=None)
-    organizational_units: list[OrganizationalUnit] = field(default=None)
-    policies: list[Policy] = field(default=None)
-    root: Root = field(default=None)
+    accounts: Optional[list[Account]] = field(default=None)
+    organizational_units: Optional[list[OrganizationalUnit]] = field(default=None)
+    policies: Optional[list[Policy]] = field(default=None)
+    root: Optional[Root] = field(default=None)
 
     # Mappings that represent node -> edge relationships in the organization
     _parent_child_tree: dict[str, ParChild] = field(
@@ -404,13 +535,22 @@ class Organization(ModelBase):
     _ou_index_map: dict[str, int] = field(default=None, init=False, repr=False)
     _policy_index_map: dict[str, int] = field(default=None, init=False, repr=False)
 
+    # Memoized inheritance state for computed effective policies, keyed by policy type
+    # and node ID
+    _effective_policy_cache: dict[tuple[str, str], PolicyNode] = field(
+        default=None, init=False, repr=False
+    )
+
+    # Policy documents keyed by content hash, populated by dedupe_policies()
+    _policy_documents: dict[str, str] = field(default=None, init=False, repr=False)
+
     def fetch_description(self, include_policies: bool = True) -> None:
         org = self.api("describe_organization").get("organization")
         root = self.api("list_roots")[0]
         policies = {}
         if include_policies:
             responses = []
-            for policy_type in _VALID_POLICY_TYPES:
+            for policy_type in VALID_POLICY_TYPES:
                 response = self.api("list_policies", filter=policy_type)
                 responses.append(response)
             policies["policies"] = [
@@ -424,37 +564,361 @@ class Organization(ModelBase):
         raise NotImplementedError
         # self.fetch_description()
 
-    def to_dot(self) -> str:
-        """Return the organization as a GraphViz DOT diagram"""
-        if graphviz is None:
-            raise DependencyError(
-                "The graphviz library is not installed by default: pip install aws-data-tools[graphviz]"
-            )
-        graph = graphviz.Digraph("Organization", filename="organization.dot")
-        nodes = []
-        nodes.append(self.root)
-        nodes.extend(self.organizational_units)
-        nodes.extend(self.accounts)
-        for node in nodes:
-            if getattr(node, "parent", None) is None:
-                continue
-            shape = None
-            if isinstance(node, Root):
-                shape = "circle"
-            elif isinstance(node, OrganizationalUnit):
-                shape = "box"
-            elif isinstance(node, Account):
-                shape = "ellipse"
-            else:
+    def get_ancestor_ids(self, node_id: str) -> list[str]:
+        """
+        Return the IDs of all ancestors of a node, ordered from the root down to the
+        node's direct parent. Requires the OU tree to be populated.
+        """
+        ancestors = []
+        parent = self._child_parent_tree.get(node_id)
+        while parent is not None:
+            ancestors.append(parent.id)
+            parent = self._child_parent_tree.get(parent.id)
+        ancestors.reverse()
+        return ancestors
+
+    def get_node(
+        self, node_id: str
+    ) -> Union[Root, OrganizationalUnit, Account, Policy, None]:
+        """Lookup a root, OU, account, or policy by ID"""
+        if self.root is not None and node_id == self.root.id:
+            return self.root
+        for nodes, index_map in [
+            (self.organizational_units, self._ou_index_map),
+            (self.accounts, self._account_index_map),
+            (self.policies, self._policy_index_map),
+        ]:
+            if index_map is not None and node_id in index_map:
+                return nodes[index_map[node_id]]
+        return None
+
+    def __e_attached_policy_content(self, node_id: str, policy_type: str) -> list[str]:
+        """Return the content of policies of a type attached directly to a node"""
+        node = self.get_node(node_id)
+        if node is None or node.policies is None:
+            return []
+        content = []
+        for policy_summary in node.policies:
+            if policy_summary.type != policy_type:
                 continue
-            graph.node(node.id, label=node.name, shape=shape)
-            graph.edge(node.parent.id, node.id)
-        return graphviz.unflatten(
-            graph.source,
-            stagger=10,
-            fanout=10,
-            chain=10,
+            policy = self.get_node(policy_summary.id)
+            if policy is None or policy.content is None:
+                raise DependencyError(
+                    f"Content for policy {policy_summary.id} is not loaded"
+                )
+            content.append(policy.content)
+        return content
+
+    def __evaluate_inherited_policies(
+        self, node_id: str, policy_type: str
+    ) -> PolicyNode:
+        """Evaluate the inherited policy state at a node, memoized per node"""
+        if self._effective_policy_cache is None:
+            self._effective_policy_cache = {}
+        key = (policy_type, node_id)
+        cached = self._effective_policy_cache.get(key)
+        if cached is not None:
+            return cached
+        parent = self._child_parent_tree.get(node_id)
+        inherited = None
+        if parent is not None:
+            inherited = self.__evaluate_inherited_policies(parent.id, policy_type)
+        state = evaluate_policies(
+            [self.__e_attached_policy_content(node_id, policy_type)], inherited
         )
+        self._effective_policy_cache[key] = state
+        return state
+
+    def compute_effective_policy(
+        self, target_id: str, policy_type: str
+    ) -> Union[EffectivePolicy, None]:
+        """
+        Compute the effective policy of a type for a root, OU, or account from the
+        policy content and attachments in the model, without any API calls. Returns
+        None if no policy of the type is in effect for the target.
+
+        Requires the OU tree, policies, and policy targets to be populated. The
+        inherited state for each ancestor is memoized, so call
+        `clear_effective_policy_cache()` after changing policies or attachments.
+        """
+        if policy_type not in VALID_EFFECTIVE_POLICY_TYPES:
+            raise InvalidEffectivePolicyType(
+                f"Invalid type {policy_type}. Valid values are "
+                f'{", ".join(VALID_EFFECTIVE_POLICY_TYPES)}'
+            )
+        if self._child_parent_tree is None:
+            raise DependencyError("The OU tree must be populated to compute policies")
+        document = self.__evaluate_inherited_policies(target_id, policy_type).render()
+        if document is None:
+            return None
+        return EffectivePolicy(
+            last_updated_timestamp=None,
+            policy_content=json.dumps(document),
+            target_id=target_id,
+            policy_type=policy_type,
+        )
+
+    def clear_effective_policy_cache(self) -> None:
+        """Clear memoized inheritance state used by compute_effective_policy()"""
+        self._effective_policy_cache = None
+
+    def build_indexes(self) -> None:
+        """
+        Populate the node index maps and the parent/child relationship maps from the
+        node data. Useful after deserializing an organization.
+        """
+        self._account_index_map = {a.id: i for i, a in enumerate(self.accounts or [])}
+        self._ou_index_map = {
+            ou.id: i for i, ou in enumerate(self.organizational_units or [])
+        }
+        self._policy_index_map = {
+            p.policy_summary.id: i for i, p in enumerate(self.policies or [])
+        }
+        # Keep any relationships already known from crawling the OU tree, since
+        # accounts don't always have their parent populated
+        self._child_parent_tree = dict(self._child_parent_tree or {})
+        self._parent_child_tree = {}
+        if self.root is not None:
+            self._parent_child_tree[self.root.id] = []
+        children = {}
+        for nodes in [self.organizational_units or [], self.accounts or []]:
+            for node in nodes:
+                if node.parent is not None:
+                    self._child_parent_tree[node.id] = node.parent
+                children[node.id] = node.to_parchild()
+        for ou in self.organizational_units or []:
+            self._parent_child_tree.setdefault(ou.id, [])
+        for child_id, parent in self._child_parent_tree.items():
+            if child_id in children:
+                self._parent_child_tree.setdefault(parent.id, []).append(
+                    children[child_id]
+                )
+
+    def dedupe_policies(self) -> dict[str, str]:
+        """
+        Store each distinct policy document (policy and effective policy content) once
+        in a table keyed by content hash, and point all policies at the stored copy.
+        Returns the table.
+        """
+        documents = {}
+        hashes = {}
+
+        def share(content: Optional[str]) -> Optional[str]:
+            if content is None:
+                return None
+            if content not in hashes:
+                hashes[content] = content_hash(content)
+                documents[hashes[content]] = content
+            return documents[hashes[content]]
+
+        for policy in self.policies or []:
+            policy.content = share(policy.content)
+        for account in self.accounts or []:
+            for policy in account.effective_policies or []:
+                policy.policy_content = share(policy.policy_content)
+        self._policy_documents = documents
+        return documents
+
+    def get_policy_document(self, ref: str) -> str:
+        """Return a policy document by its content hash"""
+        if self._policy_documents is None or ref not in self._policy_documents:
+            self.dedupe_policies()
+        return self._policy_documents[ref]
+
+    def compact(self) -> None:
+        """
+        Reduce the memory used by the organization by sharing equal ParChild and
+        PolicySummaryForTarget instances and repeated strings (tags and policy
+        documents) across nodes. Useful after deserializing an organization,
+        where every node gets its own copies. Shared instances shouldn't be modified in
+        place.
+        """
+        parchildren = {}
+        summaries = {}
+        strings = {}
+
+        def share_parchild(parchild: Optional[ParChild]) -> Optional[ParChild]:
+            if parchild is None:
+                return None
+            return parchildren.setdefault((parchild.id, parchild.type), parchild)
+
+        def share_summaries(
+            policies: Optional[list[PolicySummaryForTarget]],
+        ) -> Optional[list[PolicySummaryForTarget]]:
+            if policies is None:
+                return None
+            return [summaries.setdefault((p.id, p.type), p) for p in policies]
+
+        def share_tags(tags: Optional[dict[str, str]]) -> Optional[dict[str, str]]:
+            if tags is None:
+                return None
+            return {
+                strings.setdefault(k, k): strings.setdefault(v, v)
+                for k, v in tags.items()
+            }
+
+        nodes = [*(self.organizational_units or []), *(self.accounts or [])]
+        if self.root is not None:
+            nodes.insert(0, self.root)
+        for node in nodes:
+            if getattr(node, "children", None) is not None:
+                node.children = [share_parchild(c) for c in node.children]
+            if getattr(node, "parent", None) is not None:
+                node.parent = share_parchild(node.parent)
+            node.policies = share_summaries(node.policies)
+            if getattr(node, "tags", None) is not None:
+                node.tags = share_tags(node.tags)
+        self.dedupe_policies()
+        for child_id, parent in (self._child_parent_tree or {}).items():
+            self._child_parent_tree[child_id] = share_parchild(parent)
+        for parent_id, children in (self._parent_child_tree or {}).items():
+            self._parent_child_tree[parent_id] = [share_parchild(c) for c in children]
+
+    def to_snapshot(self, path: str) -> None:
+        """Write the organization to a columnar snapshot file"""
+        # Imported here since the snapshot module depends on this one
+        from .snapshot import write_snapshot
+
+        write_snapshot(self, path)
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> "Organization":
+        """Initialize an organization from a snapshot file"""
+        from .snapshot import read_snapshot
+
+        data = read_snapshot(path)
+        root_id = None if data["root"] is None else data["root"]["id"]
+
+        def parent(parent_id: str) -> Union[ParChild, None]:
+            if parent_id is None:
+                return None
+            p_type = "ROOT" if parent_id == root_id else "ORGANIZATIONAL_UNIT"
+            return ParChild(id=parent_id, type=p_type)
+
+        def summaries(rows: list[list[str]]) -> list[PolicySummaryForTarget]:
+            if rows is None:
+                return None
+            return [
+                PolicySummaryForTarget(id=p_id, type=p_type) for p_id, p_type in rows
+            ]
+
+        children = {}
+        for edge in data["edges"]:
+            children.setdefault(edge["parent_id"], []).append(
+                ParChild(id=edge["child_id"], type=edge["child_type"])
+            )
+        org = cls.from_dict(data["organization"])
+        if data["root"] is not None:
+            root_tags = data["root"].pop("tags", None)
+            org.root = Root.from_dict(data["root"])
+            if root_tags is not None:
+                org.root.tags = root_tags
+        org.organizational_units = [
+            OrganizationalUnit(
+                arn=row["arn"],
+                id=row["id"],
+                name=row["name"],
+                children=children.get(row["id"], []),
+                parent=parent(row["parent_id"]),
+                policies=summaries(row["policies"]),
+                tags=row["tags"],
+            )
+            for row in data["organizational_units"]
+        ]
+        org.accounts = [
+            Account(
+                **{
+                    k: v
+                    for k, v in row.items()
+                    if k not in ["parent_id", "policies", "effective_policies"]
+                },
+                parent=parent(row["parent_id"]),
+                policies=summaries(row["policies"]),
+                effective_policies=(
+                    None
+                    if row["effective_policies"] is None
+                    else [EffectivePolicy(**p) for p in row["effective_policies"]]
+                ),
+            )
+            for row in data["accounts"]
+        ]
+        org.policies = [
+            Policy(
+                policy_summary=PolicySummary(
+                    **{k: row[k] for k in ["arn", "aws_managed", "id", "name", "type"]},
+                    description=row["description"],
+                ),
+                content=row["content"],
+                tags=row["tags"],
+                targets=(
+                    None
+                    if row["targets"] is None
+                    else [PolicyTargetSummary(**t) for t in row["targets"]]
+                ),
+            )
+            for row in data["policies"]
+        ]
+        org.build_indexes()
+        org.compact()
+        return org
+
+    def iter_diff(self, other: "Organization") -> Iterator["Change"]:
+        """Yield changes from this organization to another one as they're found"""
+        from .diff import iter_changes
+
+        return iter_changes(self, other)
+
+    def diff(self, other: "Organization") -> "OrganizationDiff":
+        """
+        Return the set of changes from this organization to another one, e.g., an older
+        snapshot compared with a newer one. Nodes are matched by ID.
+        """
+        from .diff import OrganizationDiff
+
+        return OrganizationDiff(changes=list(self.iter_diff(other)))
+
+    def to_dot(self, root_id: str = None, **kwargs) -> str:
+        """
+        Return the organization as a GraphViz DOT diagram, or only the subtree under a
+        node if `root_id` is set. See `models.dot.iter_dot()` for layout options.
+        """
+        return "".join(iter_dot(self, root_id=root_id, **kwargs))
+
+    def write_dot(self, f: IO[str], root_id: str = None, **kwargs) -> None:
+        """Stream the organization as a GraphViz DOT diagram to a text file object"""
+        write_dot(self, f, root_id=root_id, **kwargs)
+
+    def to_dict(
+        self, field_name: str = None, dedupe_policies: bool = False
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        """
+        Serialize the organization to a dict, or serialize a single field. With
+        `dedupe_policies`, policy documents are written once to a "policy_documents"
+        table keyed by content hash, and policies reference them by "content_hash" and
+        effective policies by "policy_content_hash".
+        """
+        data = super().to_dict(field_name=field_name)
+        if dedupe_policies:
+            if field_name is not None:
+                raise ValueError("Policies can only be deduped for the organization")
+            data = dedupe_documents(data)
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], convert_keys: bool = True, **kwargs
+    ) -> "Organization":
+        """
+        Initialize the organization from a dict, including dicts serialized with
+        deduped policies. Each policy document is then only stored once.
+        """
+        if convert_keys:
+            data = snake_keys(data)
+        if DOCUMENTS_KEY not in data:
+            return super().from_dict(data, convert_keys=False, **kwargs)
+        org = super().from_dict(expand_documents(data), convert_keys=False, **kwargs)
+        org.dedupe_policies()
+        return org
 
     def __post_init__(self) -> None:
         # fetch desc
@@ -481,9 +945,9 @@ class OrganizationDataBuilder(ModelBase):
     Provides serialization to dicts and JSON.
     """
 
-    client: APIClient = field(default=None, repr=False)
+    client: "APIClient" = field(default=None, repr=False)
     # dm: Organization = field(default_factory=Organization.from_api)
-    dm: Organization = field(default=None)
+    dm: Optional[Organization] = field(default=None)
 
     # Used by __post_init__() to determine what data to initialize (default is none)
     init_all: InitVar[bool] = field(default=False)
@@ -500,6 +964,47 @@ class OrganizationDataBuilder(ModelBase):
 
     include_account_parents: bool = field(default=False)
 
+    # Share DescribeEffectivePolicy results between accounts with identical policy
+    # attachments along their ancestor path. Optionally verify a random sample of
+    # accounts in each group against the API.
+    dedupe_effective_policies: bool = field(default=True)
+    effective_policy_verify_sample: int = field(default=0)
+
+    # Maximum number of concurrent requests for bulk lookups, like tags
+    max_workers: int = field(default=DEFAULT_MAX_WORKERS)
+
+    # Maximum number of fetch phases that fetch_all() runs at once. Use 1 to run the
+    # phases one at a time.
+    max_phase_workers: int = field(default=DEFAULT_MAX_PHASE_WORKERS)
+
+    # Priorities of fetch phases by name, overriding DEFAULT_PHASE_PRIORITIES
+    phase_priorities: Optional[dict[str, int]] = field(default=None)
+
+    # When each phase started and finished in the last fetch_all() call
+    phase_timings: Optional[dict[str, PhaseTiming]] = field(
+        default=None, init=False, repr=False
+    )
+
+    # Errors and per-type timing from the last fetch_effective_policies() call
+    effective_policy_results: Optional[EffectivePolicyResults] = field(
+        default=None, init=False, repr=False
+    )
+
+    # Record completed fetch units (API listings, tags, and effective policies) in a
+    # journal, and skip units that an earlier, interrupted run already completed
+    checkpoint: Optional[CheckpointJournal] = field(default=None, repr=False)
+
+    # Content of AWS managed policies, so each is only described once. Defaults to a
+    # store shared by the process.
+    policy_store: Optional[PolicyContentStore] = field(default=None, repr=False)
+
+    _policy_targets_fetched: bool = field(default=False, init=False, repr=False)
+    # Policy summaries listed by fetch_organization(), reused by fetch_policies()
+    _policy_summaries: Optional[list[dict[str, Any]]] = field(
+        default=None, init=False, repr=False
+    )
+    _loader: Any = field(default=None, init=False, repr=False)
+
     @property
     def enabled_policy_types(self) -> list[str]:
         """Enabled policy types in the organization"""
@@ -516,16 +1021,87 @@ class OrganizationDataBuilder(ModelBase):
             self.fetch_organization()
         return [p.type for p in self.dm.root.policy_types if p.status == "ENABLED"]
 
+    @property
+    def loader(self) -> "NodeLoader":
+        """
+        A NodeLoader sharing the builder's client, for looking up individual nodes
+        whose fields load lazily on first access instead of building the whole org
+        """
+        if self._loader is None:
+            from .lazy import NodeLoader
+
+            if self.client is None:
+                self.Connect()
+            self._loader = NodeLoader(client=self.client, max_workers=self.max_workers)
+        return self._loader
+
+    def lookup_accounts(
+        self,
+        account_ids: list[str],
+        include_parents: bool = False,
+        include_policies: bool = False,
+        include_effective_policies: bool = False,
+        include_tags: bool = False,
+    ) -> list[Account]:
+        """
+        Look up accounts by ID without crawling the organization. Each account is
+        described individually, and only the requested fields are fetched for just
+        those accounts. The fields are fetched one after another, each with up to
+        `max_workers` calls in flight.
+        """
+        loader = self.loader
+        account_ids = list(dict.fromkeys(account_ids))
+        accounts = [
+            Account.from_dict(data)
+            for data in loader.map(loader.describe_account, account_ids)
+        ]
+        fetchers = {
+            "parent": (include_parents, loader.fetch_parents),
+            "policies": (include_policies, loader.fetch_policies),
+            "effective_policies": (
+                include_effective_policies,
+                loader.fetch_effective_policies,
+            ),
+            "tags": (include_tags, loader.fetch_tags),
+        }
+        for name, (include, fetch) in fetchers.items():
+            if not include:
+                continue
+            # Fetchers make their calls concurrently, so they run one at a time
+            values = fetch(account_ids)
+            for account in accounts:
+                setattr(account, name, values[account.id])
+        return accounts
+
     def Connect(self):
         """Initialize an authenticated session"""
         if self.client is None:
-            self.client = APIClient(_SERVICE_NAME)
+            from ..client import APIClient, get_default_client_pool
+            from ..client.pool import DEFAULT_MAX_CONCURRENCY
+
+            # Size the connection pool for the requests workers make at once
+            self.client = APIClient(
+                _SERVICE_NAME,
+                client_pool=get_default_client_pool(
+                    max(self.max_workers, DEFAULT_MAX_CONCURRENCY)
+                ),
+            )
 
     def api(self, func: str, **kwargs) -> Union[list[dict[str, Any]], dict[str, Any]]:
-        """Make arbitrary API calls with the session client"""
+        """
+        Make arbitrary API calls with the session client. If checkpointing, the
+        results of read-only calls are journaled and replayed when resuming.
+        """
         if self.client is None:
             self.Connect()
-        return self.client.api(func, **kwargs)
+        if self.checkpoint is None or not func.startswith(_CHECKPOINT_ACTIONS):
+            return self.client.api(func, **kwargs)
+        key = checkpoint_key(func, kwargs)
+        if ("api", key) in self.checkpoint:
+            return self.checkpoint.get("api", key)
+        data = self.client.api(func, **kwargs)
+        self.checkpoint.record("api", key, data)
+        return data
 
     # @staticmethod
     def fetch_organization(self, include_policies: bool = True) -> None:
@@ -536,29 +1112,40 @@ class OrganizationDataBuilder(ModelBase):
         root = self.api("list_roots")[0]
         policies = {}
         if include_policies:
-            responses = []
-            for policy_type in _VALID_POLICY_TYPES:
-                response = self.api("list_policies", filter=policy_type)
-                responses.extend(response)
+            enabled_types = [
+                p["type"] for p in root["policy_types"] if p["status"] == "ENABLED"
+            ]
+            self._policy_summaries = self.__e_policy_summaries(enabled_types)
             policies["policies"] = [
-                {"policy_summary": policy_summary} for policy_summary in responses
+                {"policy_summary": policy_summary}
+                for policy_summary in self._policy_summaries
             ]
         root = {"root": root}
         self.dm = Organization.from_dict({**org, **root, **policies})
 
+    def __e_policy_summaries(self, policy_types: list[str]) -> list[dict[str, Any]]:
+        """Extract policy summaries from ListPolicies for each policy type"""
+        summaries = []
+        for p_type in policy_types:
+            summaries.extend(self.api("list_policies", filter=p_type))
+        return summaries
+
     def __e_policies(self) -> list[dict[str, Any]]:
-        """Extract organization policy data from ListPolicies and DescribePolicy"""
-        ret = []
-        for p_type in self.enabled_policy_types:
-            policies = []
-            p_summaries = self.api("list_policies", filter=p_type)
-            for p_summary in p_summaries:
-                p_detail = self.api("describe_policy", policy_id=p_summary["id"]).get(
-                    "policy"
-                )
-                policies.append(p_detail)
-            ret.extend(policies)
-        return ret
+        """
+        Extract organization policy data from ListPolicies and DescribePolicy. Reuses
+        the summaries listed by fetch_organization(), and describes policies
+        concurrently, except for AWS managed policies already in the policy store.
+        """
+        if self._policy_summaries is None:
+            self._policy_summaries = self.__e_policy_summaries(
+                self.enabled_policy_types
+            )
+        if self.policy_store is None:
+            self.policy_store = get_default_policy_store()
+        loader = PolicyLoader(
+            api=self.api, store=self.policy_store, max_workers=self.max_workers
+        )
+        return loader.load(self._policy_summaries)
 
     def __t_policies(self) -> list[Policy]:
         """Deserialize list of policy dicts into a list of Policy objects"""
@@ -674,13 +1261,14 @@ class OrganizationDataBuilder(ModelBase):
     def fetch_policy_targets(self) -> None:
         """Initialize the list of Policy objects in the organization"""
         self.__l_policy_targets()
+        self._policy_targets_fetched = True
 
     def __e_ous_recurse(
         self,
         parents: list[ParChild] = None,
         ous: list[OrganizationalUnit] = None,
         depth: int = 0,
-        maxdepth: int = _OU_MAXDEPTH,
+        maxdepth: int = OU_MAXDEPTH,
     ) -> list[OrganizationalUnit]:
         """Recurse the org tree and return a list of OU dicts"""
         if parents is None:
@@ -774,54 +1362,271 @@ class OrganizationDataBuilder(ModelBase):
         """Initialize the list of Account objects in the organization"""
         self.__l_accounts(**kwargs)
 
-    def __e_effective_policies_for_target(
-        self, target_id: str
-    ) -> list[EffectivePolicy]:
-        """Extract a list of effective policies for a target node"""
-        effective_policies = []
-        for p_type in self.enabled_policy_types:
-            # SCPs aren't supported for effective policies
-            if p_type == "SERVICE_CONTROL_POLICY":
+    def __effective_policy_types(self) -> list[str]:
+        """Enabled policy types that support effective policies"""
+        # SCPs aren't supported for effective policies
+        return [
+            p_type
+            for p_type in self.enabled_policy_types
+            if p_type in VALID_EFFECTIVE_POLICY_TYPES
+        ]
+
+    def __fetch_effective_policies(
+        self, requests: list[tuple[str, str]], results: EffectivePolicyResults
+    ) -> dict[tuple[str, str], Union[EffectivePolicy, None]]:
+        """
+        Concurrently fetch effective policies for (target ID, policy type) requests.
+        Failed requests are recorded in the results and left out of the return value.
+        """
+        if self.client is None:
+            self.Connect()
+        policies = {}
+        on_result = None
+        if self.checkpoint is not None:
+            remaining = []
+            for request in requests:
+                key = checkpoint_key(*request)
+                if ("effective_policy", key) in self.checkpoint:
+                    policies[request] = self.checkpoint.get("effective_policy", key)
+                else:
+                    remaining.append(request)
+            requests = remaining
+
+            def on_result(request, data):
+                self.checkpoint.record(
+                    "effective_policy", checkpoint_key(*request), data
+                )
+
+        fetcher = EffectivePolicyFetcher(
+            client=self.client, max_workers=self.max_workers
+        )
+        fetched = fetcher.fetch(requests, on_result=on_result)
+        results.update(fetched)
+        policies.update(fetched.policies)
+        return {
+            request: None if data is None else EffectivePolicy.from_dict(data)
+            for request, data in policies.items()
+        }
+
+    def __lookup_target_policies(self, target_id: str) -> list[PolicySummaryForTarget]:
+        """Lookup the policies attached to a root, OU, or account by ID"""
+        return self.dm.get_node(target_id).policies or []
+
+    def __can_group_effective_policies(self) -> bool:
+        """Check if the policy attachment graph needed for grouping is loaded"""
+        return (
+            self._policy_targets_fetched
+            and self.dm._child_parent_tree is not None
+            and self.dm._ou_index_map is not None
+        )
+
+    def __effective_policy_group_key(
+        self, account_id: str, p_type: str
+    ) -> tuple[tuple[str, ...], ...]:
+        """
+        Return the policies of a type attached along the path from the root to an
+        account, one tuple per level. Levels without any attachments of the type don't
+        change the inherited policy, so they're dropped. Accounts with identical keys
+        have identical effective policies.
+        """
+        key = []
+        for node_id in self.dm.get_ancestor_ids(account_id) + [account_id]:
+            attached = tuple(
+                sorted(
+                    p.id
+                    for p in self.__lookup_target_policies(node_id)
+                    if p.type == p_type
+                )
+            )
+            if len(attached) > 0:
+                key.append(attached)
+        return tuple(key)
+
+    def __e_grouped_effective_policies(
+        self,
+        account_ids: list[str],
+        p_types: list[str],
+        results: EffectivePolicyResults,
+    ) -> dict[tuple[str, str], Union[EffectivePolicy, None]]:
+        """
+        Extract effective policies for accounts by grouping accounts with identical
+        policy attachments along their ancestor path. Only one representative account
+        per group is queried, and the result is reused for the rest of the group.
+        """
+        # Accounts created or moved after the OU tree was fetched don't have a known
+        # path to the root, so they're queried individually
+        root_id = None if self.dm.root is None else self.dm.root.id
+        in_tree = {
+            account_id: self.dm.get_ancestor_ids(account_id)[:1] == [root_id]
+            for account_id in account_ids
+        }
+        groups = {}
+        ungrouped = []
+        for p_type in p_types:
+            for account_id in account_ids:
+                if not in_tree[account_id]:
+                    ungrouped.append((account_id, p_type))
+                    continue
+                key = self.__effective_policy_group_key(account_id, p_type)
+                # Nothing is attached along the path, so no effective policy exists
+                if len(key) > 0:
+                    groups.setdefault((p_type, key), []).append(account_id)
+        fetched = self.__fetch_effective_policies(
+            [(members[0], p_type) for (p_type, _), members in groups.items()]
+            + ungrouped,
+            results,
+        )
+        ret = {request: fetched[request] for request in ungrouped if request in fetched}
+        for (p_type, _), members in groups.items():
+            representative = (members[0], p_type)
+            if representative in results.errors:
+                for account_id in members[1:]:
+                    results.errors[(account_id, p_type)] = results.errors[
+                        representative
+                    ]
                 continue
-            data = self.api(
-                "describe_effective_policy", policy_type=p_type, target_id=target_id
-            ).get("effective_policy")
-            effective_policy = EffectivePolicy.from_dict(data)
-            effective_policies.append(effective_policy)
-        return effective_policies
+            for account_id in members:
+                effective_policy = fetched[representative]
+                ret[(account_id, p_type)] = (
+                    None
+                    if effective_policy is None
+                    else replace(effective_policy, target_id=account_id)
+                )
+        drifted = [
+            (account_id, p_type)
+            for (p_type, key) in self.__verify_effective_policy_groups(
+                groups, ret, results
+            )
+            for account_id in groups[(p_type, key)][1:]
+        ]
+        for request in drifted:
+            del ret[request]
+        ret.update(self.__fetch_effective_policies(drifted, results))
+        return ret
+
+    def __verify_effective_policy_groups(
+        self,
+        groups: dict[tuple, list[str]],
+        derived: dict[tuple[str, str], Union[EffectivePolicy, None]],
+        results: EffectivePolicyResults,
+    ) -> list[tuple]:
+        """
+        Compare a sample of derived effective policies in each group against the API.
+        Returns the groups where any sampled account doesn't match the representative.
+        """
+        samples = {}
+        for group, members in groups.items():
+            sample_size = min(self.effective_policy_verify_sample, len(members) - 1)
+            if sample_size > 0 and (members[0], group[0]) in derived:
+                samples[group] = random.sample(members[1:], sample_size)
+        if len(samples) == 0:
+            return []
+        actual = self.__fetch_effective_policies(
+            [
+                (account_id, p_type)
+                for (p_type, _), account_ids in samples.items()
+                for account_id in account_ids
+            ],
+            results,
+        )
+        drifted = []
+        for (p_type, key), account_ids in samples.items():
+            for account_id in account_ids:
+                request = (account_id, p_type)
+                if request not in actual:
+                    continue
+                derived_content = getattr(derived[request], "policy_content", None)
+                actual_content = getattr(actual[request], "policy_content", None)
+                if derived_content != actual_content:
+                    logging.getLogger(__name__).warning(
+                        "Effective %s for %s does not match its group, fetching all "
+                        "%d accounts in the group individually",
+                        p_type,
+                        account_id,
+                        len(groups[(p_type, key)]),
+                    )
+                    drifted.append((p_type, key))
+                    break
+        return drifted
 
     def __e_effective_policies(
-        self, account_ids: list[str] = None
-    ) -> dict[int, list[dict[str, Any]]]:
+        self, account_ids: list[str] = None, dedupe: bool = None
+    ) -> dict[str, list[EffectivePolicy]]:
         """Extract the effective policies for accounts or a list of account IDs"""
-        ret = {}
+        if self.dm is None:
+            self.fetch_organization()
         if self.dm.accounts is None:
             self.fetch_accounts()
         if account_ids is None:
             account_ids = [account.id for account in self.dm.accounts]
+        if dedupe is None:
+            dedupe = self.dedupe_effective_policies
+        # Look up the enabled types once for all accounts
+        p_types = self.__effective_policy_types()
+        results = EffectivePolicyResults()
+        if dedupe and self.__can_group_effective_policies():
+            fetched = self.__e_grouped_effective_policies(account_ids, p_types, results)
+        else:
+            fetched = self.__fetch_effective_policies(
+                [
+                    (account_id, p_type)
+                    for account_id in account_ids
+                    for p_type in p_types
+                ],
+                results,
+            )
+        self.effective_policy_results = results
+        ret = {account_id: [] for account_id in account_ids}
         for account_id in account_ids:
-            ret[account_id] = self.__e_effective_policies_for_target(account_id)
+            for p_type in p_types:
+                effective_policy = fetched.get((account_id, p_type))
+                if effective_policy is not None:
+                    ret[account_id].append(effective_policy)
         return ret
 
-    def __t_effective_policies(self, **kwargs) -> dict[int, list[EffectivePolicy]]:
-        """Transform effective policy data into a list of EffectivePolicy"""
-        return [EffectivePolicy.from_dict(d) for d in self.__e_effective_policies()]
-
     def __l_effective_policies(self, **kwargs) -> None:
         """Load effective policy objects into the account tree"""
-        for acct_id, effective_policies in self.__e_effective_policies().items():
+        for acct_id, effective_policies in self.__e_effective_policies(
+            **kwargs
+        ).items():
             acct_index = self.__lookup_account_index(acct_id)
             self.dm.accounts[acct_index].effective_policies = effective_policies
 
     def fetch_effective_policies(self, **kwargs) -> None:
-        """Initialize effective policy data for accounts in the org"""
+        """
+        Initialize effective policy data for accounts in the org. Accepts an optional
+        list of `account_ids` to limit the accounts queried.
+
+        Calls run concurrently, up to `max_workers` at once, and throttled calls are
+        retried with backoff. Calls that still fail don't abort the fetch: the affected
+        accounts are left without that effective policy, and the errors and per-type
+        timings are available in `effective_policy_results`.
+
+        If policy targets have been fetched, accounts that inherit the same set of
+        policy attachments share a single DescribeEffectivePolicy call. Pass
+        `dedupe=False` to query every account individually.
+        """
         self.__l_effective_policies(**kwargs)
 
     def __et_tags(self, resource_ids: list[str]) -> dict[str, dict[str, str]]:
         """Extract and transform tags for a list of resource IDs"""
+        if self.client is None:
+            self.Connect()
         ret = {}
-        for resource_id in resource_ids:
-            ret[resource_id] = query_tags(self.client, resource_id)
+        if self.checkpoint is not None:
+            remaining = []
+            for resource_id in resource_ids:
+                if ("tags", resource_id) in self.checkpoint:
+                    ret[resource_id] = self.checkpoint.get("tags", resource_id)
+                else:
+                    remaining.append(resource_id)
+            resource_ids = remaining
+        for resource_id, tags in iter_tags(
+            self.client, resource_ids=resource_ids, max_workers=self.max_workers
+        ):
+            if self.checkpoint is not None:
+                self.checkpoint.record("tags", resource_id, tags)
+            ret[resource_id] = tags
         return ret
 
     def __l_account_tags(self, account_ids: list[str] = None, **kwargs) -> None:
@@ -842,7 +1647,7 @@ class OrganizationDataBuilder(ModelBase):
     def __l_ou_tags(self, ou_ids: list[str] = None) -> None:
         """Load tags for OUs in the organization"""
         if self.dm.organizational_units is None:
-            self.fetch_organizational_units()
+            self.fetch_ous()
         if ou_ids is None:
             ou_ids = [ou.id for ou in self.dm.organizational_units]
         data = self.__et_tags(resource_ids=ou_ids)
@@ -888,12 +1693,28 @@ class OrganizationDataBuilder(ModelBase):
         """Initialize tags for policies in the organization"""
         self.__l_policy_tags(**kwargs)
 
+    def __l_all_tags(self) -> None:
+        """Load tags for the root, policies, OUs, and accounts in a single batch"""
+        if self.dm is None:
+            self.fetch_organization()
+        if self.dm.policies is None:
+            self.fetch_policies()
+        if self.dm.organizational_units is None:
+            self.fetch_ous()
+        if self.dm.accounts is None:
+            self.fetch_accounts()
+        nodes = {self.dm.root.id: self.dm.root}
+        for policy in self.dm.policies:
+            if not policy.policy_summary.aws_managed:
+                nodes[policy.policy_summary.id] = policy
+        for node in [*self.dm.organizational_units, *self.dm.accounts]:
+            nodes[node.id] = node
+        for node_id, tags in self.__et_tags(resource_ids=list(nodes)).items():
+            nodes[node_id].tags = tags
+
     def fetch_all_tags(self) -> None:
         """Initialize and populate tags for all taggable objects in the organization"""
-        self.fetch_root_tags()
-        self.fetch_policy_tags()
-        self.fetch_ou_tags()
-        self.fetch_account_tags()
+        self.__l_all_tags()
 
     def to_dict(self, **kwargs) -> dict[str, Any]:
         """Return the data model for the organization as a dictionary"""
@@ -911,19 +1732,107 @@ class OrganizationDataBuilder(ModelBase):
         """Return the data model for the organization as a YAML string"""
         return self.dm.to_yaml(**kwargs)
 
-    def fetch_all(self) -> None:
-        """Initialize all data for nodes and edges in the organization"""
+    def to_dot(self, **kwargs) -> str:
+        """Return the organization as a GraphViz DOT diagram"""
+        return self.dm.to_dot(**kwargs)
+
+    def phases(self) -> list[Phase]:
+        """
+        Return the phases of fetch_all() and the phases each one needs data from. The
+        OU crawl, root tags, and policies only need the organization, and tags only
+        need the IDs of the nodes they're for.
+        """
+        # Account parents are looked up in the OU tree
+        accounts_after = ("ous",) if self.include_account_parents else ("organization",)
+        phases = [
+            Phase("organization", self.fetch_organization),
+            Phase("ous", self.fetch_ous, ("organization",)),
+            Phase("policies", self.fetch_policies, ("organization",)),
+            Phase("root_tags", self.fetch_root_tags, ("organization",)),
+            Phase("accounts", self.fetch_accounts, accounts_after),
+            Phase("ou_tags", self.fetch_ou_tags, ("ous",)),
+            Phase("policy_tags", self.fetch_policy_tags, ("policies",)),
+            Phase("account_tags", self.fetch_account_tags, ("accounts",)),
+            # Targets are added to the policies of each OU and account
+            Phase(
+                "policy_targets",
+                self.fetch_policy_targets,
+                ("policies", "ous", "accounts"),
+            ),
+            # Accounts are grouped by the policies attached along their ancestor path
+            Phase(
+                "effective_policies",
+                self.fetch_effective_policies,
+                ("accounts", "policy_targets"),
+            ),
+        ]
+        priorities = {**DEFAULT_PHASE_PRIORITIES, **(self.phase_priorities or {})}
+        for phase in phases:
+            phase.priority = priorities.get(phase.name, 0)
+        return phases
+
+    def plan_phases(self) -> str:
+        """Return a description of the order fetch_all() runs its phases in"""
+        return format_plan(self.phases())
+
+    def fetch_all(
+        self,
+        on_complete: Optional[Callable[[PhaseTiming], None]] = None,
+        strict_priorities: bool = False,
+    ) -> None:
+        """
+        Initialize all data for nodes and edges in the organization. Phases run as
+        soon as the phases they depend on complete, up to `max_phase_workers` at once,
+        in order of priority. With `strict_priorities`, each phase also waits for
+        phases with higher priorities, e.g., so the structure of the organization is
+        complete before any tags are fetched.
+        """
         self.Connect()
-        self.fetch_organization()
-        self.fetch_root_tags()
-        self.fetch_policies()
-        self.fetch_policy_tags()
-        self.fetch_ous()
-        self.fetch_ou_tags()
-        self.fetch_accounts()
-        self.fetch_account_tags()
-        self.fetch_policy_targets()
-        self.fetch_effective_policies()
+        self.phase_timings = run_phases(
+            self.phases(),
+            max_workers=self.max_phase_workers,
+            on_complete=on_complete,
+            strict_priorities=strict_priorities,
+        )
+
+    def iter_crawl(self, strict_priorities: bool = True) -> Iterator["CrawlEvent"]:
+        """
+        Fetch all data for the organization like fetch_all(), yielding events as each
+        phase completes: the organization's nodes as they're found, then updates to
+        their fields as they're enriched with policies, targets, tags, and effective
+        policies. `dm` can be used as soon as the structure phases complete.
+        """
+        from .streaming import iter_crawl_events
+
+        return iter_crawl_events(self, strict_priorities=strict_priorities)
+
+    def plan_crawl(
+        self,
+        organization: Organization = None,
+        rate_limit: float = None,
+        latency: float = None,
+        init_all: bool = True,
+        **init_flags: bool,
+    ) -> "CrawlPlan":
+        """
+        Return the calls a crawl with the given init_* flags would make, and an
+        estimate of its runtime, without making them. Counts come from a previous dump
+        or snapshot of the organization if given, otherwise from list calls only.
+        """
+        from .planner import counts_from_api, counts_from_organization, plan_crawl
+
+        if organization is None:
+            counts = counts_from_api(self.api)
+        else:
+            counts = counts_from_organization(organization)
+        return plan_crawl(
+            self,
+            counts,
+            init_all=init_all,
+            rate_limit=rate_limit,
+            latency=latency,
+            **init_flags,
+        )
 
     def __post_init__(
         self,
@@ -0,0 +1,188 @@
+"""
+Run fetch phases declared as a dependency graph, starting each phase as soon as the
+phases it depends on have completed, so independent phases overlap
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Callable, Optional
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+DEFAULT_MAX_PHASE_WORKERS = 4
+
+
+@dataclass
+class Phase:
+    """
+    A unit of fetch work and the names of the phases whose output it needs. Phases with
+    a lower `priority` start first when several are ready.
+    """
+
+    name: str
+    func: Callable[[], None] = field(repr=False)
+    depends_on: tuple[str, ...] = field(default=())
+    priority: int = field(default=0)
+
+
+@dataclass
+class PhaseTiming:
+    """When a phase started and finished, in seconds since the run started"""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+def plan_phases(phases: list[Phase]) -> list[list[str]]:
+    """
+    Return the names of the phases in stages, where each phase's dependencies are all
+    in earlier stages. Phases in the same stage can run at the same time. Raises a
+    ValueError for unknown dependencies or cycles.
+    """
+    names = {phase.name for phase in phases}
+    for phase in phases:
+        unknown = set(phase.depends_on) - names
+        if len(unknown) > 0:
+            raise ValueError(f"Phase {phase.name} depends on unknown phases {unknown}")
+    stages = []
+    done = set()
+    pending = list(phases)
+    while len(pending) > 0:
+        stage = [p.name for p in pending if done.issuperset(p.depends_on)]
+        if len(stage) == 0:
+            raise ValueError(
+                f"Phases have a dependency cycle: {[p.name for p in pending]}"
+            )
+        stages.append(stage)
+        done.update(stage)
+        pending = [p for p in pending if p.name not in done]
+    return stages
+
+
+def format_plan(phases: list[Phase]) -> str:
+    """Return a readable description of the stages and dependencies of the phases"""
+    depends_on = {phase.name: phase.depends_on for phase in phases}
+    lines = []
+    for i, stage in enumerate(plan_phases(phases), start=1):
+        for name in stage:
+            after = ", ".join(depends_on[name]) or "-"
+            lines.append(f"{i}. {name} (after: {after})")
+    return "\n".join(lines) + "\n"
+
+
+def critical_path(
+    phases: list[Phase], timings: dict[str, PhaseTiming]
+) -> tuple[list[str], float]:
+    """
+    Return the chain of dependent phases with the longest total duration, and that
+    duration. A run can't take less time than this, however many phases overlap.
+    """
+    by_name = {phase.name: phase for phase in phases}
+    paths = {}
+    for stage in plan_phases(phases):
+        for name in stage:
+            before, seconds = [], 0.0
+            for dependency in by_name[name].depends_on:
+                if paths[dependency][1] > seconds:
+                    before, seconds = paths[dependency]
+            paths[name] = (before + [name], seconds + timings[name].seconds)
+    return max(paths.values(), key=lambda path: path[1])
+
+
+def effective_priorities(phases: list[Phase]) -> dict[str, int]:
+    """
+    Return the priority of each phase, raised to the highest priority (lowest number)
+    of the phases that depend on it, since those can't start until it completes
+    """
+    priorities = {phase.name: phase.priority for phase in phases}
+    by_name = {phase.name: phase for phase in phases}
+    for stage in reversed(plan_phases(phases)):
+        for name in stage:
+            for dependency in by_name[name].depends_on:
+                priorities[dependency] = min(priorities[dependency], priorities[name])
+    return priorities
+
+
+def run_phases(
+    phases: list[Phase],
+    max_workers: int = DEFAULT_MAX_PHASE_WORKERS,
+    on_complete: Optional[Callable[[PhaseTiming], None]] = None,
+    strict_priorities: bool = False,
+) -> dict[str, PhaseTiming]:
+    """
+    Run phases in threads, up to `max_workers` at once, starting each one as soon as
+    its dependencies have completed. Phases that are ready at the same time start in
+    order of priority, then in the order they're listed. With `strict_priorities`, a
+    phase also waits for every phase with a higher priority to complete. If a phase
+    fails, no new phases are started, and the first error is raised once running phases
+    finish. Returns the timing of each phase.
+
+    `on_complete` is called with the timing of each phase once it completes, before
+    any phase that depends on it starts.
+    """
+    priorities = effective_priorities(phases)
+    order = {phase.name: i for i, phase in enumerate(phases)}
+    logger = logging.getLogger(__name__)
+    timings = {}
+    started = time.monotonic()
+
+    def run(phase: Phase) -> PhaseTiming:
+        start = time.monotonic() - started
+        logger.debug(f"Starting phase {phase.name}")
+        phase.func()
+        timing = PhaseTiming(phase.name, start, time.monotonic() - started)
+        logger.info(f"Finished phase {phase.name} in {timing.seconds:.2f}s")
+        return timing
+
+    def ready(pending: list[Phase]) -> list[Phase]:
+        candidates = [p for p in pending if set(p.depends_on) <= set(timings)]
+        if strict_priorities and len(pending) > 0:
+            waiting = min(priorities[p.name] for p in pending + list(running.values()))
+            candidates = [p for p in candidates if priorities[p.name] <= waiting]
+        return sorted(candidates, key=lambda p: (priorities[p.name], order[p.name]))
+
+    pending = list(phases)
+    running: dict[Future, Phase] = {}
+    if max_workers <= 1:
+        while len(pending) > 0:
+            phase = ready(pending)[0]
+            pending.remove(phase)
+            timings[phase.name] = run(phase)
+            if on_complete is not None:
+                on_complete(timings[phase.name])
+        return timings
+
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            if error is None:
+                # Only start as many phases as there are free workers, so a phase
+                # that becomes ready later can still start ahead of lower priorities
+                for phase in ready(pending)[: max_workers - len(running)]:
+                    pending.remove(phase)
+                    running[pool.submit(run, phase)] = phase
+            if len(running) == 0:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                phase = running.pop(future)
+                try:
+                    timings[phase.name] = future.result()
+                except Exception as exc:
+                    logger.error(f"Phase {phase.name} failed: {exc}")
+                    if error is None:
+                        error = exc
+                    continue
+                if on_complete is not None:
+                    on_complete(timings[phase.name])
+    if error is not None:
+        raise error
+    return timings
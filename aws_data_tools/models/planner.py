@@ -0,0 +1,508 @@
+"""
+Plan the API calls an OrganizationDataBuilder crawl would make without making them, and
+estimate how long the crawl would take with the configured rate limit and concurrency
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .organizations import OU_MAXDEPTH, VALID_EFFECTIVE_POLICY_TYPES, Organization
+from .phases import plan_phases
+from .policy_loader import get_default_policy_store
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .organizations import OrganizationDataBuilder
+    from .policy_loader import PolicyContentStore
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# Items per page of Organizations list calls, the maximum for most of them
+PAGE_SIZE = 20
+
+# Seconds per request, used when the latency hasn't been measured
+DEFAULT_REQUEST_LATENCY = 0.1
+
+# Upper limit for automatically sized worker pools
+MAX_AUTO_WORKERS = 32
+
+# Operations the builder calls concurrently, up to `max_workers` at once
+CONCURRENT_OPERATIONS = frozenset(
+    ["describe_effective_policy", "describe_policy", "list_tags_for_resource"]
+)
+
+
+@dataclass
+class OrganizationCounts:
+    """
+    The sizes of an organization that determine the calls a crawl makes. Counts that
+    can't be known without crawling are None, and the plan falls back to estimates.
+    """
+
+    enabled_policy_types: list[str]
+    # Number of policies of each enabled type
+    policies: dict[str, int]
+    # ID and ARN of each AWS managed policy
+    aws_managed_policies: list[tuple[str, str]]
+    accounts: int
+    # Number of child OUs and child accounts of each parent the OU crawl lists
+    parents: list[tuple[int, Optional[int]]]
+    # Number of targets of each policy
+    policy_targets: Optional[list[int]] = field(default=None)
+    # Number of accounts in each group of accounts sharing an effective policy, by
+    # policy type
+    effective_policy_groups: Optional[dict[str, list[int]]] = field(default=None)
+    # Seconds per request, when measured
+    latency: Optional[float] = field(default=None)
+    # Calls made to get the counts
+    calls: int = field(default=0)
+
+    @property
+    def ous(self) -> int:
+        return sum(n_ous for n_ous, _ in self.parents)
+
+
+def counts_from_organization(organization: Organization) -> OrganizationCounts:
+    """
+    Return counts for an organization loaded from a dump or snapshot. They're exact
+    when the dump has account parents and policy targets.
+    """
+    if organization.accounts is None or organization.policies is None:
+        raise ValueError("Planning from a dump needs its accounts and policies")
+    organization.build_indexes()
+    tree = organization._child_parent_tree
+    policies = organization.policies
+    types = [p.type for p in organization.root.policy_types if p.status == "ENABLED"]
+    by_type = Counter(p.policy_summary.type for p in policies)
+    children = {organization.root.id: [0, 0]}
+    for ou in organization.organizational_units or []:
+        children[ou.id] = [0, 0]
+    for ou in organization.organizational_units or []:
+        children[tree[ou.id].id][0] += 1
+    with_parents = all(account.id in tree for account in organization.accounts)
+    for account in organization.accounts if with_parents else []:
+        children[tree[account.id].id][1] += 1
+    # The OU crawl lists the children of parents above the maximum depth
+    parents = [
+        (n_ous, n_accounts if with_parents else None)
+        for node_id, (n_ous, n_accounts) in children.items()
+        if len(organization.get_ancestor_ids(node_id)) < OU_MAXDEPTH
+    ]
+    targets = None
+    groups = None
+    if all(p.targets is not None for p in policies):
+        targets = [len(p.targets) for p in policies]
+        if with_parents:
+            groups = effective_policy_groups(organization, types)
+    return OrganizationCounts(
+        enabled_policy_types=types,
+        policies={p_type: by_type[p_type] for p_type in types},
+        aws_managed_policies=[
+            (p.policy_summary.id, p.policy_summary.arn)
+            for p in policies
+            if p.policy_summary.aws_managed
+        ],
+        accounts=len(organization.accounts),
+        parents=parents,
+        policy_targets=targets,
+        effective_policy_groups=groups,
+    )
+
+
+def effective_policy_groups(
+    organization: Organization, policy_types: list[str]
+) -> dict[str, list[int]]:
+    """
+    Return the sizes of the groups of accounts that inherit the same policies of each
+    type, and so share a DescribeEffectivePolicy call. Accounts without any policies
+    of a type attached along their path aren't in a group.
+    """
+    ret = {}
+    for p_type in policy_types:
+        if p_type not in VALID_EFFECTIVE_POLICY_TYPES:
+            continue
+        groups = Counter()
+        for account in organization.accounts or []:
+            key = []
+            path = organization.get_ancestor_ids(account.id) + [account.id]
+            for node_id in path:
+                node = organization.get_node(node_id)
+                attached = sorted(p.id for p in node.policies or [] if p.type == p_type)
+                if len(attached) > 0:
+                    key.append(tuple(attached))
+            if len(key) > 0:
+                groups[tuple(key)] += 1
+        ret[p_type] = list(groups.values())
+    return ret
+
+
+def counts_from_api(api: Callable[..., Any]) -> OrganizationCounts:
+    """
+    Return counts for an organization from list calls: the root, policies, accounts,
+    and the OU tree. Accounts per parent, policy targets, and effective policy groups
+    aren't listed, so they're estimated.
+    """
+    calls = 0
+    start = time.monotonic()
+
+    def call(func: str, **kwargs) -> Any:
+        nonlocal calls
+        calls += 1
+        return api(func, **kwargs)
+
+    root = call("list_roots")[0]
+    types = [p["type"] for p in root["policy_types"] if p["status"] == "ENABLED"]
+    summaries = {p_type: call("list_policies", filter=p_type) for p_type in types}
+    accounts = len(call("list_accounts"))
+    parents = []
+    level = [root["id"]]
+    for _ in range(OU_MAXDEPTH):
+        next_level = []
+        for parent_id in level:
+            ous = call("list_organizational_units_for_parent", parent_id=parent_id)
+            parents.append((len(ous), None))
+            next_level.extend(ou["id"] for ou in ous)
+        level = next_level
+    return OrganizationCounts(
+        enabled_policy_types=types,
+        policies={p_type: len(summaries[p_type]) for p_type in types},
+        aws_managed_policies=[
+            (p["id"], p["arn"])
+            for p_type in types
+            for p in summaries[p_type]
+            if p["aws_managed"]
+        ],
+        accounts=accounts,
+        parents=parents,
+        latency=(time.monotonic() - start) / calls,
+        calls=calls,
+    )
+
+
+@dataclass
+class PlannedCalls:
+    """The calls to an operation in a phase of a crawl"""
+
+    phase: str
+    operation: str
+    calls: int = field(default=0)
+    # Pages of paginated calls count as separate requests
+    requests: int = field(default=0)
+    # False for estimates, when the counts needed weren't known
+    exact: bool = field(default=True)
+
+
+@dataclass
+class CrawlPlan:
+    """The calls a crawl would make and an estimate of how long it would take"""
+
+    calls: list[PlannedCalls]
+    phase_seconds: dict[str, float]
+    estimated_seconds: float
+    latency: float
+    rate_limit: Optional[float]
+    max_workers: int
+    # A worker pool size that keeps requests in flight up to the rate limit
+    recommended_max_workers: int
+
+    @property
+    def exact(self) -> bool:
+        return all(c.exact for c in self.calls)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(c.calls for c in self.calls)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(c.requests for c in self.calls)
+
+    def calls_by_operation(self) -> dict[str, int]:
+        """Return the number of calls to each operation"""
+        ret = Counter()
+        for c in self.calls:
+            ret[c.operation] += c.calls
+        return dict(ret)
+
+    def format(self) -> str:
+        """Return the plan as a readable table"""
+        lines = [f"{'PHASE':<20} {'OPERATION':<38} {'CALLS':>7} {'REQUESTS':>9}"]
+        for c in self.calls:
+            note = "" if c.exact else " (estimated)"
+            lines.append(
+                f"{c.phase:<20} {c.operation:<38} {c.calls:>7} {c.requests:>9}{note}"
+            )
+        rate = "none" if self.rate_limit is None else f"{self.rate_limit:g}/s"
+        lines += [
+            "",
+            f"Total: {self.total_calls} calls, {self.total_requests} requests",
+            f"Estimated runtime: {self.estimated_seconds:.1f}s "
+            f"({self.latency * 1000:.0f} ms per request, rate limit {rate}, "
+            f"{self.max_workers} workers)",
+            f"Recommended max workers: {self.recommended_max_workers}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _pages(items: Optional[int]) -> int:
+    return 1 if items is None else max(1, math.ceil(items / PAGE_SIZE))
+
+
+class _DryRun:
+    """
+    Mirrors the fetches of OrganizationDataBuilder, counting calls instead. The tests
+    compare its exact counts with the calls a crawl makes, to keep the two in step.
+    """
+
+    def __init__(
+        self,
+        counts: OrganizationCounts,
+        include_account_parents: bool,
+        dedupe_effective_policies: bool,
+        verify_sample: int,
+        policy_store: "PolicyContentStore",
+    ):
+        self.counts = counts
+        self.include_account_parents = include_account_parents
+        self.dedupe_effective_policies = dedupe_effective_policies
+        self.verify_sample = verify_sample
+        self.policy_store = policy_store
+        self.fetched: set[str] = set()
+        self.phase = None
+        self.calls: dict[tuple[str, str], PlannedCalls] = {}
+
+    def add(
+        self, operation: str, calls: int, requests: int = None, exact: bool = True
+    ) -> None:
+        if calls == 0:
+            return
+        key = (self.phase, operation)
+        if key not in self.calls:
+            self.calls[key] = PlannedCalls(self.phase, operation)
+        planned = self.calls[key]
+        planned.calls += calls
+        planned.requests += calls if requests is None else requests
+        planned.exact = planned.exact and exact
+
+    def run(self, phase: str) -> None:
+        """Count the calls of a phase, and of fetches it triggers that haven't run"""
+        self.phase = phase
+        getattr(self, f"fetch_{phase}")()
+
+    def ensure(self, name: str) -> None:
+        if name not in self.fetched:
+            getattr(self, f"fetch_{name}")()
+
+    def fetch_organization(self) -> None:
+        self.fetched.add("organization")
+        self.add("describe_organization", 1)
+        self.add("list_roots", 1)
+        for p_type in self.counts.enabled_policy_types:
+            self.add("list_policies", 1, _pages(self.counts.policies[p_type]))
+
+    def fetch_policies(self) -> None:
+        self.ensure("organization")
+        self.fetched.add("policies")
+        stored = sum(
+            1
+            for p_id, arn in self.counts.aws_managed_policies
+            if self.policy_store.get(p_id, arn) is not None
+        )
+        self.add("describe_policy", sum(self.counts.policies.values()) - stored)
+
+    def fetch_ous(self) -> None:
+        self.ensure("organization")
+        self.fetched.add("ous")
+        parents = self.counts.parents
+        self.add(
+            "list_organizational_units_for_parent",
+            len(parents),
+            sum(_pages(n_ous) for n_ous, _ in parents),
+        )
+        self.add(
+            "list_accounts_for_parent",
+            len(parents),
+            sum(_pages(n_accounts) for _, n_accounts in parents),
+            exact=all(n_accounts is not None for _, n_accounts in parents),
+        )
+
+    def fetch_accounts(self) -> None:
+        self.ensure("organization")
+        self.fetched.add("accounts")
+        self.add("list_accounts", 1, _pages(self.counts.accounts))
+        if self.include_account_parents:
+            self.ensure("ous")
+
+    def fetch_root_tags(self) -> None:
+        self.ensure("organization")
+        self.add("list_tags_for_resource", 1)
+
+    def fetch_ou_tags(self) -> None:
+        self.ensure("ous")
+        self.add("list_tags_for_resource", self.counts.ous)
+
+    def fetch_account_tags(self) -> None:
+        self.ensure("accounts")
+        self.add("list_tags_for_resource", self.counts.accounts)
+
+    def fetch_policy_tags(self) -> None:
+        self.ensure("policies")
+        n_policies = sum(self.counts.policies.values())
+        self.add(
+            "list_tags_for_resource",
+            n_policies - len(self.counts.aws_managed_policies),
+        )
+
+    def fetch_policy_targets(self) -> None:
+        self.ensure("policies")
+        self.fetched.add("policy_targets")
+        targets = self.counts.policy_targets
+        n_policies = sum(self.counts.policies.values())
+        if targets is None:
+            self.add("list_targets_for_policy", n_policies, exact=False)
+        else:
+            pages = sum(_pages(n) for n in targets)
+            self.add("list_targets_for_policy", n_policies, pages)
+
+    def fetch_effective_policies(self) -> None:
+        self.ensure("organization")
+        self.ensure("accounts")
+        types = [
+            p_type
+            for p_type in self.counts.enabled_policy_types
+            if p_type in VALID_EFFECTIVE_POLICY_TYPES
+        ]
+        grouped = (
+            self.dedupe_effective_policies
+            and "policy_targets" in self.fetched
+            and "ous" in self.fetched
+        )
+        groups = self.counts.effective_policy_groups
+        if not grouped:
+            self.add("describe_effective_policy", self.counts.accounts * len(types))
+        elif groups is None:
+            # At most one call per account for types with any policies to inherit
+            for p_type in types:
+                if self.counts.policies[p_type] > 0:
+                    self.add(
+                        "describe_effective_policy", self.counts.accounts, exact=False
+                    )
+        else:
+            calls = 0
+            for p_type in types:
+                for members in groups.get(p_type, []):
+                    calls += 1 + min(self.verify_sample, members - 1)
+            # Groups found to have drifted while verifying are fetched again
+            self.add("describe_effective_policy", calls, exact=self.verify_sample == 0)
+
+
+# The fetches of the init_* flags, in the order OrganizationDataBuilder runs them
+INIT_FETCHES = [
+    ("init_organization", "organization"),
+    ("init_policies", "policies"),
+    ("init_policy_tags", "policy_tags"),
+    ("init_ous", "ous"),
+    ("init_ou_tags", "ou_tags"),
+    ("init_accounts", "accounts"),
+    ("init_account_tags", "account_tags"),
+    ("init_policy_targets", "policy_targets"),
+    ("init_effective_policies", "effective_policies"),
+]
+
+
+def plan_crawl(
+    builder: "OrganizationDataBuilder",
+    counts: OrganizationCounts,
+    init_all: bool = True,
+    rate_limit: Optional[float] = None,
+    latency: Optional[float] = None,
+    **init_flags: bool,
+) -> CrawlPlan:
+    """
+    Plan the calls a builder would make with the given init_* flags, and estimate the
+    runtime. Phases run in sequence, except with `init_all`, where phases overlap and
+    the estimate is the longer of the slowest chain of dependent phases and the time
+    the rate limit needs for all requests.
+    """
+    unknown = set(init_flags) - {flag for flag, _ in INIT_FETCHES}
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown init flags: {sorted(unknown)}")
+    if rate_limit is None and builder.client is not None:
+        rate_limit = getattr(builder.client, "rate_limit", None)
+    if latency is None:
+        latency = counts.latency or DEFAULT_REQUEST_LATENCY
+    dry_run = _DryRun(
+        counts,
+        include_account_parents=builder.include_account_parents,
+        dedupe_effective_policies=builder.dedupe_effective_policies,
+        verify_sample=builder.effective_policy_verify_sample,
+        policy_store=(
+            get_default_policy_store()
+            if builder.policy_store is None
+            else builder.policy_store
+        ),
+    )
+    phases = builder.phases()
+    if init_all:
+        for stage in plan_phases(phases):
+            for name in stage:
+                dry_run.run(name)
+    else:
+        for flag, name in INIT_FETCHES:
+            if init_flags.get(flag):
+                dry_run.run(name)
+    calls = list(dry_run.calls.values())
+
+    def phase_seconds(phase: str, workers: int) -> float:
+        seconds = 0.0
+        requests = 0
+        for c in calls:
+            if c.phase != phase:
+                continue
+            requests += c.requests
+            if c.operation in CONCURRENT_OPERATIONS:
+                seconds += math.ceil(c.requests / workers) * latency
+            else:
+                seconds += c.requests * latency
+        if rate_limit is not None:
+            seconds = max(seconds, requests / rate_limit)
+        return seconds
+
+    def estimate(workers: int) -> float:
+        seconds = {p.name: phase_seconds(p.name, workers) for p in phases}
+        if not init_all:
+            return sum(seconds.values())
+        finish = {}
+        for stage in plan_phases(phases):
+            for phase in [p for p in phases if p.name in stage]:
+                start = max([finish[d] for d in phase.depends_on], default=0.0)
+                finish[phase.name] = start + seconds[phase.name]
+        total = max(finish.values(), default=0.0)
+        if rate_limit is not None:
+            total = max(total, sum(c.requests for c in calls) / rate_limit)
+        return total
+
+    # Enough workers to keep requests in flight up to the rate limit, and no more
+    # than the largest concurrent batch of requests
+    largest = max(
+        [c.requests for c in calls if c.operation in CONCURRENT_OPERATIONS], default=1
+    )
+    recommended = min(MAX_AUTO_WORKERS, largest)
+    if rate_limit is not None:
+        recommended = min(recommended, math.ceil(rate_limit * latency))
+    recommended = max(recommended, 1)
+    return CrawlPlan(
+        calls=calls,
+        phase_seconds={
+            p.name: phase_seconds(p.name, builder.max_workers) for p in phases
+        },
+        estimated_seconds=estimate(builder.max_workers),
+        latency=latency,
+        rate_limit=rate_limit,
+        max_workers=builder.max_workers,
+        recommended_max_workers=recommended,
+    )
@@ -0,0 +1,99 @@
+"""
+Content-addressed storage of policy documents, so identical documents repeated across
+policies and effective policies are stored and serialized once
+"""
+
+from hashlib import sha256
+import logging
+from typing import Any, Callable
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# Key for the table of documents in serialized organizations
+DOCUMENTS_KEY = "policy_documents"
+
+# Fields that hold policy documents, and the fields that reference them by hash in
+# serialized organizations
+CONTENT_FIELDS = {"content": "content_hash", "policy_content": "policy_content_hash"}
+
+
+def content_hash(content: str) -> str:
+    """Return the hash that references a policy document"""
+    return f"sha256:{sha256(content.encode('utf-8')).hexdigest()}"
+
+
+def _map_documents(
+    data: dict[str, Any], func: Callable[[dict[str, Any], str], None]
+) -> dict[str, Any]:
+    """
+    Return a copy of a serialized organization where `func(item, field)` has updated
+    a copy of each item with a policy document field: policies, and the effective
+    policies of accounts
+    """
+    data = dict(data)
+
+    def update(item: dict[str, Any], field: str) -> dict[str, Any]:
+        item = dict(item)
+        func(item, field)
+        return item
+
+    if data.get("policies") is not None:
+        data["policies"] = [update(p, "content") for p in data["policies"]]
+    if data.get("accounts") is not None:
+        data["accounts"] = [
+            (
+                account
+                if account.get("effective_policies") is None
+                else {
+                    **account,
+                    "effective_policies": [
+                        update(p, "policy_content")
+                        for p in account["effective_policies"]
+                    ],
+                }
+            )
+            for account in data["accounts"]
+        ]
+    return data
+
+
+def dedupe_documents(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return a copy of a serialized organization where each policy document is replaced
+    by a reference to a table of documents keyed by content hash
+    """
+    documents = {}
+    hashes = {}
+
+    def dedupe(item: dict[str, Any], field: str) -> None:
+        content = item.pop(field, None)
+        if content is None:
+            return
+        if content not in hashes:
+            hashes[content] = content_hash(content)
+            documents[hashes[content]] = content
+        item[CONTENT_FIELDS[field]] = hashes[content]
+
+    data = _map_documents(data, dedupe)
+    data[DOCUMENTS_KEY] = documents
+    return data
+
+
+def expand_documents(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return a copy of a serialized organization from `dedupe_documents()` with the
+    references replaced by the documents they reference
+    """
+    data = dict(data)
+    documents = data.pop(DOCUMENTS_KEY, None) or {}
+
+    def expand(item: dict[str, Any], field: str) -> None:
+        ref = item.pop(CONTENT_FIELDS[field], None)
+        if ref is None:
+            return
+        if ref not in documents:
+            raise KeyError(f"Policy document {ref} is not in the documents table")
+        item[field] = documents[ref]
+
+    return _map_documents(data, expand)
@@ -0,0 +1,127 @@
+"""
+Load policy details with concurrent DescribePolicy calls. The content of AWS managed
+policies, which can't change, is kept in a store so it's only described once.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from ..utils.tags import DEFAULT_MAX_WORKERS
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+class PolicyContentStore:
+    """
+    The content of AWS managed policies, keyed by policy ID and ARN. With a `path`, the
+    store is read from a JSON file, and `save()` writes it back, so content is shared
+    between runs. Without one, it's kept in memory.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._records: dict[str, dict[str, str]] = {}
+        self._dirty = False
+        self._lock = Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for record in json.load(f)["policies"]:
+                    self.__index(record)
+
+    def __index(self, record: dict[str, str]) -> None:
+        self._records[record["id"]] = record
+        if record.get("arn") is not None:
+            self._records[record["arn"]] = record
+
+    def save(self) -> None:
+        """Write the store to its path, if it has one and content was added"""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            records = list({id(r): r for r in self._records.values()}.values())
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"policies": records}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len({id(r) for r in self._records.values()})
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def get(self, policy_id: str, arn: str = None) -> Optional[str]:
+        """Return the content of a policy by ID, or by ARN if the ID isn't found"""
+        record = self._records.get(policy_id) or self._records.get(arn)
+        return None if record is None else record["content"]
+
+    def put(self, policy_id: str, arn: str, content: str) -> None:
+        """Store the content of a policy, to be written by the next `save()`"""
+        with self._lock:
+            self.__index({"id": policy_id, "arn": arn, "content": content})
+            self._dirty = True
+
+
+_default_policy_store = None
+
+
+def get_default_policy_store() -> PolicyContentStore:
+    """Return the in-memory policy content store shared by the process"""
+    global _default_policy_store
+    if _default_policy_store is None:
+        _default_policy_store = PolicyContentStore()
+    return _default_policy_store
+
+
+@dataclass
+class PolicyLoader:
+    """
+    Describes policies concurrently, with up to `max_workers` calls in flight.
+    Throttled calls are retried by the client's botocore retry config. AWS managed
+    policies found in the store aren't described again, and the store is saved once
+    each load completes.
+    """
+
+    # A function that calls an API action, like `APIClient.api()`
+    api: Callable[..., Any] = field(repr=False)
+    store: PolicyContentStore = field(default_factory=get_default_policy_store)
+    max_workers: int = field(default=DEFAULT_MAX_WORKERS)
+
+    def describe(self, policy_id: str) -> dict[str, Any]:
+        """Return the policy summary and content from DescribePolicy"""
+        return self.api("describe_policy", policy_id=policy_id)["policy"]
+
+    def load(self, summaries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Return the details (summary and content) of each policy in a list of policy
+        summaries, in the same order
+        """
+
+        def load_one(summary: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+            if summary.get("aws_managed"):
+                content = self.store.get(summary["id"], summary.get("arn"))
+                if content is not None:
+                    return {"policy_summary": summary, "content": content}, False
+            policy = self.describe(summary["id"])
+            if policy["policy_summary"].get("aws_managed"):
+                self.store.put(summary["id"], summary.get("arn"), policy["content"])
+            return policy, True
+
+        if len(summaries) <= 1 or self.max_workers <= 1:
+            results = [load_one(summary) for summary in summaries]
+        else:
+            workers = min(self.max_workers, len(summaries))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(load_one, summaries))
+        self.store.save()
+        described = sum(1 for _, was_described in results if was_described)
+        logging.getLogger(__name__).info(
+            f"Described {described} of {len(summaries)} policies"
+        )
+        return [policy for policy, _ in results]
@@ -0,0 +1,449 @@
+"""
+A compact, columnar on-disk snapshot format for organizations
+
+A snapshot file starts with a magic string and a small JSON header, followed by one
+block per column. Each column stores a null flag per row, an array of row offsets, and
+a blob of UTF-8 values, so any single value can be read from a memory-mapped file
+without decoding the rest of the file. An ID index (sorted by ID) maps every node to
+its table and row.
+
+Layout:
+
+    MAGIC | header length (uint64) | header (JSON) | column blocks...
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Any, Callable, Iterator, Union
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+MAGIC = b"ADTSNAP1"
+VERSION = 1
+
+_HEADER_LENGTH = struct.Struct("<Q")
+_OFFSET_TYPECODE = "Q"
+_OFFSET_SIZE = array(_OFFSET_TYPECODE).itemsize
+
+# Column kinds. "str" values are stored as-is, "json" values are JSON-encoded.
+_STR = "str"
+_JSON = "json"
+
+# Columns for each table as (name, kind) pairs
+_ACCOUNT_COLUMNS = [
+    ("id", _STR),
+    ("arn", _STR),
+    ("email", _STR),
+    ("name", _STR),
+    ("joined_method", _STR),
+    ("joined_timestamp", _STR),
+    ("status", _STR),
+    ("parent_id", _STR),
+    ("tags", _JSON),
+    ("policies", _JSON),
+    ("effective_policies", _JSON),
+]
+_OU_COLUMNS = [
+    ("id", _STR),
+    ("arn", _STR),
+    ("name", _STR),
+    ("parent_id", _STR),
+    ("tags", _JSON),
+    ("policies", _JSON),
+]
+_POLICY_COLUMNS = [
+    ("id", _STR),
+    ("arn", _STR),
+    ("name", _STR),
+    ("type", _STR),
+    ("aws_managed", _JSON),
+    ("description", _STR),
+    ("content", _STR),
+    ("tags", _JSON),
+    ("targets", _JSON),
+]
+_EDGE_COLUMNS = [
+    ("parent_id", _STR),
+    ("child_id", _STR),
+    ("child_type", _STR),
+]
+_POLICY_EDGE_COLUMNS = [
+    ("policy_id", _STR),
+    ("target_id", _STR),
+    ("target_type", _STR),
+]
+_INDEX_COLUMNS = [
+    ("id", _STR),
+    ("table", _STR),
+    ("row", _JSON),
+]
+
+_ORGANIZATION_FIELDS = [
+    "arn",
+    "feature_set",
+    "id",
+    "master_account_arn",
+    "master_account_email",
+    "master_account_id",
+]
+
+TABLES = {
+    "accounts": _ACCOUNT_COLUMNS,
+    "organizational_units": _OU_COLUMNS,
+    "policies": _POLICY_COLUMNS,
+    "edges": _EDGE_COLUMNS,
+    "policy_edges": _POLICY_EDGE_COLUMNS,
+    "index": _INDEX_COLUMNS,
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _encode(value: Any, kind: str) -> Union[bytes, None]:
+    """Encode a single value for a column, or None for nulls"""
+    if value is None:
+        return None
+    if kind == _JSON:
+        return json.dumps(value, default=str, separators=(",", ":")).encode()
+    return str(value).encode()
+
+
+def encode_column(values: list[Any], kind: str) -> bytes:
+    """Encode a list of values as a column block"""
+    nulls = bytearray(len(values))
+    offsets = array(_OFFSET_TYPECODE, [0])
+    blob = bytearray()
+    for i, value in enumerate(values):
+        encoded = _encode(value, kind)
+        if encoded is None:
+            nulls[i] = 1
+        else:
+            blob.extend(encoded)
+        offsets.append(len(blob))
+    if offsets.itemsize != _OFFSET_SIZE:  # pragma: no cover
+        raise SnapshotError("Unsupported platform offset size")
+    # Pad nulls so the offsets array stays aligned
+    nulls.extend(bytes(-len(nulls) % _OFFSET_SIZE))
+    return bytes(nulls) + offsets.tobytes() + bytes(blob)
+
+
+class Column(Sequence):
+    """A read-only, lazily decoded view of a column in a snapshot"""
+
+    def __init__(self, buffer: memoryview, rows: int, kind: str):
+        self._kind = kind
+        self._rows = rows
+        nulls_length = rows + (-rows % _OFFSET_SIZE)
+        offsets_length = (rows + 1) * _OFFSET_SIZE
+        self._nulls = buffer[:rows]
+        self._offsets = buffer[nulls_length : nulls_length + offsets_length].cast(
+            _OFFSET_TYPECODE
+        )
+        self._blob = buffer[nulls_length + offsets_length :]
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def raw(self, row: int) -> Union[bytes, None]:
+        """Return the undecoded bytes for a row"""
+        if self._nulls[row]:
+            return None
+        return bytes(self._blob[self._offsets[row] : self._offsets[row + 1]])
+
+    def __getitem__(self, row: Union[int, slice]) -> Any:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self._rows))]
+        if row < 0:
+            row += self._rows
+        if not 0 <= row < self._rows:
+            raise IndexError("Column index out of range")
+        value = self.raw(row)
+        if value is None:
+            return None
+        if self._kind == _JSON:
+            return json.loads(value)
+        return value.decode()
+
+    def release(self) -> None:
+        """Release views into the underlying buffer"""
+        for view in [self._nulls, self._offsets, self._blob]:
+            view.release()
+
+
+def _node_rows(organization) -> dict[str, list[dict[str, Any]]]:
+    """Flatten an organization into rows for each table"""
+    parents = organization._child_parent_tree or {}
+
+    def parent_id(node) -> Union[str, None]:
+        parent = node.parent or parents.get(node.id)
+        return None if parent is None else parent.id
+
+    def summaries(policies) -> Union[list[list[str]], None]:
+        if policies is None:
+            return None
+        return [[p.id, p.type] for p in policies]
+
+    accounts = [
+        {
+            **{
+                name: getattr(account, name)
+                for name, _ in _ACCOUNT_COLUMNS
+                if name not in ["parent_id", "policies", "effective_policies"]
+            },
+            "parent_id": parent_id(account),
+            "policies": summaries(account.policies),
+            "effective_policies": (
+                None
+                if account.effective_policies is None
+                else [p.to_dict() for p in account.effective_policies]
+            ),
+        }
+        for account in organization.accounts or []
+    ]
+    ous = [
+        {
+            "id": ou.id,
+            "arn": ou.arn,
+            "name": ou.name,
+            "parent_id": parent_id(ou),
+            "tags": ou.tags,
+            "policies": summaries(ou.policies),
+        }
+        for ou in organization.organizational_units or []
+    ]
+    policies = [
+        {
+            **{
+                name: getattr(policy.policy_summary, name)
+                for name in ["id", "arn", "name", "type", "aws_managed", "description"]
+            },
+            "content": policy.content,
+            "tags": policy.tags,
+            "targets": (
+                None
+                if policy.targets is None
+                else [t.to_dict() for t in policy.targets]
+            ),
+        }
+        for policy in organization.policies or []
+    ]
+    edges = []
+    for table, child_type in [(ous, "ORGANIZATIONAL_UNIT"), (accounts, "ACCOUNT")]:
+        for row in table:
+            if row["parent_id"] is not None:
+                edges.append(
+                    {
+                        "parent_id": row["parent_id"],
+                        "child_id": row["id"],
+                        "child_type": child_type,
+                    }
+                )
+    policy_edges = [
+        {
+            "policy_id": row["id"],
+            "target_id": target["target_id"],
+            "target_type": target["type"],
+        }
+        for row in policies
+        for target in row["targets"] or []
+    ]
+    index = sorted(
+        (
+            {"id": row["id"], "table": table, "row": i}
+            for table, rows in [
+                ("accounts", accounts),
+                ("organizational_units", ous),
+                ("policies", policies),
+            ]
+            for i, row in enumerate(rows)
+        ),
+        key=lambda row: row["id"],
+    )
+    return {
+        "accounts": accounts,
+        "organizational_units": ous,
+        "policies": policies,
+        "edges": edges,
+        "policy_edges": policy_edges,
+        "index": index,
+    }
+
+
+def write_snapshot(organization, path: Union[str, os.PathLike]) -> None:
+    """Write an organization to a snapshot file"""
+    root = None if organization.root is None else organization.root.to_dict()
+    if root is not None and getattr(organization.root, "tags", None) is not None:
+        root["tags"] = organization.root.tags
+    header = {
+        "version": VERSION,
+        "organization": {
+            **{name: getattr(organization, name) for name in _ORGANIZATION_FIELDS},
+            "available_policy_types": (
+                None
+                if organization.available_policy_types is None
+                else [p.to_dict() for p in organization.available_policy_types]
+            ),
+        },
+        "root": root,
+        "tables": {},
+    }
+    blocks = []
+    offset = 0
+    for table, rows in _node_rows(organization).items():
+        columns = {}
+        for name, kind in TABLES[table]:
+            block = encode_column([row[name] for row in rows], kind)
+            columns[name] = {"kind": kind, "offset": offset, "length": len(block)}
+            blocks.append(block)
+            offset += len(block)
+        header["tables"][table] = {"rows": len(rows), "columns": columns}
+    encoded_header = json.dumps(header, default=str).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(encoded_header)))
+        f.write(encoded_header)
+        for block in blocks:
+            f.write(block)
+
+
+class SnapshotReader:
+    """
+    Read a snapshot file through a memory map. Columns are only decoded when they're
+    accessed, so queries touch just the columns they need.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self._columns: dict[tuple[str, str], Column] = {}
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        if bytes(self._buffer[: len(MAGIC)]) != MAGIC:
+            self.close()
+            raise SnapshotError(f"{path} is not an organization snapshot")
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack(self._buffer[len(MAGIC) : start])
+        self.header = json.loads(bytes(self._buffer[start : start + header_length]))
+        if self.header["version"] != VERSION:
+            self.close()
+            raise SnapshotError(
+                f"Unsupported snapshot version {self.header['version']}"
+            )
+        self._data_start = start + header_length
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release all column views and close the memory map"""
+        for column in self._columns.values():
+            column.release()
+        self._columns = {}
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def rows(self, table: str) -> int:
+        """Return the number of rows in a table"""
+        return self.header["tables"][table]["rows"]
+
+    def column(self, table: str, name: str) -> Column:
+        """Return a lazily decoded column"""
+        key = (table, name)
+        if key not in self._columns:
+            meta = self.header["tables"][table]["columns"][name]
+            start = self._data_start + meta["offset"]
+            self._columns[key] = Column(
+                self._buffer[start : start + meta["length"]],
+                rows=self.rows(table),
+                kind=meta["kind"],
+            )
+        return self._columns[key]
+
+    def row(self, table: str, row: int) -> dict[str, Any]:
+        """Return a full row from a table as a dict"""
+        return {name: self.column(table, name)[row] for name, _ in TABLES[table]}
+
+    def lookup(self, node_id: str) -> Union[tuple[str, int], None]:
+        """Find the table and row of a node with a binary search of the ID index"""
+        ids = self.column("index", "id")
+        i = bisect_left(ids, node_id)
+        if i == len(ids) or ids[i] != node_id:
+            return None
+        return self.column("index", "table")[i], self.column("index", "row")[i]
+
+    def descendant_ids(self, node_id: str) -> Iterator[tuple[str, str]]:
+        """Yield (id, type) for all descendants of a node using the edge table"""
+        parent_ids = self.column("edges", "parent_id")
+        children = {}
+        for i, parent_id in enumerate(parent_ids):
+            children.setdefault(parent_id, []).append(i)
+        child_ids = self.column("edges", "child_id")
+        child_types = self.column("edges", "child_type")
+        stack = [node_id]
+        while len(stack) > 0:
+            for i in children.get(stack.pop(), []):
+                child_id = child_ids[i]
+                yield child_id, child_types[i]
+                stack.append(child_id)
+
+    def query_accounts(
+        self,
+        ou_id: str = None,
+        tag_key: str = None,
+        tag_value: str = None,
+        predicate: Callable[[dict[str, Any]], bool] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Return account rows under an OU (or the root) that have a tag key, optionally
+        with a specific value. Only the edge, index, and tag columns are read to
+        filter accounts, and full rows are only decoded for matches.
+        """
+        if ou_id is None:
+            rows = range(self.rows("accounts"))
+        else:
+            rows = [
+                self.lookup(child_id)[1]
+                for child_id, child_type in self.descendant_ids(ou_id)
+                if child_type == "ACCOUNT"
+            ]
+        if tag_key is not None:
+            tags = self.column("accounts", "tags")
+            rows = [
+                row
+                for row in rows
+                if (tags[row] or {}).get(tag_key, None) is not None
+                and (tag_value is None or tags[row][tag_key] == tag_value)
+            ]
+        matches = [self.row("accounts", row) for row in rows]
+        if predicate is not None:
+            matches = [row for row in matches if predicate(row)]
+        return matches
+
+
+def read_snapshot(path: Union[str, os.PathLike]) -> dict[str, Any]:
+    """
+    Read a snapshot into a dict that can be passed to `Organization.from_dict()`,
+    along with the edge data needed to rebuild the relationship maps
+    """
+    with SnapshotReader(path) as reader:
+        tables = {
+            table: [reader.row(table, i) for i in range(reader.rows(table))]
+            for table in ["accounts", "organizational_units", "policies", "edges"]
+        }
+        return {
+            "organization": reader.header["organization"],
+            "root": reader.header["root"],
+            **tables,
+        }
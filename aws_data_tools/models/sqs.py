@@ -20,10 +20,10 @@ class SqsMessageAttributes(ModelBase):
     sent_timestamp: str
 
     # Optional attributes added when using FIFO queues
-    aws_trace_header: str = field(default=None)
-    message_deduplication_id: str = field(default=None)
-    message_group_id: str = field(default=None)
-    sequence_number: str = field(default=None)
+    aws_trace_header: Optional[str] = field(default=None)
+    message_deduplication_id: Optional[str] = field(default=None)
+    message_group_id: Optional[str] = field(default=None)
+    sequence_number: Optional[str] = field(default=None)
 
     _FIFO_ATTRIBUTES = [
         "message_deduplication_id",
@@ -69,7 +69,7 @@ class SqsMessage(ModelBase):
     @property
     def is_fifo(self) -> bool:
         """Check if a message came from a FIFO queue"""
-        return self.attributes.is_fifo()
+        return self.attributes.is_fifo
 
     @property
     def calculated_md5_of_message_attributes(self) -> str:
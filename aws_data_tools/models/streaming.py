@@ -0,0 +1,183 @@
+"""
+Stream an organization crawl as events: the structure of the organization first, then
+updates as its nodes are enriched with policies, targets, tags, and effective policies
+"""
+
+from dataclasses import asdict, dataclass, field, is_dataclass
+import json
+import logging
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from .base import ModelBase
+from .phases import PhaseTiming
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .organizations import Organization, OrganizationDataBuilder
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# Events that can wait in the queue for the consumer before the crawl blocks
+DEFAULT_MAX_BUFFERED_EVENTS = 1000
+
+# Event types
+NODE = "NODE"
+UPDATE = "UPDATE"
+PHASE_COMPLETE = "PHASE_COMPLETE"
+
+# The phases that only add fields to nodes, and the fields they add by node type
+PHASE_UPDATES = {
+    "ous": {"ROOT": ["children"]},
+    "policies": {"POLICY": ["content"]},
+    "root_tags": {"ROOT": ["tags"]},
+    "ou_tags": {"ORGANIZATIONAL_UNIT": ["tags"]},
+    "account_tags": {"ACCOUNT": ["tags"]},
+    "policy_tags": {"POLICY": ["tags"]},
+    "policy_targets": {
+        "POLICY": ["targets"],
+        "ROOT": ["policies"],
+        "ORGANIZATIONAL_UNIT": ["policies"],
+        "ACCOUNT": ["policies"],
+    },
+    "effective_policies": {"ACCOUNT": ["effective_policies"]},
+}
+
+
+@dataclass
+class CrawlEvent(ModelBase):
+    """
+    An event in a streamed crawl. NODE events carry a whole node, UPDATE events carry
+    the fields of a node that a phase added, and a PHASE_COMPLETE event follows the
+    events of each phase.
+    """
+
+    event: str
+    phase: str
+    node_type: Optional[str] = field(default=None)
+    node_id: Optional[str] = field(default=None)
+    data: Optional[dict[str, Any]] = field(default=None)
+
+    def to_ndjson(self) -> str:
+        """Serialize the event as a single line of JSON"""
+        return json.dumps(self.to_dict(), default=str)
+
+
+def _nodes(organization: "Organization", node_type: str) -> list[Any]:
+    if node_type == "ROOT":
+        return [] if organization.root is None else [organization.root]
+    if node_type == "ORGANIZATIONAL_UNIT":
+        return organization.organizational_units or []
+    if node_type == "ACCOUNT":
+        return organization.accounts or []
+    return organization.policies or []
+
+
+def _serialize(value: Any) -> Any:
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, list):
+        return [_serialize(item) for item in value]
+    return value
+
+
+def _node_id(node: Any) -> str:
+    summary = getattr(node, "policy_summary", None)
+    return node.id if summary is None else summary.id
+
+
+def _node_events(
+    organization: "Organization", phase: str, node_type: str
+) -> Iterator[CrawlEvent]:
+    for node in _nodes(organization, node_type):
+        yield CrawlEvent(NODE, phase, node_type, _node_id(node), node.to_dict())
+
+
+def phase_events(organization: "Organization", phase: str) -> Iterator[CrawlEvent]:
+    """Yield the events for the data a completed fetch phase added to an organization"""
+    if phase == "organization":
+        data = organization.to_dict()
+        for key in ["accounts", "organizational_units", "policies", "root"]:
+            data.pop(key, None)
+        yield CrawlEvent(NODE, phase, "ORGANIZATION", organization.id, data)
+        yield from _node_events(organization, phase, "ROOT")
+        yield from _node_events(organization, phase, "POLICY")
+    elif phase == "ous":
+        yield from _node_events(organization, phase, "ORGANIZATIONAL_UNIT")
+    elif phase == "accounts":
+        yield from _node_events(organization, phase, "ACCOUNT")
+    for node_type, names in PHASE_UPDATES.get(phase, {}).items():
+        for node in _nodes(organization, node_type):
+            data = {name: _serialize(getattr(node, name)) for name in names}
+            if all(value is None for value in data.values()):
+                continue
+            yield CrawlEvent(UPDATE, phase, node_type, _node_id(node), data)
+
+
+_DONE = object()
+
+
+class _CrawlCancelled(Exception):
+    """Raised in the crawl thread to stop the crawl once the consumer stops"""
+
+
+def iter_crawl_events(
+    builder: "OrganizationDataBuilder",
+    strict_priorities: bool = True,
+    max_buffered: int = DEFAULT_MAX_BUFFERED_EVENTS,
+) -> Iterator[CrawlEvent]:
+    """
+    Run `builder.fetch_all()` in a thread and yield the events for each phase as it
+    completes. Errors from the crawl are raised once the events before them are
+    consumed. Up to `max_buffered` events wait for the consumer. If it stops early,
+    the crawl stops once the phases already running finish.
+    """
+    queue: Queue = Queue(maxsize=max_buffered)
+    cancelled = Event()
+
+    def put(item: Any) -> None:
+        while not cancelled.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+        raise _CrawlCancelled()
+
+    def on_complete(timing: PhaseTiming) -> None:
+        # Called before phases that depend on this one start, so the nodes don't
+        # change while they're serialized. Raising here stops new phases starting.
+        for event in phase_events(builder.dm, timing.name):
+            put(event)
+        data = {"start": timing.start, "end": timing.end, "seconds": timing.seconds}
+        put(CrawlEvent(PHASE_COMPLETE, timing.name, data=data))
+
+    def crawl() -> None:
+        try:
+            builder.fetch_all(
+                on_complete=on_complete, strict_priorities=strict_priorities
+            )
+            put(_DONE)
+        except _CrawlCancelled:
+            return
+        except Exception as exc:
+            try:
+                put(exc)
+            except _CrawlCancelled:
+                return
+
+    thread = Thread(target=crawl, name="crawl", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                thread.join()
+                raise item
+            yield item
+        thread.join()
+    finally:
+        cancelled.set()
@@ -0,0 +1,90 @@
+from aws_data_tools.models.checkpoint import CheckpointJournal, checkpoint_key
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+
+class TestCheckpointJournal:
+    """Test the append-only checkpoint journal"""
+
+    def test_resume(self, tmp_path):
+        with CheckpointJournal(tmp_path, resume=False) as journal:
+            journal.record("tags", "123456789012", {"Owner": "me"})
+            journal.record("api", checkpoint_key("list_roots", {}), [{"id": "r-1"}])
+        journal = CheckpointJournal(tmp_path)
+        assert len(journal) == 2
+        assert ("tags", "123456789012") in journal
+        assert journal.get("api", checkpoint_key("list_roots", {})) == [{"id": "r-1"}]
+        journal.close()
+        with CheckpointJournal(tmp_path, resume=False) as journal:
+            assert len(journal) == 0
+
+    def test_incomplete_entries_are_skipped(self, tmp_path):
+        with CheckpointJournal(tmp_path) as journal:
+            journal.record("tags", "a", {})
+        # Simulate a crash in the middle of writing an entry
+        with open(journal.path, "a") as f:
+            f.write('{"kind": "tags", "key": "b", "da')
+        with CheckpointJournal(tmp_path) as journal:
+            assert len(journal) == 1
+            journal.record("tags", "c", {})
+        with CheckpointJournal(tmp_path) as journal:
+            assert ("tags", "a") in journal and ("tags", "c") in journal
+
+    def test_keys_are_stable(self):
+        assert checkpoint_key("list", {"b": 1, "a": 2}) == checkpoint_key(
+            "list", {"a": 2, "b": 1}
+        )
+
+
+class TestResumeCrawl:
+    """Test resuming an interrupted crawl from a checkpoint journal"""
+
+    def test_only_remaining_units_are_fetched(
+        self, organizations_client, seeded_organization, tmp_path
+    ):
+        expected = OrganizationDataBuilder(
+            client=organizations_client, include_account_parents=True, init_all=True
+        ).to_dict()
+
+        # The first run dies after crawling the OU tree
+        with CheckpointJournal(tmp_path / "checkpoint", resume=False) as journal:
+            odb = OrganizationDataBuilder(
+                client=organizations_client, checkpoint=journal
+            )
+            odb.fetch_organization()
+            odb.fetch_root_tags()
+            odb.fetch_policies()
+            odb.fetch_ous()
+
+        organizations_client.calls.clear()
+        with CheckpointJournal(tmp_path / "checkpoint") as journal:
+            odb = OrganizationDataBuilder(
+                client=organizations_client,
+                include_account_parents=True,
+                checkpoint=journal,
+                init_all=True,
+            )
+        calls = organizations_client.calls
+        assert odb.to_dict() == expected
+        for func in [
+            "describe_organization",
+            "describe_policy",
+            "list_organizational_units_for_parent",
+            "list_accounts_for_parent",
+        ]:
+            assert func not in calls
+        assert calls["list_tags_for_resource"] == len(odb.dm.accounts) + len(
+            odb.dm.organizational_units
+        ) + len([p for p in odb.dm.policies if not p.policy_summary.aws_managed])
+        assert calls["describe_effective_policy"] > 0
+
+        # Everything is checkpointed now, so resuming again makes no calls
+        organizations_client.calls.clear()
+        with CheckpointJournal(tmp_path / "checkpoint") as journal:
+            odb = OrganizationDataBuilder(
+                client=organizations_client,
+                include_account_parents=True,
+                checkpoint=journal,
+                init_all=True,
+            )
+        assert odb.to_dict() == expected
+        assert sum(organizations_client.calls.values()) == 0
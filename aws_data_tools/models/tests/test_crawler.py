@@ -0,0 +1,99 @@
+import datetime
+import json
+
+from moto import mock_aws
+import pytest
+
+from aws_data_tools.client import SessionPool
+from aws_data_tools.models.crawler import OrganizationCrawler, OrganizationTarget
+from aws_data_tools.models.organizations import Organization
+
+ROLE_ARNS = {
+    "111111111111": "arn:aws:iam::111111111111:role/OrganizationReader",
+    "222222222222": "arn:aws:iam::222222222222:role/OrganizationReader",
+}
+
+BUILDER_KWARGS = {
+    "init_organization": True,
+    "init_policies": True,
+    "init_ous": True,
+    "init_accounts": True,
+    "include_account_parents": True,
+}
+
+
+@pytest.fixture
+def organizations(aws_credentials, monkeypatch):
+    """Create an organization with a different number of accounts in 2 accounts"""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        pool = SessionPool()
+        for i, role_arn in enumerate(ROLE_ARNS.values()):
+            client = pool.get(role_arn=role_arn).client("organizations")
+            client.create_organization(FeatureSet="ALL")
+            for j in range(i + 1):
+                client.create_account(
+                    AccountName=f"account-{j}", Email=f"account-{i}-{j}@example.com"
+                )
+        yield
+
+
+class TestOrganizationCrawler:
+    """Test crawling multiple organizations"""
+
+    def test_crawl(self, organizations):
+        crawler = OrganizationCrawler(
+            targets=list(ROLE_ARNS.values()), builder_kwargs=BUILDER_KWARGS
+        )
+        results = crawler.crawl()
+        assert list(results) == list(ROLE_ARNS.values())
+        for (account_id, role_arn), n_accounts in zip(ROLE_ARNS.items(), [2, 3]):
+            org = results[role_arn]
+            assert isinstance(org, Organization)
+            assert org.master_account_id == account_id
+            # The management account plus the created accounts
+            assert len(org.accounts) == n_accounts
+            assert all(a.parent.id == org.root.id for a in org.accounts)
+
+    def test_sessions_and_semaphore_are_shared(self, organizations):
+        targets = [OrganizationTarget(role_arn=arn) for arn in ROLE_ARNS.values()]
+        crawler = OrganizationCrawler(targets=targets, builder_kwargs=BUILDER_KWARGS)
+        clients = [crawler.client_for(t) for t in targets + targets]
+        assert clients[0].session is clients[2].session
+        assert clients[0].session is not clients[1].session
+        assert {id(c.semaphore) for c in clients} == {id(crawler._semaphore)}
+
+    def test_iter_ndjson(self, organizations):
+        targets = [
+            OrganizationTarget(role_arn=arn, name=f"org-{account_id}")
+            for account_id, arn in ROLE_ARNS.items()
+        ]
+        crawler = OrganizationCrawler(targets=targets, builder_kwargs=BUILDER_KWARGS)
+        records = [json.loads(line) for line in crawler.iter_ndjson()]
+        counts = {}
+        for record in records:
+            key = (record["organization"], record["node_type"])
+            counts[key] = counts.get(key, 0) + 1
+        assert counts[("org-111111111111", "ORGANIZATION")] == 1
+        assert counts[("org-111111111111", "ACCOUNT")] == 2
+        assert counts[("org-222222222222", "ROOT")] == 1
+        assert counts[("org-222222222222", "ACCOUNT")] == 3
+
+    def test_duplicate_targets(self):
+        with pytest.raises(ValueError):
+            OrganizationCrawler(targets=[ROLE_ARNS["111111111111"]] * 2)
+
+
+class TestSessionPool:
+    """Test pooled sessions for assumed roles"""
+
+    def test_assumed_role_credentials_refresh(self, organizations):
+        session = SessionPool().get(role_arn=ROLE_ARNS["111111111111"])
+        credentials = session.get_credentials()
+        access_key = credentials.get_frozen_credentials().access_key
+        assert credentials.get_frozen_credentials().access_key == access_key
+        # Credentials that are about to expire are refreshed on next use
+        credentials._expiry_time = datetime.datetime.now(datetime.timezone.utc)
+        assert credentials.get_frozen_credentials().access_key != access_key
+        identity = session.client("sts").get_caller_identity()
+        assert identity["Account"] == "111111111111"
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from aws_data_tools.models.diff import Change, OrganizationDiff
+from aws_data_tools.models.organizations import Organization, OrganizationDataBuilder
+
+
+def crawl(client) -> Organization:
+    odb = OrganizationDataBuilder(
+        client=client, include_account_parents=True, init_all=True
+    )
+    return odb.dm
+
+
+@pytest.fixture
+def changed(organizations_client, seeded_organization) -> tuple[Organization, ...]:
+    client = organizations_client
+    ids = seeded_organization
+    old = crawl(client)
+    client.api(
+        "move_account",
+        account_id=ids["acmeinc-forgotten-child"],
+        source_parent_id=ids["/"],
+        destination_parent_id=ids["/Large BU"],
+    )
+    client.api(
+        "tag_resource",
+        resource_id=ids["/Oracle Admins"],
+        tags=[{"Key": "Owner", "Value": "dba"}],
+    )
+    client.api(
+        "detach_policy", policy_id=ids["LargeBuTags"], target_id=ids["/Large BU"]
+    )
+    client.api("attach_policy", policy_id=ids["LargeBuTags"], target_id=ids["/YOLO BU"])
+    new_ou = client.api(
+        "create_organizational_unit", parent_id=ids["/"], name="Brand New"
+    )["organizational_unit"]
+    return old, crawl(client), new_ou["id"]
+
+
+def test_diff(changed, seeded_organization):
+    old, new, new_ou_id = changed
+    ids = seeded_organization
+    diff = old.diff(new)
+    assert isinstance(diff, OrganizationDiff)
+    changes = diff.by_node()
+    assert (
+        Change(
+            ids["acmeinc-forgotten-child"],
+            "ACCOUNT",
+            "MOVED",
+            attribute="parent",
+            old=ids["/"],
+            new=ids["/Large BU"],
+        )
+        in changes[ids["acmeinc-forgotten-child"]]
+    )
+    assert changes[ids["/Oracle Admins"]] == [
+        Change(
+            ids["/Oracle Admins"],
+            "ORGANIZATIONAL_UNIT",
+            "TAG_ADDED",
+            "Owner",
+            new="dba",
+        )
+    ]
+    assert changes[ids["/Large BU"]] == [
+        Change(
+            ids["/Large BU"],
+            "ORGANIZATIONAL_UNIT",
+            "POLICY_DETACHED",
+            "TAG_POLICY",
+            old=ids["LargeBuTags"],
+        )
+    ]
+    assert changes[ids["/YOLO BU"]][0].change_type == "POLICY_ATTACHED"
+    assert changes[new_ou_id] == [Change(new_ou_id, "ORGANIZATIONAL_UNIT", "ADDED")]
+    # Effective policies changed for accounts that moved in or out of Large BU
+    effective_changes = [
+        c
+        for c in diff.changes
+        if c.attribute == "effective_policies.TAG_POLICY"
+        and c.node_id == ids["acmeinc-elasticsearch-dev"]
+    ]
+    assert len(effective_changes) == 1
+
+
+def test_diff_identical(changed):
+    old = changed[0]
+    assert old.diff(old).changes == []
+
+
+def test_diff_ndjson(changed):
+    old, new, _ = changed
+    lines = old.diff(new).to_ndjson().splitlines()
+    assert len(lines) > 0
+    assert {"node_id", "node_type", "change_type"} <= set(json.loads(lines[0]))
+
+
+def test_diff_from_json(changed):
+    old, new, _ = changed
+    loaded_old = Organization.from_dict(json.loads(old.to_json()), convert_keys=False)
+    loaded_new = Organization.from_dict(json.loads(new.to_json()), convert_keys=False)
+    assert loaded_old.diff(loaded_new) == old.diff(new)
@@ -0,0 +1,121 @@
+import io
+import re
+
+import pytest
+
+from aws_data_tools.models.organizations import (
+    Account,
+    Organization,
+    OrganizationalUnit,
+    ParChild,
+    Root,
+)
+
+ROOT = ParChild(id="r-abcd", type="ROOT")
+BIG_OU = ParChild(id="ou-abcd-big", type="ORGANIZATIONAL_UNIT")
+NESTED_OU = ParChild(id="ou-abcd-nested", type="ORGANIZATIONAL_UNIT")
+INNER_OU = ParChild(id="ou-abcd-inner", type="ORGANIZATIONAL_UNIT")
+
+
+def account(account_id: str, parent: ParChild, name: str = None) -> Account:
+    return Account(
+        arn=f"arn:aws:organizations::000000000000:account/o-x/{account_id}",
+        email=f"{account_id}@example.com",
+        id=account_id,
+        joined_method="CREATED",
+        joined_timestamp="2021-01-01 00:00:00+00:00",
+        name=name or account_id,
+        status="ACTIVE",
+        parent=parent,
+    )
+
+
+def ou(parchild: ParChild, parent: ParChild, name: str) -> OrganizationalUnit:
+    return OrganizationalUnit(
+        arn=f"arn:aws:organizations::000000000000:ou/o-x/{parchild.id}",
+        id=parchild.id,
+        name=name,
+        parent=parent,
+    )
+
+
+@pytest.fixture
+def organization():
+    return Organization(
+        root=Root(
+            arn="arn:aws:organizations::000000000000:root/o-x/r-abcd",
+            id="r-abcd",
+            name="Root",
+            policy_types=[],
+        ),
+        organizational_units=[
+            ou(BIG_OU, ROOT, "Big"),
+            ou(NESTED_OU, ROOT, "Nested"),
+            ou(INNER_OU, NESTED_OU, "Inner"),
+        ],
+        accounts=[
+            account("000000000000", ROOT, name='Management "main"'),
+            *[account(f"{i:012d}", BIG_OU) for i in range(1, 13)],
+            account("999999999999", INNER_OU),
+        ],
+    )
+
+
+def edges(source: str) -> dict[tuple[str, str], str]:
+    """Return the minlen (or style) of each edge in DOT source, keyed by node IDs"""
+    ret = {}
+    for tail, head, attrs in re.findall(
+        r'\t"(.+?)" -> "(.+?)"(?: \[(.+)\])?\n', source
+    ):
+        ret[(tail, head)] = attrs
+    return ret
+
+
+class TestToDot:
+    """Test rendering organizations as DOT diagrams"""
+
+    def test_nodes_and_edges(self, organization):
+        source = organization.to_dot()
+        assert source.startswith('digraph "Organization" {\n')
+        assert source.endswith("}\n")
+        assert '\t"r-abcd" [label="Root" shape=circle]\n' in source
+        assert '\t"ou-abcd-big" [label="Big" shape=box]\n' in source
+        assert '[label="Management \\"main\\"" shape=ellipse]' in source
+        assert len(edges(source)) == 3 + 14
+
+    def test_stagger_and_fanout(self, organization):
+        source_edges = edges(organization.to_dot())
+        # Edges to the 12 leaf accounts cycle through minlen 1 to 10
+        minlens = [source_edges[(BIG_OU.id, f"{i:012d}")] for i in range(1, 13)]
+        assert minlens == [f"minlen={i % 10 + 1}" for i in range(12)]
+        # Root's children are an OU with many children, an OU with a single child (a
+        # chain node), and an account (a leaf)
+        assert source_edges[(ROOT.id, BIG_OU.id)] == ""
+        assert source_edges[(ROOT.id, NESTED_OU.id)] == "minlen=1"
+        assert source_edges[(ROOT.id, "000000000000")] == "minlen=2"
+        # Without fanout, chain nodes aren't staggered
+        source_edges = edges(organization.to_dot(fanout=False, stagger=3))
+        assert source_edges[(ROOT.id, NESTED_OU.id)] == ""
+        assert source_edges[(BIG_OU.id, "000000000004")] == "minlen=1"
+
+    def test_subtree(self, organization):
+        source = organization.to_dot(root_id=NESTED_OU.id)
+        assert list(edges(source)) == [
+            (NESTED_OU.id, INNER_OU.id),
+            (INNER_OU.id, "999999999999"),
+        ]
+        assert ROOT.id not in source
+        with pytest.raises(ValueError):
+            organization.to_dot(root_id="ou-missing")
+
+    def test_root_without_children(self, organization):
+        organization.organizational_units = []
+        organization.accounts = []
+        source = organization.to_dot(root_id=None)
+        assert edges(source) == {}
+        assert '"r-abcd" [label="Root" shape=circle]' in source
+
+    def test_write_dot(self, organization):
+        f = io.StringIO()
+        organization.write_dot(f, root_id=BIG_OU.id)
+        assert f.getvalue() == organization.to_dot(root_id=BIG_OU.id)
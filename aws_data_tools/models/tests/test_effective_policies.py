@@ -0,0 +1,117 @@
+from unittest import mock
+
+from botocore.exceptions import ClientError
+import pytest
+
+from aws_data_tools.models.effective_policies import EffectivePolicyFetcher
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code}}, "DescribeEffectivePolicy")
+
+
+@pytest.fixture
+def builder(organizations_client, seeded_organization):
+    odb = OrganizationDataBuilder(client=organizations_client)
+    odb.fetch_organization()
+    odb.fetch_accounts()
+    organizations_client.calls.clear()
+    return odb
+
+
+class TestEffectivePolicyFetcher:
+    """Test concurrently fetching effective policies"""
+
+    def test_fetch(self, organizations_client, seeded_organization):
+        fetcher = EffectivePolicyFetcher(client=organizations_client, max_workers=4)
+        account_id = seeded_organization["acmeinc-forgotten-child"]
+        requests = [
+            (account_id, "TAG_POLICY"),
+            (account_id, "AISERVICES_OPT_OUT_POLICY"),
+        ]
+        results = fetcher.fetch(requests + requests)
+        assert organizations_client.calls["describe_effective_policy"] == 2
+        assert results.policies[requests[0]]["target_id"] == account_id
+        assert results.policies[requests[1]] is None
+        assert results.errors == {}
+        assert results.stats["TAG_POLICY"].to_dict() == {
+            "policy_type": "TAG_POLICY",
+            "calls": 1,
+            "found": 1,
+            "not_found": 0,
+            "failed": 0,
+            "retries": 0,
+            "seconds": results.stats["TAG_POLICY"].seconds,
+        }
+        assert results.stats["AISERVICES_OPT_OUT_POLICY"].not_found == 1
+
+    def test_botocore_retries_counted(self, organizations_client, seeded_organization):
+        describe = organizations_client.describe_effective_policy
+        account_id = seeded_organization["acmeinc-forgotten-child"]
+
+        def retried(**kwargs):
+            # botocore retried the request twice before it succeeded
+            return {**describe(**kwargs), "response_metadata": {"retry_attempts": 2}}
+
+        fetcher = EffectivePolicyFetcher(client=organizations_client)
+        with mock.patch.object(
+            organizations_client, "describe_effective_policy", side_effect=retried
+        ):
+            results = fetcher.fetch([(account_id, "TAG_POLICY")])
+        assert results.stats["TAG_POLICY"].retries == 2
+        assert results.policies[(account_id, "TAG_POLICY")] is not None
+
+
+class TestFetchEffectivePolicies:
+    """Test the effective policy stage of OrganizationDataBuilder"""
+
+    def test_failed_targets_do_not_abort(
+        self, builder, organizations_client, seeded_organization
+    ):
+        failed_id = seeded_organization["acmeinc-forgotten-child"]
+        describe = organizations_client.describe_effective_policy
+
+        def failing(policy_type, target_id):
+            if target_id == failed_id:
+                raise client_error("TargetNotFoundException")
+            return describe(policy_type=policy_type, target_id=target_id)
+
+        with mock.patch.object(
+            organizations_client, "describe_effective_policy", side_effect=failing
+        ):
+            builder.fetch_effective_policies()
+        results = builder.effective_policy_results
+        assert set(results.errors) == {
+            (failed_id, "TAG_POLICY"),
+            (failed_id, "AISERVICES_OPT_OUT_POLICY"),
+        }
+        accounts = {account.id: account for account in builder.dm.accounts}
+        assert accounts[failed_id].effective_policies == []
+        assert all(
+            len(account.effective_policies) > 0
+            for account_id, account in accounts.items()
+            if account_id != failed_id
+        )
+        assert results.stats["TAG_POLICY"].failed == 1
+
+    def test_auth_errors_raised(self, builder, organizations_client):
+        with mock.patch.object(
+            organizations_client,
+            "describe_effective_policy",
+            side_effect=client_error("ExpiredTokenException"),
+        ), pytest.raises(ClientError) as exc_info:
+            builder.fetch_effective_policies()
+        assert exc_info.value.response["Error"]["Code"] == "ExpiredTokenException"
+        assert builder.effective_policy_results is None
+
+    def test_enabled_policy_types_are_read_once(self, builder):
+        with mock.patch.object(
+            OrganizationDataBuilder,
+            "enabled_policy_types",
+            new_callable=mock.PropertyMock,
+            return_value=["TAG_POLICY"],
+        ) as enabled_policy_types:
+            builder.fetch_effective_policies()
+        assert enabled_policy_types.call_count == 1
+        assert set(builder.effective_policy_results.stats) == {"TAG_POLICY"}
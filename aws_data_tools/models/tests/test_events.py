@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+import textwrap
+
+from aws_data_tools.models.config import get_model
+from aws_data_tools.models.sns import LambdaSnsMessage
+from aws_data_tools.models.sqs import SqsMessage
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(path: str) -> dict:
+    with open(FIXTURES / path) as f:
+        return json.load(f)
+
+
+def test_sqs_message():
+    record = load_fixture("sqs/receive-message.json")["Records"][0]
+    message = SqsMessage.from_dict(record)
+    assert message.message_id == "19dd0b57-b21e-4ac1-bd88-01bbb068cb78"
+    assert message.event_source_arn == "arn:aws:sqs:us-east-1:123456789012:MyQueue"
+    assert message.attributes.approximate_receive_count == "1"
+    assert message.is_md5_of_body_valid
+    assert not message.is_body_json
+    assert not message.is_fifo
+
+
+def test_lambda_sns_message():
+    record = load_fixture("sns/notification.json")["Records"][0]
+    message = LambdaSnsMessage.from_dict(record)
+    assert message.event_source == "aws:sns"
+    assert message.sns.message == "example message"
+    assert not message.sns.is_body_json
+
+
+def test_config_item_change_notification():
+    event = load_fixture("config/item-change-notification.json")
+    invoking_event = json.loads(event["invokingEvent"])
+    model = get_model(invoking_event["messageType"])
+    notification = model.from_dict(invoking_event)
+    assert notification.message_type == "ConfigurationItemChangeNotification"
+    assert notification.configuration_item["resource_id"] == "i-00000000"
+
+
+def test_event_models_without_boto3():
+    # Block boto3 and botocore in a fresh interpreter, like a Lambda function packaged
+    # without them
+    script = textwrap.dedent(f"""
+        import json
+        import sys
+
+        sys.modules["boto3"] = None
+        sys.modules["botocore"] = None
+
+        from aws_data_tools.models.sns import LambdaSnsMessage
+        from aws_data_tools.models.sqs import SqsMessage
+
+        with open({str(FIXTURES / "sqs/receive-message.json")!r}) as f:
+            message = SqsMessage.from_dict(json.load(f)["Records"][0])
+        assert SqsMessage.from_json(message.to_json(), convert_keys=False) == message
+        with open({str(FIXTURES / "sns/notification.json")!r}) as f:
+            LambdaSnsMessage.from_dict(json.load(f)["Records"][0])
+        try:
+            message.to_dynamodb()
+        except ImportError as exc:
+            print(exc)
+        """)
+    proc = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+    assert "requires the boto3 library" in proc.stdout
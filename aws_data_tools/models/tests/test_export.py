@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from aws_data_tools.models.export import (
+    CHILD,
+    EDGE_COLUMNS,
+    NODE_COLUMNS,
+    POLICY_TARGET,
+    iter_edge_rows,
+    iter_graphml,
+    iter_mermaid,
+    iter_node_rows,
+    write_csv,
+    write_tables,
+)
+from aws_data_tools.models.organizations import (
+    DependencyError,
+    Organization,
+    OrganizationDataBuilder,
+)
+
+GRAPHML = "{http://graphml.graphdrawing.org/xmlns}"
+
+
+@pytest.fixture
+def organization(organizations_client, seeded_organization) -> Organization:
+    odb = OrganizationDataBuilder(client=organizations_client, init_all=True)
+    return odb.dm
+
+
+class TestTables:
+    """Test exporting node and edge tables"""
+
+    def test_rows(self, organization, seeded_organization):
+        nodes = {row["id"]: row for row in iter_node_rows(organization)}
+        n_policies = len(organization.policies)
+        assert (
+            len(nodes)
+            == 1
+            + len(organization.organizational_units)
+            + len(organization.accounts)
+            + n_policies
+        )
+        account = nodes[seeded_organization["acmeinc-forgotten-child"]]
+        assert account["type"] == "ACCOUNT"
+        assert account["parent_id"] == seeded_organization["/"]
+        assert json.loads(account["tags"]) == {}
+        edges = list(iter_edge_rows(organization))
+        assert {
+            "source_id": seeded_organization["/"],
+            "target_id": seeded_organization["acmeinc-forgotten-child"],
+            "type": CHILD,
+            "policy_type": None,
+        } in edges
+        assert {
+            "source_id": seeded_organization["ForgottenChildTags"],
+            "target_id": seeded_organization["acmeinc-forgotten-child"],
+            "type": POLICY_TARGET,
+            "policy_type": "TAG_POLICY",
+        } in edges
+        # Every node except the root has exactly one parent
+        children = [e["target_id"] for e in edges if e["type"] == CHILD]
+        assert len(children) == len(set(children)) == len(nodes) - 1 - n_policies
+
+    def test_csv(self, organization):
+        nodes_f, edges_f = io.StringIO(), io.StringIO()
+        write_csv(organization, nodes_f, edges_f)
+        nodes = list(csv.DictReader(io.StringIO(nodes_f.getvalue())))
+        edges = list(csv.DictReader(io.StringIO(edges_f.getvalue())))
+        assert list(nodes[0]) == NODE_COLUMNS
+        assert list(edges[0]) == EDGE_COLUMNS
+        assert len(nodes) == len(list(iter_node_rows(organization)))
+        assert len(edges) == len(list(iter_edge_rows(organization)))
+
+    def test_write_tables(self, organization, tmp_path):
+        write_tables(organization, tmp_path / "tables", "csv")
+        assert sorted(p.name for p in (tmp_path / "tables").iterdir()) == [
+            "edges.csv",
+            "nodes.csv",
+        ]
+        with pytest.raises(ValueError):
+            write_tables(organization, tmp_path, "XLSX")
+
+    def test_parquet(self, organization, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        write_tables(organization, tmp_path, "PARQUET")
+        nodes = pq.read_table(tmp_path / "nodes.parquet")
+        assert nodes.column_names == NODE_COLUMNS
+        assert nodes.num_rows == len(list(iter_node_rows(organization)))
+
+    def test_parquet_requires_pyarrow(self, organization, tmp_path):
+        with mock.patch.dict("sys.modules", {"pyarrow": None}):
+            with pytest.raises(DependencyError):
+                write_tables(organization, tmp_path, "PARQUET")
+
+
+class TestGraphFormats:
+    """Test exporting GraphML and Mermaid"""
+
+    def test_graphml(self, organization, seeded_organization):
+        root = ET.fromstring("".join(iter_graphml(organization)))
+        graph = root.find(f"{GRAPHML}graph")
+        nodes = {n.get("id"): n for n in graph.findall(f"{GRAPHML}node")}
+        edges = graph.findall(f"{GRAPHML}edge")
+        assert len(nodes) == len(list(iter_node_rows(organization)))
+        assert len(edges) == len(list(iter_edge_rows(organization)))
+        account = nodes[seeded_organization["acmeinc-forgotten-child"]]
+        data = {d.get("key"): d.text for d in account.findall(f"{GRAPHML}data")}
+        assert data["name"] == "acmeinc-forgotten-child"
+        assert data["type"] == "ACCOUNT"
+
+    def test_mermaid(self, organization, seeded_organization):
+        lines = list(iter_mermaid(organization))
+        assert lines[0] == "flowchart TD\n"
+        root_id = seeded_organization["/"].replace("-", "_")
+        assert f'    {root_id}(("Root"))\n' in lines
+        account_id = seeded_organization["acmeinc-forgotten-child"]
+        assert f"    {root_id} --> {account_id}\n" in lines
+        for line in lines[1:]:
+            assert "-" not in line.replace("-->", "").split('"')[0]
@@ -0,0 +1,217 @@
+from collections import Counter
+import gc
+from threading import Lock
+import time
+from unittest import mock
+
+from botocore.exceptions import ClientError
+import pytest
+
+from aws_data_tools.models.lazy import (
+    LAZY_FIELDS,
+    LazyAccount,
+    LazyOrganizationalUnit,
+    NodeLoader,
+)
+from aws_data_tools.models.organizations import (
+    Account,
+    OrganizationDataBuilder,
+    ParChild,
+    Root,
+)
+
+ACCOUNT_NAMES = [
+    "acmeinc-elasticsearch-dev",
+    "acmeinc-elasticsearch-prod",
+    "acmeinc-forgotten-child",
+]
+
+
+@pytest.fixture
+def loader(organizations_client, seeded_organization):
+    return OrganizationDataBuilder(client=organizations_client).loader
+
+
+class TestNodeLoader:
+    """Test lazily loading organization nodes"""
+
+    def test_account_fields_load_on_access(
+        self, loader, organizations_client, seeded_organization
+    ):
+        account = loader.account(seeded_organization["acmeinc-forgotten-child"])
+        assert isinstance(account, LazyAccount)
+        assert account.loaded_fields == []
+        assert organizations_client.calls == {"describe_account": 1}
+        assert account.parent == ParChild(id=seeded_organization["/"], type="ROOT")
+        assert account.loaded_fields == ["parent"]
+        assert [p.id for p in account.policies] == [
+            seeded_organization["ForgottenChildTags"]
+        ]
+        assert [p.policy_type for p in account.effective_policies] == ["TAG_POLICY"]
+        assert account.tags == {}
+        assert sorted(account.loaded_fields) == sorted(LAZY_FIELDS["ACCOUNT"])
+        # Loaded fields are cached
+        calls = sum(organizations_client.calls.values())
+        assert account.to_dict()["name"] == "acmeinc-forgotten-child"
+        assert sum(organizations_client.calls.values()) == calls
+
+    def test_lookup_calls_scale_with_accounts(
+        self, loader, organizations_client, seeded_organization
+    ):
+        accounts = loader.accounts(seeded_organization[n] for n in ACCOUNT_NAMES)
+        loader.load_all(accounts)
+        # 2 enabled policy types, so each account needs describe_account,
+        # list_parents, list_tags_for_resource, 2 list_policies_for_target, and 2
+        # describe_effective_policy calls, plus a single list_roots call
+        calls = organizations_client.calls
+        assert calls["list_roots"] == 1
+        assert sum(calls.values()) == 1 + 7 * len(ACCOUNT_NAMES)
+        assert "list_accounts" not in calls
+        assert "list_organizational_units_for_parent" not in calls
+
+    def test_pending_loads_are_batched(self, organizations_client, seeded_organization):
+        loader = NodeLoader(client=organizations_client, batch_size=2)
+        accounts = loader.accounts(seeded_organization[n] for n in ACCOUNT_NAMES)
+        accounts[0].tags
+        assert [a.loaded_fields for a in accounts] == [["tags"], ["tags"], []]
+        accounts[2].tags
+        assert organizations_client.calls["list_tags_for_resource"] == 3
+
+    def test_failed_effective_policies_not_cached(
+        self, loader, organizations_client, seeded_organization
+    ):
+        account = loader.account(seeded_organization["acmeinc-forgotten-child"])
+        error = ClientError(
+            {"Error": {"Code": "ServiceException"}}, "DescribeEffectivePolicy"
+        )
+        with mock.patch.object(
+            organizations_client, "describe_effective_policy", side_effect=error
+        ), pytest.raises(ClientError):
+            account.effective_policies
+        assert "effective_policies" not in account.loaded_fields
+        # The next access retries the failed calls
+        assert [p.policy_type for p in account.effective_policies] == ["TAG_POLICY"]
+
+    def test_pending_nodes_not_kept_alive(self, loader, seeded_organization):
+        accounts = loader.accounts(seeded_organization[n] for n in ACCOUNT_NAMES)
+        assert len(loader._pending[("ACCOUNT", "tags")]) == len(ACCOUNT_NAMES)
+        del accounts
+        gc.collect()
+        assert all(len(pending) == 0 for pending in loader._pending.values())
+
+    def test_ou_children(self, loader, seeded_organization):
+        ou = loader.organizational_unit(seeded_organization["/GrumpySysadmins"])
+        assert isinstance(ou, LazyOrganizationalUnit)
+        assert ou.name == "GrumpySysadmins"
+        assert ParChild(
+            id=seeded_organization["/GrumpySysadmins/Services"],
+            type="ORGANIZATIONAL_UNIT",
+        ) in (ou.children)
+        assert "children" in repr(ou)
+        assert "tags" not in repr(ou)
+
+    def test_policy_content_and_targets(self, loader, seeded_organization):
+        root = loader.root()
+        policy_id = root.policies[0].id
+        policy = loader.policy(policy_id)
+        assert policy.content is not None
+        assert [t.target_id for t in policy.targets] == [root.id]
+
+
+class TestRoot:
+    """Test fetching root data from the API"""
+
+    def test_fetch_all(self, organizations_client, seeded_organization):
+        root = Root.from_api(client=organizations_client)
+        assert root.id == seeded_organization["/"]
+        root.fetch_all(client=organizations_client)
+        assert root.tags == {}
+        assert [p.id for p in root.policies] == [seeded_organization["RootTags"]]
+        child_ids = {c.id for c in root.children}
+        assert seeded_organization["/GrumpySysadmins"] in child_ids
+        assert seeded_organization["acmeinc-forgotten-child"] in child_ids
+
+    def test_fetch_child_ous_keeps_accounts(
+        self, organizations_client, seeded_organization
+    ):
+        root = Root.from_api(client=organizations_client)
+        root.fetch_child_accounts(client=organizations_client)
+        assert {c.type for c in root.children} == {"ACCOUNT"}
+        root.fetch_child_ous(client=organizations_client)
+        assert {c.type for c in root.children} == {"ACCOUNT", "ORGANIZATIONAL_UNIT"}
+
+    def test_fetch_reuses_loader(self, loader):
+        root = loader.root()
+        other = Root.from_api(client=loader.client)
+        with mock.patch.object(NodeLoader, "__init__", side_effect=AssertionError):
+            # Lazy roots fetch with the loader that created them
+            root.fetch_tags()
+            root.fetch_child_ous()
+            other.fetch_policies(loader=loader)
+        assert root.tags == {}
+        assert len(other.policies) == 1
+
+
+class TestLookupAccounts:
+    """Test looking up accounts without crawling the organization"""
+
+    def test_lookup_accounts(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(client=organizations_client)
+        account_ids = [seeded_organization[n] for n in ACCOUNT_NAMES]
+        accounts = odb.lookup_accounts(
+            account_ids, include_parents=True, include_tags=True
+        )
+        assert [a.id for a in accounts] == account_ids
+        assert [type(a) for a in accounts] == [Account] * len(account_ids)
+        assert all(a.tags == {} for a in accounts)
+        assert all(a.policies is None for a in accounts)
+        assert accounts[2].parent.type == "ROOT"
+        assert dict(organizations_client.calls) == {
+            "describe_account": 3,
+            "list_parents": 3,
+            "list_tags_for_resource": 3,
+        }
+
+    def test_lookup_accounts_in_flight(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(client=organizations_client, max_workers=2)
+        iter_pages = organizations_client.iter_pages
+        lock = Lock()
+        in_flight = Counter()
+
+        def counting_iter_pages(func: str, **kwargs):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            try:
+                time.sleep(0.01)
+                yield from iter_pages(func, **kwargs)
+            finally:
+                with lock:
+                    in_flight["now"] -= 1
+
+        with mock.patch.object(
+            organizations_client, "iter_pages", side_effect=counting_iter_pages
+        ):
+            odb.lookup_accounts(
+                [seeded_organization[n] for n in ACCOUNT_NAMES],
+                include_parents=True,
+                include_policies=True,
+                include_tags=True,
+            )
+        # Fields are fetched one at a time, so workers aren't multiplied
+        assert in_flight["peak"] <= 2
+
+    def test_ancestors_are_memoized(self, organizations_client, seeded_organization):
+        loader = NodeLoader(client=organizations_client)
+        dev, prod = (
+            seeded_organization[n]
+            for n in ["acmeinc-elasticsearch-dev", "acmeinc-elasticsearch-prod"]
+        )
+        ancestors = loader.get_ancestors(dev)
+        assert ancestors[0] == ParChild(id=seeded_organization["/"], type="ROOT")
+        calls = organizations_client.calls["list_parents"]
+        assert calls == len(ancestors)
+        # The accounts are in sibling OUs, so only the account's parent and the
+        # parent's parent need to be looked up
+        assert loader.get_ancestors(prod)[:-1] == ancestors[:-1]
+        assert organizations_client.calls["list_parents"] == calls + 2
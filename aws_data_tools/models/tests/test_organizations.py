@@ -1,3 +1,6 @@
+import json
+import pickle
+import sys
 from typing import Union
 from unittest import mock
 
@@ -11,6 +14,7 @@ from aws_data_tools.client import APIClient
 from aws_data_tools.models.organizations import (
     Account,
     EffectivePolicy,
+    InvalidEffectivePolicyType,
     Organization,
     OrganizationDataBuilder,
     OrganizationalUnit,
@@ -535,3 +539,251 @@ class TestOrganizationDataBuilder:
         source_str = builder.to_dot()
         source = graphviz.Source(source_str, filename="test.png", format="png")
         output = source.render()
+
+
+class TestEffectivePolicyGrouping:
+    """Test deriving effective policies from the policy attachment graph"""
+
+    @pytest.fixture
+    def builder(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(client=organizations_client)
+        odb.fetch_organization()
+        odb.fetch_policies()
+        odb.fetch_ous()
+        odb.fetch_accounts()
+        odb.fetch_policy_targets()
+        organizations_client.calls.clear()
+        return odb
+
+    @staticmethod
+    def effective_policies(builder) -> dict[str, list[EffectivePolicy]]:
+        return {
+            account.id: account.effective_policies for account in builder.dm.accounts
+        }
+
+    def test_grouped_matches_per_account(self, builder, organizations_client):
+        builder.fetch_effective_policies(dedupe=False)
+        per_account = self.effective_policies(builder)
+        per_account_calls = organizations_client.calls["describe_effective_policy"]
+        organizations_client.calls.clear()
+        builder.fetch_effective_policies()
+        grouped = self.effective_policies(builder)
+        grouped_calls = organizations_client.calls["describe_effective_policy"]
+        assert grouped == per_account
+        # 3 tag policy groups (root only, Large BU, and the forgotten child) and 1
+        # AI services opt-out policy group
+        assert grouped_calls < per_account_calls
+        assert grouped_calls == 4
+
+    def test_accounts_without_attachments(self, builder, seeded_organization):
+        builder.fetch_effective_policies()
+        account = builder.dm.accounts[
+            builder.dm._account_index_map[seeded_organization["acmeinc-not-in-an-ou"]]
+        ]
+        assert [p.policy_type for p in account.effective_policies] == ["TAG_POLICY"]
+
+    def test_accounts_missing_from_tree(
+        self, builder, organizations_client, seeded_organization
+    ):
+        # An account created or moved after the OU tree was fetched
+        account_id = seeded_organization["acmeinc-not-in-an-ou"]
+        del builder.dm._child_parent_tree[account_id]
+        builder.fetch_effective_policies()
+        account = builder.dm.accounts[builder.dm._account_index_map[account_id]]
+        assert [p.policy_type for p in account.effective_policies] == ["TAG_POLICY"]
+        # The 4 group representatives, plus the account for each enabled type
+        assert organizations_client.calls["describe_effective_policy"] == 6
+
+    def test_falls_back_without_policy_targets(
+        self, organizations_client, seeded_organization
+    ):
+        odb = OrganizationDataBuilder(client=organizations_client)
+        odb.fetch_organization()
+        odb.fetch_accounts()
+        organizations_client.calls.clear()
+        odb.fetch_effective_policies()
+        # One call per account per enabled effective policy type
+        assert organizations_client.calls["describe_effective_policy"] == 2 * len(
+            odb.dm.accounts
+        )
+
+    def test_verify_sample_detects_mismatch(
+        self, builder, organizations_client, seeded_organization
+    ):
+        drifted_id = seeded_organization["acmeinc-also-not-in-an-ou"]
+        describe = organizations_client.describe_effective_policy
+
+        def drifted(policy_type, target_id):
+            data = describe(policy_type=policy_type, target_id=target_id)
+            if target_id == drifted_id:
+                data["effective_policy"]["policy_content"] = "{}"
+            return data
+
+        builder.effective_policy_verify_sample = 100
+        with mock.patch.object(
+            organizations_client, "describe_effective_policy", side_effect=drifted
+        ):
+            builder.fetch_effective_policies()
+        account = builder.dm.accounts[builder.dm._account_index_map[drifted_id]]
+        assert account.effective_policies[0].policy_content == "{}"
+
+
+class TestComputeEffectivePolicy:
+    """Test computing effective policies from the model without API calls"""
+
+    @pytest.fixture
+    def organization(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(client=organizations_client)
+        odb.fetch_organization()
+        odb.fetch_policies()
+        odb.fetch_ous()
+        odb.fetch_accounts()
+        odb.fetch_policy_targets()
+        organizations_client.calls.clear()
+        return odb.dm
+
+    def test_compute_effective_policy(
+        self, organization, organizations_client, seeded_organization
+    ):
+        account_id = seeded_organization["acmeinc-forgotten-child"]
+        effective_policy = organization.compute_effective_policy(
+            account_id, "TAG_POLICY"
+        )
+        assert isinstance(effective_policy, EffectivePolicy)
+        assert effective_policy.target_id == account_id
+        assert json.loads(effective_policy.policy_content) == {
+            "tags": {
+                "costcenter": {"tag_key": "CostCenter"},
+                "owner": {"tag_key": "Owner"},
+            }
+        }
+        assert sum(organizations_client.calls.values()) == 0
+
+    def test_compute_effective_policy_for_ou(self, organization, seeded_organization):
+        effective_policy = organization.compute_effective_policy(
+            seeded_organization["/Large BU/Logging"], "TAG_POLICY"
+        )
+        assert json.loads(effective_policy.policy_content) == {
+            "tags": {
+                "costcenter": {"tag_key": "CostCenter"},
+                "team": {"tag_key": "Team"},
+            }
+        }
+
+    def test_compute_effective_policy_not_in_effect(
+        self, organization, seeded_organization
+    ):
+        assert (
+            organization.compute_effective_policy(
+                seeded_organization["acmeinc-not-in-an-ou"],
+                "AISERVICES_OPT_OUT_POLICY",
+            )
+            is None
+        )
+
+    def test_compute_effective_policy_invalid_type(self, organization):
+        with pytest.raises(InvalidEffectivePolicyType):
+            organization.compute_effective_policy(
+                organization.root.id, "SERVICE_CONTROL_POLICY"
+            )
+
+    def test_memoized_per_ancestor(self, organization, seeded_organization):
+        organization.compute_effective_policy(
+            seeded_organization["/Large BU/Logging/Dev"], "TAG_POLICY"
+        )
+        assert ("TAG_POLICY", seeded_organization["/Large BU"]) in (
+            organization._effective_policy_cache
+        )
+        organization.clear_effective_policy_cache()
+        assert organization._effective_policy_cache is None
+
+
+class TestCompactModels:
+    """Test the memory-saving representation of large collections of models"""
+
+    @pytest.mark.parametrize(
+        "model,kwargs",
+        [
+            (ParChild, {"id": "ou-1", "type": "ORGANIZATIONAL_UNIT"}),
+            (PolicySummaryForTarget, {"id": "p-1", "type": "TAG_POLICY"}),
+            (
+                PolicyTargetSummary,
+                {"arn": "arn", "name": "name", "target_id": "1", "type": "ACCOUNT"},
+            ),
+        ],
+    )
+    def test_slotted_models(self, model, kwargs):
+        obj = model.from_dict(kwargs)
+        assert not hasattr(obj, "__dict__")
+        assert obj.to_dict() == kwargs
+        assert pickle.loads(pickle.dumps(obj)) == obj
+
+    def test_account_from_dict(self):
+        data = {
+            "arn": "arn",
+            "email": "a@example.com",
+            "id": "111111111111",
+            "joined_timestamp": "2021-11-23",
+            "name": "a",
+            "joined_method": "".join(["CRE", "ATED"]),
+            "status": "".join(["ACT", "IVE"]),
+        }
+        account = Account.from_dict(data)
+        assert not hasattr(account, "__dict__")
+        assert account.status is sys.intern("ACTIVE")
+        assert account.joined_method is sys.intern("CREATED")
+        assert account.to_dict()["status"] == "ACTIVE"
+
+    def test_compact_shares_instances(self):
+        accounts = [
+            Account.from_dict(
+                {
+                    "arn": f"arn-{i}",
+                    "email": f"{i}@example.com",
+                    "id": str(i),
+                    "joined_timestamp": "2021-11-23",
+                    "name": str(i),
+                    "joined_method": "CREATED",
+                    "status": "ACTIVE",
+                    "parent": {"id": "ou-1", "type": "ORGANIZATIONAL_UNIT"},
+                    "policies": [{"id": "p-1", "type": "TAG_POLICY"}],
+                    "tags": {"Environment": "prod"},
+                }
+            )
+            for i in range(3)
+        ]
+        org = Organization(accounts=accounts)
+        before = org.to_dict()
+        assert accounts[0].parent is not accounts[1].parent
+        org.compact()
+        assert org.to_dict() == before
+        assert accounts[0].parent is accounts[1].parent is accounts[2].parent
+        assert accounts[0].policies[0] is accounts[1].policies[0]
+        keys = [next(iter(account.tags)) for account in accounts]
+        assert keys[0] is keys[1] is keys[2]
+
+
+class TestFetchTags:
+    """Test fetching tags for all nodes in an organization"""
+
+    def test_fetch_all_tags(self, organizations_client, seeded_organization):
+        client = organizations_client
+        account_id = seeded_organization["acmeinc-forgotten-child"]
+        ou_id = seeded_organization["/Large BU"]
+        policy_id = seeded_organization["RootTags"]
+        for resource_id, value in [(account_id, "a"), (ou_id, "o"), (policy_id, "p")]:
+            client.api(
+                "tag_resource",
+                resource_id=resource_id,
+                tags=[{"Key": "Owner", "Value": value}],
+            )
+        odb = OrganizationDataBuilder(client=client, max_workers=4)
+        odb.fetch_all_tags()
+        dm = odb.dm
+        assert dm.get_node(account_id).tags == {"Owner": "a"}
+        assert dm.get_node(ou_id).tags == {"Owner": "o"}
+        policies = {p.policy_summary.id: p for p in dm.policies}
+        assert policies[policy_id].tags == {"Owner": "p"}
+        assert dm.root.tags == {}
+        assert all(account.tags is not None for account in dm.accounts)
+        assert all(ou.tags is not None for ou in dm.organizational_units)
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+from aws_data_tools.models.phases import (
+    Phase,
+    critical_path,
+    format_plan,
+    plan_phases,
+    run_phases,
+)
+
+
+def sleeper(seconds: float, log: list[str] = None, name: str = None):
+    def func():
+        time.sleep(seconds)
+        if log is not None:
+            log.append(name)
+
+    return func
+
+
+class TestRunPhases:
+    """Test planning and running phases"""
+
+    def test_plan(self):
+        phases = [
+            Phase("a", sleeper(0)),
+            Phase("b", sleeper(0), ("a",)),
+            Phase("c", sleeper(0), ("a",)),
+            Phase("d", sleeper(0), ("b", "c")),
+        ]
+        assert plan_phases(phases) == [["a"], ["b", "c"], ["d"]]
+        assert format_plan(phases).splitlines()[-1] == "3. d (after: b, c)"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            plan_phases([Phase("a", sleeper(0), ("missing",))])
+        with pytest.raises(ValueError):
+            plan_phases(
+                [Phase("a", sleeper(0), ("b",)), Phase("b", sleeper(0), ("a",))]
+            )
+
+    def test_overlaps_independent_phases(self):
+        log = []
+        phases = [
+            Phase("a", sleeper(0.1, log, "a"), ()),
+            Phase("b", sleeper(0.2, log, "b"), ()),
+            Phase("c", sleeper(0.1, log, "c"), ("a",)),
+            Phase("d", sleeper(0, log, "d"), ("b", "c")),
+        ]
+        start = time.monotonic()
+        timings = run_phases(phases, max_workers=4)
+        elapsed = time.monotonic() - start
+        # The critical path is a -> c -> d (or b -> d), 0.2s, instead of 0.4s serially
+        assert elapsed < 0.35
+        assert log.index("c") > log.index("a")
+        assert log[-1] == "d"
+        assert timings["c"].start >= timings["a"].end
+        assert timings["d"].start >= max(timings["b"].end, timings["c"].end)
+        path, seconds = critical_path(phases, timings)
+        assert path[-1] == "d"
+        assert elapsed >= seconds >= 0.2
+
+    def test_error_stops_new_phases(self):
+        log = []
+
+        def fail():
+            raise RuntimeError("failed")
+
+        phases = [
+            Phase("a", fail),
+            Phase("b", sleeper(0.05, log, "b")),
+            Phase("c", sleeper(0, log, "c"), ("a",)),
+        ]
+        with pytest.raises(RuntimeError):
+            run_phases(phases, max_workers=2)
+        assert log == ["b"]
+
+    def test_priorities(self):
+        log = []
+        phases = [
+            Phase("a", sleeper(0.05, log, "a"), priority=1),
+            Phase("b", sleeper(0.05, log, "b"), priority=0),
+            Phase("c", sleeper(0, log, "c"), ("a",), priority=0),
+        ]
+        # c raises the priority of a, which it depends on
+        run_phases(phases, max_workers=1)
+        assert log == ["a", "b", "c"]
+        phases[2].priority = 2
+        log.clear()
+        timings = run_phases(phases, max_workers=4, strict_priorities=True)
+        assert log == ["b", "a", "c"]
+        assert timings["a"].start >= timings["b"].end
+
+
+class TestBuilderPhases:
+    """Test fetching an organization in phases"""
+
+    def test_plan(self):
+        odb = OrganizationDataBuilder(init_connection=False)
+        stages = plan_phases(odb.phases())
+        assert stages[0] == ["organization"]
+        assert set(stages[1]) == {"ous", "policies", "root_tags", "accounts"}
+        assert stages[-1] == ["effective_policies"]
+        odb.include_account_parents = True
+        assert "accounts (after: ous)" in odb.plan_phases()
+
+    def test_fetch_all_matches_serial(self, organizations_client, seeded_organization):
+        results = {}
+        for workers in [1, 4]:
+            odb = OrganizationDataBuilder(
+                client=organizations_client,
+                include_account_parents=True,
+                max_phase_workers=workers,
+                init_all=True,
+            )
+            assert set(odb.phase_timings) == {p.name for p in odb.phases()}
+            results[workers] = odb.to_dict()
+        assert results[4] == results[1]
+
+    def test_ou_tags_fetch_ous(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(
+            client=organizations_client, init_organization=True
+        )
+        odb.fetch_ou_tags()
+        assert all(ou.tags is not None for ou in odb.dm.organizational_units)
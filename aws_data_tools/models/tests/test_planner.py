@@ -0,0 +1,105 @@
+import math
+
+import pytest
+
+from aws_data_tools.models.organizations import Organization, OrganizationDataBuilder
+from aws_data_tools.models.planner import (
+    MAX_AUTO_WORKERS,
+    counts_from_organization,
+    plan_crawl,
+)
+
+
+@pytest.fixture
+def dump(organizations_client, seeded_organization) -> Organization:
+    odb = OrganizationDataBuilder(
+        client=organizations_client, include_account_parents=True, init_all=True
+    )
+    organizations_client.calls.clear()
+    return Organization.from_dict(odb.to_dict(), convert_keys=False)
+
+
+class TestPlanCrawl:
+    """Test planning the API calls of a crawl"""
+
+    def test_plan_from_dump(self, organizations_client, dump):
+        odb = OrganizationDataBuilder(
+            client=organizations_client, include_account_parents=True
+        )
+        plan = odb.plan_crawl(organization=dump)
+        assert plan.exact
+        assert organizations_client.calls == {}
+        odb.fetch_all()
+        assert plan.calls_by_operation() == dict(organizations_client.calls)
+        assert plan.total_calls == sum(organizations_client.calls.values())
+        assert set(plan.phase_seconds) == {p.name for p in odb.phases()}
+
+    def test_plan_init_flags(self, organizations_client, dump):
+        flags = {
+            "init_organization": True,
+            "init_accounts": True,
+            "init_account_tags": True,
+            "init_effective_policies": True,
+        }
+        plan = OrganizationDataBuilder(client=organizations_client).plan_crawl(
+            organization=dump, init_all=False, **flags
+        )
+        OrganizationDataBuilder(client=organizations_client, **flags)
+        assert plan.calls_by_operation() == dict(organizations_client.calls)
+        with pytest.raises(ValueError):
+            plan_crawl(
+                OrganizationDataBuilder(client=organizations_client),
+                counts_from_organization(dump),
+                init_fetch_everything=True,
+            )
+
+    def test_plan_from_api(self, organizations_client, seeded_organization):
+        odb = OrganizationDataBuilder(
+            client=organizations_client, include_account_parents=True
+        )
+        plan = odb.plan_crawl()
+        # Only list calls are made to plan
+        assert set(organizations_client.calls) <= {
+            "list_roots",
+            "list_policies",
+            "list_accounts",
+            "list_organizational_units_for_parent",
+        }
+        assert not plan.exact
+        organizations_client.calls.clear()
+        odb.fetch_all()
+        # Operations can be called in several phases, e.g., tags for each node type,
+        # so calls are compared by operation when every phase's count is exact
+        planned = plan.calls_by_operation()
+        estimated = {c.operation for c in plan.calls if not c.exact}
+        assert "list_tags_for_resource" not in estimated
+        assert {
+            operation: calls
+            for operation, calls in planned.items()
+            if operation not in estimated
+        } == {
+            operation: calls
+            for operation, calls in organizations_client.calls.items()
+            if operation not in estimated
+        }
+        # Effective policies are estimated from every account without the targets
+        assert planned["describe_effective_policy"] >= (
+            organizations_client.calls["describe_effective_policy"]
+        )
+
+    def test_estimate(self, organizations_client, dump):
+        odb = OrganizationDataBuilder(client=organizations_client, max_workers=4)
+        plan = odb.plan_crawl(organization=dump, rate_limit=10, latency=0.1)
+        assert plan.estimated_seconds >= plan.total_requests / 10
+        assert plan.recommended_max_workers == 1
+        plan = odb.plan_crawl(organization=dump, latency=0.1)
+        assert plan.estimated_seconds < plan.total_requests * 0.1
+        assert plan.recommended_max_workers == MAX_AUTO_WORKERS
+        plan = odb.plan_crawl(organization=dump, rate_limit=100, latency=0.1)
+        assert plan.recommended_max_workers == math.ceil(100 * 0.1)
+        assert "Recommended max workers: 10" in plan.format()
+
+    def test_counts_need_accounts(self, dump):
+        dump.accounts = None
+        with pytest.raises(ValueError):
+            counts_from_organization(dump)
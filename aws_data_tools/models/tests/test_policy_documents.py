@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from aws_data_tools.models.organizations import Organization, OrganizationDataBuilder
+from aws_data_tools.models.policy_documents import (
+    DOCUMENTS_KEY,
+    content_hash,
+    dedupe_documents,
+    expand_documents,
+)
+
+
+@pytest.fixture
+def organization(organizations_client, seeded_organization) -> Organization:
+    odb = OrganizationDataBuilder(client=organizations_client, init_all=True)
+    return odb.dm
+
+
+def test_content_hash():
+    assert content_hash("{}") == content_hash("{}")
+    assert content_hash("{}") != content_hash("{ }")
+    assert content_hash("{}").startswith("sha256:")
+
+
+def test_dedupe_documents_round_trip():
+    content = '{"tags": {}}'
+    data = {
+        "policies": [{"content": content}, {"content": None}],
+        "accounts": [
+            {"id": str(i), "effective_policies": [{"policy_content": content}]}
+            for i in range(3)
+        ]
+        + [{"id": "3", "effective_policies": None}],
+    }
+    deduped = dedupe_documents(data)
+    assert deduped[DOCUMENTS_KEY] == {content_hash(content): content}
+    assert deduped["policies"][0] == {"content_hash": content_hash(content)}
+    assert deduped["accounts"][0]["effective_policies"] == [
+        {"policy_content_hash": content_hash(content)}
+    ]
+    # The input isn't modified
+    assert data["policies"][0] == {"content": content}
+    assert expand_documents(deduped) == {
+        **data,
+        "policies": [{"content": content}, {}],
+    }
+
+
+def test_expand_documents_missing_reference():
+    data = {"policies": [{"content_hash": "sha256:missing"}], DOCUMENTS_KEY: {}}
+    with pytest.raises(KeyError):
+        expand_documents(data)
+
+
+class TestOrganizationDedupe:
+    """Test deduping policy documents in an organization"""
+
+    def test_dedupe_policies(self, organization):
+        documents = organization.dedupe_policies()
+        effective = [
+            p for a in organization.accounts for p in a.effective_policies or []
+        ]
+        assert len(documents) < len(effective) + len(organization.policies)
+        for policy in effective:
+            ref = content_hash(policy.policy_content)
+            # Equal documents share the stored copy
+            assert policy.policy_content is documents[ref]
+            assert organization.get_policy_document(ref) is documents[ref]
+
+    def test_to_dict_round_trip(self, organization):
+        deduped = organization.to_dict(dedupe_policies=True)
+        for policy in deduped["policies"]:
+            assert "content" not in policy
+            assert policy["content_hash"] in deduped[DOCUMENTS_KEY]
+        loaded = Organization.from_dict(
+            json.loads(json.dumps(deduped)), convert_keys=False
+        )
+        assert loaded.to_dict() == organization.to_dict()
+        assert json.loads(organization.to_json(dedupe_policies=True)) == deduped
+
+    def test_field_name(self, organization):
+        with pytest.raises(ValueError):
+            organization.to_dict(field_name="accounts", dedupe_policies=True)
@@ -0,0 +1,121 @@
+import os
+from unittest import mock
+
+import pytest
+
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+from aws_data_tools.models.policy_loader import PolicyContentStore, PolicyLoader
+
+SUMMARY = {
+    "arn": "arn:aws:organizations::aws:policy/service_control_policy/p-FullAWSAccess",
+    "aws_managed": True,
+    "id": "p-FullAWSAccess",
+    "name": "FullAWSAccess",
+    "type": "SERVICE_CONTROL_POLICY",
+}
+
+
+@pytest.fixture
+def scp_organization(organizations_client, seeded_organization) -> dict[str, str]:
+    """The seeded organization with SCPs enabled, which lists FullAWSAccess"""
+    organizations_client.api(
+        "enable_policy_type",
+        root_id=seeded_organization["/"],
+        policy_type="SERVICE_CONTROL_POLICY",
+    )
+    organizations_client.calls.clear()
+    return seeded_organization
+
+
+class TestPolicyContentStore:
+    """Test the store for AWS managed policy content"""
+
+    def test_get_by_id_or_arn(self):
+        store = PolicyContentStore()
+        store.put(SUMMARY["id"], SUMMARY["arn"], "{}")
+        assert store.get(SUMMARY["id"]) == "{}"
+        assert store.get("p-other", arn=SUMMARY["arn"]) == "{}"
+        assert store.get("p-other") is None
+        assert len(store) == 1
+
+    def test_persisted(self, tmp_path):
+        path = tmp_path / "policies.json"
+        store = PolicyContentStore(str(path))
+        store.put(SUMMARY["id"], SUMMARY["arn"], "{}")
+        # Puts aren't written until the store is saved
+        assert not path.exists()
+        store.save()
+        store = PolicyContentStore(str(path))
+        assert SUMMARY["arn"] in store
+        assert store.get(SUMMARY["id"]) == "{}"
+
+
+class TestPolicyLoader:
+    """Test loading policy details"""
+
+    def test_load_uses_store(self):
+        api = mock.Mock(
+            return_value={"policy": {"policy_summary": SUMMARY, "content": "{}"}}
+        )
+        loader = PolicyLoader(api=api, store=PolicyContentStore())
+        customer = {**SUMMARY, "aws_managed": False, "id": "p-customer"}
+        for _ in range(2):
+            policies = loader.load([SUMMARY, customer])
+            assert [p["content"] for p in policies] == ["{}", "{}"]
+        # The AWS managed policy is only described the first time
+        assert api.call_count == 3
+
+    def test_load_saves_store_once(self, tmp_path):
+        api = mock.Mock(
+            side_effect=lambda _, policy_id: {
+                "policy": {
+                    "policy_summary": {**SUMMARY, "id": policy_id},
+                    "content": "{}",
+                }
+            }
+        )
+        store = PolicyContentStore(str(tmp_path / "policies.json"))
+        loader = PolicyLoader(api=api, store=store, max_workers=4)
+        summaries = [{**SUMMARY, "arn": None, "id": f"p-{i}"} for i in range(8)]
+        with mock.patch("os.replace", wraps=os.replace) as replace:
+            loader.load(summaries)
+            loader.load(summaries)
+        assert replace.call_count == 1
+        assert len(PolicyContentStore(store.path)) == 8
+
+
+class TestBuilderPolicies:
+    """Test fetching policies with the builder"""
+
+    def test_lists_enabled_types_once(self, organizations_client, scp_organization):
+        odb = OrganizationDataBuilder(
+            client=organizations_client,
+            init_organization=True,
+            init_policies=True,
+            policy_store=PolicyContentStore(),
+        )
+        types = {p.policy_summary.type for p in odb.dm.policies}
+        assert types == {
+            "AISERVICES_OPT_OUT_POLICY",
+            "SERVICE_CONTROL_POLICY",
+            "TAG_POLICY",
+        }
+        assert all(p.content is not None for p in odb.dm.policies)
+        # One call for each enabled type, shared by the organization and policies
+        assert organizations_client.calls["list_policies"] == 3
+        assert organizations_client.calls["describe_policy"] == len(odb.dm.policies)
+
+    def test_aws_managed_described_once(self, organizations_client, scp_organization):
+        store = PolicyContentStore()
+        for _ in range(2):
+            odb = OrganizationDataBuilder(
+                client=organizations_client,
+                init_organization=True,
+                init_policies=True,
+                policy_store=store,
+            )
+        n_policies = len(odb.dm.policies)
+        assert organizations_client.calls["describe_policy"] == 2 * n_policies - 1
+        managed = [p for p in odb.dm.policies if p.policy_summary.aws_managed]
+        assert [p.policy_summary.name for p in managed] == ["FullAWSAccess"]
+        assert managed[0].content == store.get(managed[0].policy_summary.id)
@@ -0,0 +1,85 @@
+import pytest
+
+from aws_data_tools.models.organizations import Organization, OrganizationDataBuilder
+from aws_data_tools.models.snapshot import (
+    SnapshotError,
+    SnapshotReader,
+    encode_column,
+    Column,
+)
+
+
+@pytest.fixture
+def organization(organizations_client, seeded_organization) -> Organization:
+    organizations_client.api(
+        "tag_resource",
+        resource_id=seeded_organization["acmeinc-elasticsearch-dev"],
+        tags=[{"Key": "Environment", "Value": "dev"}],
+    )
+    organizations_client.api(
+        "tag_resource",
+        resource_id=seeded_organization["acmeinc-elasticsearch-prod"],
+        tags=[{"Key": "Environment", "Value": "prod"}],
+    )
+    odb = OrganizationDataBuilder(
+        client=organizations_client, include_account_parents=True, init_all=True
+    )
+    return odb.dm
+
+
+@pytest.mark.parametrize("kind", ["str", "json"])
+def test_column_roundtrip(kind):
+    values = ["a", None, "", "ü" * 3, "last"]
+    column = Column(memoryview(encode_column(values, kind)), len(values), kind)
+    assert list(column) == values
+    assert column[-1] == "last"
+    with pytest.raises(IndexError):
+        column[len(values)]
+
+
+def test_snapshot_roundtrip(organization, tmp_path):
+    path = tmp_path / "org.snapshot"
+    organization.to_snapshot(path)
+    loaded = Organization.from_snapshot(path)
+    assert loaded.to_dict() == organization.to_dict()
+    assert loaded._child_parent_tree == organization._child_parent_tree
+    assert loaded.get_node(organization.accounts[0].id) == organization.accounts[0]
+
+
+def test_query_accounts(organization, seeded_organization, tmp_path):
+    path = tmp_path / "org.snapshot"
+    organization.to_snapshot(path)
+    with SnapshotReader(path) as reader:
+        under_logging = reader.query_accounts(ou_id=seeded_organization["/Large BU"])
+        assert {row["name"] for row in under_logging} >= {
+            "acmeinc-elasticsearch-dev",
+            "acmeinc-elasticsearch-prod",
+        }
+        tagged = reader.query_accounts(
+            ou_id=seeded_organization["/Large BU"], tag_key="Environment"
+        )
+        assert sorted(row["name"] for row in tagged) == [
+            "acmeinc-elasticsearch-dev",
+            "acmeinc-elasticsearch-prod",
+        ]
+        prod = reader.query_accounts(tag_key="Environment", tag_value="prod")
+        assert [row["name"] for row in prod] == ["acmeinc-elasticsearch-prod"]
+        # Only the columns needed for the query were decoded
+        assert ("organizational_units", "name") not in reader._columns
+
+
+def test_lookup(organization, seeded_organization, tmp_path):
+    path = tmp_path / "org.snapshot"
+    organization.to_snapshot(path)
+    with SnapshotReader(path) as reader:
+        table, row = reader.lookup(seeded_organization["/Large BU"])
+        assert table == "organizational_units"
+        assert reader.column(table, "name")[row] == "Large BU"
+        assert reader.lookup("ou-does-not-exist") is None
+
+
+def test_invalid_snapshot(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"{}" * 16)
+    with pytest.raises(SnapshotError):
+        SnapshotReader(path)
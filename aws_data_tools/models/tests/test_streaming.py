@@ -0,0 +1,94 @@
+import json
+import threading
+from unittest import mock
+
+import pytest
+
+from aws_data_tools.models.organizations import Organization, OrganizationDataBuilder
+from aws_data_tools.models.streaming import (
+    NODE,
+    PHASE_COMPLETE,
+    UPDATE,
+    iter_crawl_events,
+)
+
+NODE_KEYS = {
+    "ROOT": "root",
+    "ORGANIZATIONAL_UNIT": "organizational_units",
+    "ACCOUNT": "accounts",
+    "POLICY": "policies",
+}
+
+
+def apply_events(events: list[dict]) -> dict:
+    """Build an organization dict from NDJSON crawl events"""
+    data = {}
+    nodes = {}
+    for event in events:
+        if event["event"] == NODE:
+            if event["node_type"] == "ORGANIZATION":
+                data.update(event["data"])
+                continue
+            nodes[event["node_id"]] = dict(event["data"])
+            key = NODE_KEYS[event["node_type"]]
+            if key == "root":
+                data[key] = nodes[event["node_id"]]
+            else:
+                data.setdefault(key, []).append(nodes[event["node_id"]])
+        elif event["event"] == UPDATE:
+            nodes[event["node_id"]].update(event["data"])
+    return data
+
+
+@pytest.fixture
+def builder(organizations_client, seeded_organization) -> OrganizationDataBuilder:
+    return OrganizationDataBuilder(
+        client=organizations_client, include_account_parents=True
+    )
+
+
+class TestIterCrawl:
+    """Test streaming a crawl as events"""
+
+    def test_consumer_stopping_stops_crawl(self, builder, organizations_client):
+        events = iter_crawl_events(builder, max_buffered=1)
+        assert next(events).phase == "organization"
+        [crawl] = [t for t in threading.enumerate() if t.name == "crawl"]
+        events.close()
+        crawl.join(5)
+        assert not crawl.is_alive()
+        # The crawl stopped before its last phase
+        assert "describe_effective_policy" not in organizations_client.calls
+
+    def test_structure_first(self, builder):
+        events = [json.loads(e.to_ndjson()) for e in builder.iter_crawl()]
+        phases = [e["phase"] for e in events if e["event"] == PHASE_COMPLETE]
+        assert phases[:3] == ["organization", "ous", "accounts"]
+        assert phases[-1] == "effective_policies"
+        assert set(phases) == {p.name for p in builder.phases()}
+        # Every node is streamed before any enrichment
+        structure = {"organization", "ous", "accounts"}
+        first = next(i for i, e in enumerate(events) if e["phase"] not in structure)
+        assert all(e["event"] != NODE for e in events[first:])
+        node_types = {e["node_type"] for e in events[:first]}
+        assert {"ORGANIZATION", "ROOT", "ORGANIZATIONAL_UNIT", "ACCOUNT"} <= node_types
+        # The events rebuild the same organization as the builder
+        org = Organization.from_dict(apply_events(events), convert_keys=False)
+        assert org.to_dict() == builder.to_dict()
+
+    def test_priorities(self, builder):
+        builder.phase_priorities = {"account_tags": 0}
+        phases = [e.phase for e in builder.iter_crawl() if e.event == PHASE_COMPLETE]
+        assert phases.index("account_tags") < phases.index("policies")
+
+    def test_error(self, builder):
+        with mock.patch.object(
+            OrganizationDataBuilder,
+            "fetch_ou_tags",
+            side_effect=RuntimeError("failed"),
+        ):
+            events = builder.iter_crawl()
+            # The structure is streamed before the error
+            assert next(events).node_type == "ORGANIZATION"
+            with pytest.raises(RuntimeError):
+                list(events)
@@ -4,4 +4,15 @@ Utilities for common operations that happen across different services
 
 # flake8: noqa: F401
 
-from . import dynamodb, tags, validators
+from typing import TYPE_CHECKING
+
+from .imports import lazy_loader
+
+# Submodules are imported on first access
+__getattr__, __dir__, __all__ = lazy_loader(
+    __name__,
+    submodules=["casing", "dynamodb", "imports", "policies", "tags", "validators"],
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from . import casing, dynamodb, policies, tags, validators
@@ -0,0 +1,61 @@
+"""
+Fast conversion of dict keys between the PascalCase used by AWS APIs and snake_case
+
+Conversions of individual keys are delegated to humps and memoized in a bounded cache.
+API responses reuse a small set of keys, so nearly every lookup is a cache hit. Only
+keys are converted; values (like policy documents) are passed through untouched.
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+import logging
+from typing import Any
+
+from humps import decamelize, depascalize, pascalize
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+KEY_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def snake_key(key: str) -> str:
+    """Convert a PascalCase or camelCase key to snake_case"""
+    return decamelize(depascalize(key))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def pascal_key(key: str) -> str:
+    """Convert a snake_case key to PascalCase"""
+    return pascalize(key)
+
+
+def snake_keys(data: Any) -> Any:
+    """
+    Recursively convert the keys of dicts (including dicts in lists) to snake_case in
+    a single pass. Equivalent to `humps.decamelize(humps.depascalize(data))`.
+    """
+    if isinstance(data, dict) or isinstance(data, Mapping):
+        return {
+            (snake_key(k) if isinstance(k, str) else k): (
+                v if isinstance(v, (str, int, float, bool)) else snake_keys(v)
+            )
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [snake_keys(v) for v in data]
+    return data
+
+
+def pascal_keys(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert the top-level keys of a dict (e.g., API request kwargs) to PascalCase"""
+    return {pascal_key(k): v for k, v in data.items()}
+
+
+def cache_info() -> dict[str, Any]:
+    """Return hit and miss statistics for the key caches"""
+    return {
+        "snake_key": snake_key.cache_info()._asdict(),
+        "pascal_key": pascal_key.cache_info()._asdict(),
+    }
@@ -2,16 +2,29 @@
 
 import json
 import logging
+from types import ModuleType
 from typing import Any
 
-from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
-
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
+def _dynamodb_types() -> ModuleType:
+    """
+    Import boto3's DynamoDB types module. Imported on use so the models (e.g., for
+    parsing Lambda events) work without boto3.
+    """
+    try:
+        from boto3.dynamodb import types
+    except ImportError as exc:
+        raise ImportError(
+            "Serializing DynamoDB items requires the boto3 library: pip install boto3"
+        ) from exc
+    return types
+
+
 def deserialize_dynamodb_item(item: dict[str, Any]) -> dict[str, Any]:
     """Convert a DynamoDB Item to a dict"""
-    deserializer = TypeDeserializer()
+    deserializer = _dynamodb_types().TypeDeserializer()
     return {key: deserializer.deserialize(value) for key, value in item.items()}
 
 
@@ -22,7 +35,7 @@ def deserialize_dynamodb_items(items: list[dict[str, Any]]) -> list[dict[str, An
 
 def serialize_dynamodb_item(item: dict[str, Any]) -> dict[str, Any]:
     """Convert a dict to a DynamoDB Item"""
-    serializer = TypeSerializer()
+    serializer = _dynamodb_types().TypeSerializer()
     return {key: serializer.serialize(value) for key, value in item.items()}
 
 
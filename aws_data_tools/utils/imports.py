@@ -0,0 +1,38 @@
+"""
+Lazy loading of submodules and attributes for packages (PEP 562), so importing a
+package doesn't import all of its dependencies, like boto3
+"""
+
+import importlib
+from typing import Any, Callable
+
+
+def lazy_loader(
+    package: str,
+    submodules: list[str] = None,
+    attributes: dict[str, str] = None,
+) -> tuple[Callable[[str], Any], Callable[[], list[str]], list[str]]:
+    """
+    Return `__getattr__`, `__dir__`, and `__all__` for a package. Submodules are
+    imported the first time they're accessed as attributes of the package, and
+    `attributes` maps names to the submodule to import them from.
+    """
+    submodules = list(submodules or [])
+    attributes = dict(attributes or {})
+    names = sorted(submodules + list(attributes))
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            return importlib.import_module(f".{name}", package)
+        if name in attributes:
+            module = importlib.import_module(f".{attributes[name]}", package)
+            value = getattr(module, name)
+            # Cache the attribute so __getattr__ isn't called again
+            setattr(importlib.import_module(package), name, value)
+            return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(names))
+
+    return __getattr__, __dir__, names
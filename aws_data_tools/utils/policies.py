@@ -0,0 +1,155 @@
+"""
+Utilities for evaluating AWS Organizations management policies (tag, backup, and AI
+services opt-out policies) without calling the APIs
+
+Management policies are inherited from the root, through each OU, down to accounts.
+Policies attached lower in the tree modify inherited settings with the inheritance
+operators, subject to any child control operators set higher up. See:
+https://docs.aws.amazon.com/organizations/latest/userguide/orgs_manage_policies_inheritance_mgmt.html  # noqa
+"""
+
+from copy import deepcopy
+import json
+import logging
+from typing import Any, Union
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+ASSIGN = "@@assign"
+APPEND = "@@append"
+REMOVE = "@@remove"
+CHILD_CONTROL = "@@operators_allowed_for_child_policies"
+
+_VALUE_OPERATORS = frozenset([ASSIGN, APPEND, REMOVE])
+_ALL = "@@all"
+_NONE = "@@none"
+
+
+class PolicyNode:
+    """A setting in a policy document, along with the state needed for inheritance"""
+
+    __slots__ = ["children", "restriction", "value"]
+
+    def __init__(self):
+        self.children: dict[str, PolicyNode] = {}
+        # Operators that policies at lower levels may use on this node and its
+        # descendants. None means all operators are allowed.
+        self.restriction: Union[frozenset, None] = None
+        self.value: Any = None
+
+    def render(self) -> Any:
+        """Return the effective setting with all operators removed"""
+        if len(self.children) > 0:
+            rendered = {}
+            for key, child in self.children.items():
+                value = child.render()
+                if value is not None:
+                    rendered[key] = value
+            return rendered or None
+        return self.value
+
+
+def parse_child_control(operators: list[str]) -> frozenset:
+    """Convert a list of child control operators to the set of allowed operators"""
+    if isinstance(operators, str):
+        operators = [operators]
+    if _ALL in operators:
+        return _VALUE_OPERATORS
+    if _NONE in operators:
+        return frozenset()
+    return frozenset(operators) & _VALUE_OPERATORS
+
+
+def apply_operator(operator: str, inherited: Any, value: Any) -> Any:
+    """Apply a value-setting operator to an inherited value"""
+    if operator == ASSIGN:
+        return deepcopy(value)
+    values = value if isinstance(value, list) else [value]
+    if operator == APPEND:
+        if inherited is None:
+            return list(values)
+        inherited = inherited if isinstance(inherited, list) else [inherited]
+        return inherited + [v for v in values if v not in inherited]
+    if operator == REMOVE:
+        if isinstance(inherited, list):
+            return [v for v in inherited if v not in values] or None
+        return None if inherited in values else inherited
+    raise ValueError(f"Unsupported inheritance operator {operator}")
+
+
+def merge_policy_document(
+    node: PolicyNode,
+    document: dict[str, Any],
+    restrictions: dict[int, tuple[PolicyNode, frozenset]],
+    allowed: frozenset = _VALUE_OPERATORS,
+) -> None:
+    """
+    Merge a policy document into the inherited state in place. Operators that aren't
+    allowed by a parent's child control operator are ignored. New child control
+    restrictions are collected in `restrictions` so they only take effect for policies
+    at lower levels.
+    """
+    if node.restriction is not None:
+        allowed = allowed & node.restriction
+    for key, value in document.items():
+        if key == CHILD_CONTROL:
+            restrictions[id(node)] = (node, parse_child_control(value))
+        elif key in _VALUE_OPERATORS:
+            if key in allowed:
+                node.value = apply_operator(key, node.value, value)
+                node.children = {}
+        elif isinstance(value, dict):
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = PolicyNode()
+            merge_policy_document(child, value, restrictions, allowed)
+        else:
+            # Plain values without an operator are treated as an assignment
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = PolicyNode()
+            merge_policy_document(child, {ASSIGN: value}, restrictions, allowed)
+
+
+def merge_policy_level(node: PolicyNode, documents: list[dict[str, Any]]) -> None:
+    """
+    Merge all policy documents attached to a single node in the organization tree.
+    Child control operators set at this level apply to the levels below it.
+    """
+    restrictions = {}
+    for document in documents:
+        merge_policy_document(node, document, restrictions)
+    for target, restriction in restrictions.values():
+        if target.restriction is None:
+            target.restriction = restriction
+        else:
+            target.restriction = target.restriction & restriction
+
+
+def evaluate_policies(
+    levels: list[list[Union[str, dict[str, Any]]]], inherited: PolicyNode = None
+) -> PolicyNode:
+    """
+    Evaluate a list of levels of policy documents, ordered from the root down to the
+    target. Each level is a list of the policy documents (dicts or JSON strings)
+    attached to that node. The inherited state is copied, not modified.
+    """
+    node = PolicyNode() if inherited is None else deepcopy(inherited)
+    for level in levels:
+        documents = [
+            json.loads(document) if isinstance(document, str) else document
+            for document in level
+        ]
+        merge_policy_level(node, documents)
+    return node
+
+
+def compute_effective_policy(
+    levels: list[list[Union[str, dict[str, Any]]]],
+) -> Union[dict[str, Any], None]:
+    """
+    Return the effective policy document for a list of levels of policy documents, or
+    None if nothing is in effect
+    """
+    return evaluate_policies(levels).render()
@@ -1,20 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-from humps import depascalize
+from .casing import snake_keys
 
-from ..client import APIClient
+if TYPE_CHECKING:  # pragma: no cover
+    # The client package imports utils, so only import it for type checking
+    from ..client import APIClient
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
+# Default number of concurrent ListTagsForResource lookups for bulk queries
+DEFAULT_MAX_WORKERS = 8
+
+
 def tag_list_to_dict(tags: list[dict[str, str]]) -> dict[str, str]:
     """Convert a list of tag objects to a dict"""
-    return {tag["key"]: tag["value"] for tag in depascalize(tags)}
+    return {tag["key"]: tag["value"] for tag in snake_keys(tags)}
 
 
-def query_tags(client: APIClient, resource_id: str) -> dict[str, str]:
+def query_tags(client: "APIClient", resource_id: str) -> dict[str, str]:
     """Get a dict of tags for a resource"""
-    tags = client.api("list_tags_for_resource", resource_id=resource_id)
-    if len(tags) == 0:
-        return {}
-    return tag_list_to_dict(tags)
+    # Tags only have two keys, so read the raw "Key" and "Value" fields directly
+    # instead of converting the whole response to snake_case
+    return {
+        tag["Key"]: tag["Value"]
+        for page in client.iter_pages("list_tags_for_resource", ResourceId=resource_id)
+        for tag in page.get("Tags", [])
+    }
+
+
+def iter_tags(
+    client: "APIClient",
+    resource_ids: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[tuple[str, dict[str, str]]]:
+    """
+    Query tags for many resources concurrently, yielding (resource_id, tags) tuples as
+    the lookups complete. Duplicate IDs are only queried once. Requests are subject to
+    the client's rate limit, if any.
+    """
+    resource_ids = list(dict.fromkeys(resource_ids))
+    if len(resource_ids) == 0:
+        return
+    if max_workers <= 1 or len(resource_ids) == 1:
+        for resource_id in resource_ids:
+            yield resource_id, query_tags(client, resource_id)
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(resource_ids))) as pool:
+        futures = {
+            pool.submit(query_tags, client, resource_id): resource_id
+            for resource_id in resource_ids
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Don't start queued lookups if the caller stops early or a lookup fails
+            for future in futures:
+                future.cancel()
+
+
+def query_tags_bulk(
+    client: "APIClient",
+    resource_ids: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, dict[str, str]]:
+    """Get a dict of tags for each of a list of resources, keyed by resource ID"""
+    return dict(iter_tags(client, resource_ids, max_workers=max_workers))
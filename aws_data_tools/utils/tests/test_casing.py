@@ -0,0 +1,70 @@
+from humps import decamelize, depascalize
+from moto import mock_aws
+
+from aws_data_tools.client import APIClient
+from aws_data_tools.utils import casing
+from aws_data_tools.utils.casing import pascal_keys, snake_key, snake_keys
+
+RESPONSE = {
+    "Accounts": [
+        {
+            "Id": "111111111111",
+            "Arn": "arn:aws:organizations::111111111111:account/o-abc/111111111111",
+            "JoinedMethod": "CREATED",
+            "Tags": [{"Key": "CostCenter", "Value": "SomeValue"}],
+        }
+    ],
+    "Policy": {
+        "PolicySummary": {"AwsManaged": False, "Name": "FullAWSAccess"},
+        "Content": '{"Version": "2012-10-17", "Statement": []}',
+    },
+    "ARN": "arn:aws:iam::111111111111:role/Reader",
+    "nestedList": [["PascalValue", {"InnerKey": 1}]],
+    "Count": 3,
+}
+
+
+def test_snake_keys_matches_humps():
+    assert snake_keys(RESPONSE) == decamelize(depascalize(RESPONSE))
+
+
+def test_snake_keys_leaves_values_untouched():
+    data = snake_keys(RESPONSE)
+    assert data["accounts"][0]["tags"][0] == {"key": "CostCenter", "value": "SomeValue"}
+    assert data["accounts"][0]["joined_method"] == "CREATED"
+    assert data["nested_list"][0][0] == "PascalValue"
+    assert data["policy"]["content"] == RESPONSE["Policy"]["Content"]
+
+
+def test_snake_key_is_idempotent():
+    for key in ["PolicySummary", "policy_summary", "ARN", "awsManaged"]:
+        assert snake_key(snake_key(key)) == snake_key(key)
+
+
+def test_pascal_keys():
+    assert pascal_keys({"policy_id": "p-1", "MaxResults": 20}) == {
+        "PolicyId": "p-1",
+        "MaxResults": 20,
+    }
+
+
+def test_key_conversions_are_cached():
+    snake_key.cache_clear()
+    snake_keys(RESPONSE)
+    misses = casing.cache_info()["snake_key"]["misses"]
+    snake_keys(RESPONSE)
+    info = casing.cache_info()["snake_key"]
+    assert info["misses"] == misses
+    assert info["hits"] >= misses
+    assert info["currsize"] <= casing.KEY_CACHE_SIZE
+
+
+@mock_aws
+def test_raw_api(aws_credentials):
+    client = APIClient("organizations")
+    client.api("create_organization", feature_set="ALL")
+    raw = client.raw_api("list_roots")
+    assert "PolicyTypes" in raw[0]
+    assert client.api("list_roots") == snake_keys(raw)
+    org = client.raw_api("describe_organization")
+    assert "MasterAccountId" in org["Organization"]
@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from aws_data_tools.utils.imports import lazy_loader
+
+# Modules that must not be imported until they're needed
+DEFERRED_MODULES = ["boto3", "botocore", "click_completion", "graphviz", "yaml"]
+
+IMPORT = """
+import json
+import sys
+import {module}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def imported_modules(module: str) -> list[str]:
+    """Import a module in a fresh interpreter, returning its sys.modules"""
+    proc = subprocess.run(
+        [sys.executable, "-c", IMPORT.format(module=module)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(proc.stdout)
+
+
+@pytest.mark.parametrize(
+    "module,deferred",
+    [
+        ("aws_data_tools", DEFERRED_MODULES),
+        ("aws_data_tools.models.organizations", DEFERRED_MODULES),
+        ("aws_data_tools.models.sqs", DEFERRED_MODULES),
+        # The CLI catches botocore exceptions, but doesn't need a client to start
+        ("aws_data_tools.cli", [m for m in DEFERRED_MODULES if m != "botocore"]),
+    ],
+)
+def test_import_is_lazy(module, deferred):
+    # Import time is measured by benchmarks/importtime.py
+    loaded = {name.split(".")[0] for name in imported_modules(module)}
+    assert loaded.isdisjoint(deferred)
+
+
+def test_lazy_package_attributes():
+    import aws_data_tools.client
+    import aws_data_tools.utils
+
+    assert "casing" in dir(aws_data_tools.utils)
+    assert aws_data_tools.utils.casing.snake_key("KeyName") == "key_name"
+    api_client = aws_data_tools.client.APIClient
+    assert aws_data_tools.client.__dict__["APIClient"] is api_client
+    with pytest.raises(AttributeError):
+        aws_data_tools.utils.missing
+
+
+def test_lazy_loader_attributes():
+    getattr_, dir_, names = lazy_loader(
+        "aws_data_tools.utils", submodules=["tags"], attributes={"snake_key": "casing"}
+    )
+    assert names == ["snake_key", "tags"]
+    assert getattr_("snake_key")("SomeKey") == "some_key"
+    assert "snake_key" in dir_()
@@ -0,0 +1,119 @@
+import pytest
+
+from aws_data_tools.utils.policies import (
+    apply_operator,
+    compute_effective_policy,
+    evaluate_policies,
+    parse_child_control,
+)
+
+ROOT_TAGS = {
+    "tags": {
+        "costcenter": {
+            "tag_key": {"@@assign": "CostCenter"},
+            "tag_value": {"@@assign": ["100", "200"]},
+            "enforced_for": {"@@assign": ["ec2:instance"]},
+        }
+    }
+}
+
+
+@pytest.mark.parametrize(
+    "operator,inherited,value,expected",
+    [
+        ("@@assign", ["a"], ["b"], ["b"]),
+        ("@@append", ["a"], ["b", "a"], ["a", "b"]),
+        ("@@append", None, "a", ["a"]),
+        ("@@remove", ["a", "b"], "a", ["b"]),
+        ("@@remove", ["a"], ["a"], None),
+        ("@@remove", "a", "a", None),
+    ],
+)
+def test_apply_operator(operator, inherited, value, expected):
+    assert apply_operator(operator, inherited, value) == expected
+
+
+@pytest.mark.parametrize(
+    "operators,expected",
+    [
+        (["@@all"], {"@@assign", "@@append", "@@remove"}),
+        (["@@none"], set()),
+        (["@@append", "@@remove"], {"@@append", "@@remove"}),
+    ],
+)
+def test_parse_child_control(operators, expected):
+    assert parse_child_control(operators) == expected
+
+
+def test_inheritance_operators():
+    ou_tags = {
+        "tags": {
+            "costcenter": {
+                "tag_value": {"@@append": ["300"]},
+                "enforced_for": {"@@remove": ["ec2:instance"]},
+            },
+            "team": {"tag_key": {"@@assign": "Team"}},
+        }
+    }
+    assert compute_effective_policy([[ROOT_TAGS], [ou_tags]]) == {
+        "tags": {
+            "costcenter": {
+                "tag_key": "CostCenter",
+                "tag_value": ["100", "200", "300"],
+            },
+            "team": {"tag_key": "Team"},
+        }
+    }
+
+
+def test_child_control_restricts_lower_levels():
+    root = {
+        "tags": {
+            "costcenter": {
+                "tag_key": {
+                    "@@operators_allowed_for_child_policies": ["@@none"],
+                    "@@assign": "CostCenter",
+                },
+                "tag_value": {
+                    "@@operators_allowed_for_child_policies": ["@@append"],
+                    "@@assign": ["100"],
+                },
+            }
+        }
+    }
+    child = {
+        "tags": {
+            "costcenter": {
+                "tag_key": {"@@assign": "costcenter"},
+                "tag_value": {"@@append": ["200"], "@@remove": ["100"]},
+            }
+        }
+    }
+    assert compute_effective_policy([[root], [child]]) == {
+        "tags": {"costcenter": {"tag_key": "CostCenter", "tag_value": ["100", "200"]}}
+    }
+
+
+def test_child_control_applies_below_its_own_level():
+    restricting = {
+        "tags": {
+            "@@operators_allowed_for_child_policies": ["@@none"],
+            "team": {"tag_key": {"@@assign": "Team"}},
+        }
+    }
+    same_level = {"tags": {"owner": {"tag_key": {"@@assign": "Owner"}}}}
+    lower_level = {"tags": {"project": {"tag_key": {"@@assign": "Project"}}}}
+    assert compute_effective_policy([[restricting, same_level], [lower_level]]) == {
+        "tags": {"team": {"tag_key": "Team"}, "owner": {"tag_key": "Owner"}}
+    }
+
+
+def test_evaluate_policies_copies_inherited_state():
+    inherited = evaluate_policies([['{"a": {"@@assign": "x"}}']])
+    child = evaluate_policies([[{"a": {"@@assign": "y"}}]], inherited)
+    assert inherited.render() == {"a": "x"}
+    assert child.render() == {"a": "y"}
+
+
+def test_no_policies():
+    assert compute_effective_policy([[], []]) is None
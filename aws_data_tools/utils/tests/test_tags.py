@@ -1,9 +1,17 @@
+import threading
+from unittest import mock
+
 from moto import mock_aws
 import pytest
 
 
 from aws_data_tools.client import APIClient
-from aws_data_tools.utils.tags import query_tags, tag_list_to_dict
+from aws_data_tools.utils.tags import (
+    iter_tags,
+    query_tags,
+    query_tags_bulk,
+    tag_list_to_dict,
+)
 
 
 @pytest.fixture()
@@ -54,3 +62,45 @@ def test_tag_list_to_dict(tag_list_map, expected_tags_map, tags_type):
     expected_tags = expected_tags_map[tags_type]
     tags = tag_list_to_dict(tag_list)
     assert tags == expected_tags
+
+
+@mock_aws
+def test_query_tags_bulk(aws_credentials, tag_list_map, expected_tags_map):
+    client = APIClient("organizations")
+    _ = client.api("create_organization", feature_set="ALL")
+    account_ids = []
+    for i, tags_type in enumerate(["empty", "not_empty", "not_empty"]):
+        account = client.api(
+            "create_account",
+            account_name=f"TestAccount{i}",
+            email=f"example{i}@example.com",
+            tags=tag_list_map[tags_type],
+        ).get("create_account_status")
+        account_ids.append(account["account_id"])
+    resource_ids = account_ids + account_ids[:1]
+    with mock.patch(
+        "aws_data_tools.utils.tags.query_tags", wraps=query_tags
+    ) as wrapped:
+        tags = query_tags_bulk(client=client, resource_ids=resource_ids, max_workers=2)
+    assert wrapped.call_count == len(account_ids)
+    assert tags == {
+        account_ids[0]: expected_tags_map["empty"],
+        account_ids[1]: expected_tags_map["not_empty"],
+        account_ids[2]: expected_tags_map["not_empty"],
+    }
+    assert query_tags_bulk(client=client, resource_ids=[]) == {}
+
+
+def test_iter_tags_yields_as_completed():
+    release = threading.Event()
+
+    def fake_query_tags(client, resource_id):
+        if resource_id == "slow":
+            release.wait(timeout=5)
+        return {"Id": resource_id}
+
+    with mock.patch("aws_data_tools.utils.tags.query_tags", fake_query_tags):
+        results = iter_tags(client=None, resource_ids=["slow", "fast"], max_workers=2)
+        assert next(results) == ("fast", {"Id": "fast"})
+        release.set()
+        assert next(results) == ("slow", {"Id": "slow"})
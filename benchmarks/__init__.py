@@ -0,0 +1,5 @@
+"""
+Benchmarks for aws_data_tools. Run from the repository root, e.g.:
+
+    python -m benchmarks.memory
+"""
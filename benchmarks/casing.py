@@ -0,0 +1,56 @@
+"""
+Compare converting the keys of synthetic API response pages to snake_case with humps
+and with the memoized single-pass conversion in utils.casing
+"""
+
+import argparse
+import timeit
+
+from humps import decamelize, depascalize
+
+from aws_data_tools.utils.casing import snake_keys
+
+
+def account_page(size: int, offset: int = 0) -> dict:
+    """Return a synthetic ListAccounts page"""
+    return {
+        "Accounts": [
+            {
+                "Id": f"{offset + i:012d}",
+                "Arn": f"arn:aws:organizations::000000000000:account/o-x/{i:012d}",
+                "Email": f"account-{offset + i}@example.com",
+                "Name": f"account-{offset + i}",
+                "Status": "ACTIVE",
+                "JoinedMethod": "CREATED",
+                "Tags": [{"Key": "CostCenter", "Value": f"cc-{i % 10}"}],
+            }
+            for i in range(size)
+        ],
+        "NextToken": "token",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [
+        account_page(args.page_size, i * args.page_size) for i in range(args.pages)
+    ]
+    assert [snake_keys(p) for p in pages] == [decamelize(depascalize(p)) for p in pages]
+
+    timings = {
+        "humps": lambda: [decamelize(depascalize(p)) for p in pages],
+        "utils.casing": lambda: [snake_keys(p) for p in pages],
+    }
+    n_accounts = args.pages * args.page_size
+    for name, func in timings.items():
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<14} {seconds * 1000:8.1f} ms ({n_accounts} accounts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Record a crawl of a moto organization to a cassette, then replay it offline with
+simulated latency and throttling, and compare the spread of crawl times with crawls
+against moto
+
+    python -m benchmarks.cassette [--ous 20] [--accounts 100] [--latency 0.02]
+        [--rate-limit 40] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from aws_data_tools.client import APIClient, Cassette, ReplayProfile
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+from .phases import SlowAPIClient, seed
+
+
+def crawl(client: APIClient) -> float:
+    start = time.perf_counter()
+    OrganizationDataBuilder(client=client, include_account_parents=True, init_all=True)
+    return time.perf_counter() - start
+
+
+def summary(name: str, times: list[float]) -> None:
+    print(
+        f"{name:<34}: mean {statistics.mean(times):5.2f} s, "
+        f"min {min(times):5.2f} s, max {max(times):5.2f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ous", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, default=40)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    path = os.path.join(tempfile.mkdtemp(), "organization.json.gz")
+    with mock_aws():
+        seed(SlowAPIClient("organizations"), args.ous, args.accounts)
+        with Cassette.record(path) as cassette:
+            summary("record", [crawl(APIClient("organizations", cassette=cassette))])
+        client = SlowAPIClient("organizations")
+        client.latency = args.latency
+        summary(
+            f"moto, {args.latency * 1000:.0f} ms latency",
+            [crawl(client) for _ in range(args.runs)],
+        )
+    print(f"cassette: {len(cassette)} calls, {os.path.getsize(path)} bytes")
+
+    profiles = [
+        ("replay", ReplayProfile(), None),
+        (
+            f"replay, {args.latency * 1000:.0f} ms latency",
+            ReplayProfile(latency=args.latency),
+            None,
+        ),
+    ]
+    # The simulated service throttles above the rate limit, with a burst allowance
+    throttled = ReplayProfile(
+        latency=args.latency, rate_limit=args.rate_limit, rate_limit_burst=10, seed=0
+    )
+    profiles += [
+        (f"replay, throttled at {args.rate_limit:g}/s", throttled, None),
+        ("  with a client rate limit", throttled, args.rate_limit),
+    ]
+    for name, profile, rate_limit in profiles:
+        times = []
+        throttled_attempts = 0
+        try:
+            for _ in range(args.runs):
+                cassette = Cassette.replay(path, profile)
+                client = APIClient(
+                    "organizations",
+                    cassette=cassette,
+                    rate_limit=rate_limit,
+                    rate_limit_burst=profile.rate_limit_burst,
+                )
+                times.append(crawl(client))
+                throttled_attempts += sum(
+                    s["throttled"] for s in cassette.stats().values()
+                )
+        except ClientError as exc:
+            print(f"{name:<34}: failed, {exc}")
+            continue
+        summary(name, times)
+        if profile.rate_limit is not None:
+            print(f"{'':<34}  {throttled_attempts / args.runs:.0f} throttled attempts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Measure the time to render an organization with 10k accounts as a GraphViz DOT diagram
+
+    python -m benchmarks.dot [--accounts 10000] [--repeat 5]
+"""
+
+import argparse
+import io
+import timeit
+
+from .synthetic import synthetic_organization
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    org = synthetic_organization(accounts=args.accounts)
+    ou_id = org.organizational_units[0].id
+
+    def to_dot():
+        org.to_dot()
+
+    def write_dot():
+        org.write_dot(io.StringIO())
+
+    def subtree():
+        org.to_dot(root_id=ou_id)
+
+    n_nodes = 1 + len(org.organizational_units) + len(org.accounts)
+    print(f"nodes: {n_nodes}")
+    for name, func in [
+        ("to_dot", to_dot),
+        ("write_dot", write_dot),
+        ("subtree", subtree),
+    ]:
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<10} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
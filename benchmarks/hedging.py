@@ -0,0 +1,100 @@
+"""
+Compare ListTagsForResource latency with and without hedged requests, against a local
+fake Organizations endpoint that answers most requests quickly and stalls a few
+
+    python -m benchmarks.hedging [--calls 1000] [--workers 8] [--stall-rate 0.02]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import random
+from threading import Lock, Thread
+import time
+
+from botocore.config import Config
+
+from aws_data_tools.client import APIClient, HedgingPolicy
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    """Answers each request after a short latency, or a long one for a few requests"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            stalled = self.server.random.random() < self.server.stall_rate
+        time.sleep(self.server.stall if stalled else self.server.latency)
+        body = json.dumps({"Tags": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def percentile(latencies: list[float], p: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--stall", type=float, default=1.0)
+    parser.add_argument("--stall-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyHandler)
+    server.daemon_threads = True
+    server.lock = Lock()
+    server.latency = args.latency
+    server.stall = args.stall
+    server.stall_rate = args.stall_rate
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    for hedging in [None, HedgingPolicy()]:
+        server.random = random.Random(0)
+        client = APIClient(
+            "organizations",
+            client_kwargs={
+                "endpoint_url": f"http://127.0.0.1:{server.server_port}",
+                "region_name": "us-east-1",
+                "config": Config(max_pool_connections=4 * args.workers),
+            },
+            hedging=hedging,
+        )
+
+        def call(i: int) -> float:
+            start = time.perf_counter()
+            client.api("list_tags_for_resource", resource_id=f"{i:012d}")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            latencies = list(pool.map(call, range(args.calls)))
+        elapsed = time.perf_counter() - start
+        hedged = ""
+        if hedging is not None:
+            stats = hedging.stats()["list_tags_for_resource"]
+            hedged = f", {stats['hedged']} hedged, {stats['hedge_won']} won"
+        print(
+            f"hedging={hedging is not None!s:<5}: {elapsed:5.2f} s, "
+            f"p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms{hedged}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Measure the cumulative import time of aws-data-tools modules in fresh interpreters with
+`python -X importtime`, and whether they import boto3
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULES = [
+    "aws_data_tools",
+    "aws_data_tools.models.sqs",
+    "aws_data_tools.models.organizations",
+    "aws_data_tools.cli",
+]
+
+
+def import_time(module: str) -> tuple[float, bool]:
+    """
+    Return the cumulative import time of a module in milliseconds, and whether boto3
+    was imported with it
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    cumulative, boto3 = None, False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if name.strip() == "boto3":
+            boto3 = True
+        if name.strip() == module:
+            cumulative = int(total) / 1000
+    return cumulative, boto3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        results = [import_time(module) for _ in range(args.repeat)]
+        ms = min(result[0] for result in results)
+        boto3 = "imports boto3" if results[0][1] else ""
+        print(f"{module:<38} {ms:8.1f} ms {boto3}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure the init duration and memory of a minimal Lambda handler that parses SQS
+events with the event models, in a fresh interpreter. Pass `--path` to measure another
+checkout of the repository, e.g., an older version.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HANDLER = """
+import json
+import resource
+import time
+
+baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+
+from aws_data_tools.models.sqs import SqsMessage
+
+
+def handler(event, context):
+    return [SqsMessage.from_dict(record).message_id for record in event["Records"]]
+
+
+init_ms = (time.perf_counter() - start) * 1000
+event = {{"Records": [{record} for _ in range({records})]}}
+start = time.perf_counter()
+handler(event, None)
+invoke_ms = (time.perf_counter() - start) * 1000
+max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "init_ms": init_ms,
+    "invoke_ms": invoke_ms,
+    "rss_mib": (max_rss_kib - baseline_kib) / 1024,
+    "boto3": "boto3" in sys.modules,
+}}))
+"""
+
+RECORD = {
+    "messageId": "19dd0b57-b21e-4ac1-bd88-01bbb068cb78",
+    "receiptHandle": "MessageReceiptHandle",
+    "body": "Hello from SQS!",
+    "attributes": {
+        "ApproximateReceiveCount": "1",
+        "SentTimestamp": "1523232000000",
+        "SenderId": "123456789012",
+        "ApproximateFirstReceiveTimestamp": "1523232000001",
+    },
+    "messageAttributes": {},
+    "md5OfBody": "7b270e59b47ff90a553787216d55d91d",
+    "eventSource": "aws:sqs",
+    "eventSourceARN": "arn:aws:sqs:us-east-1:123456789012:MyQueue",
+    "awsRegion": "us-east-1",
+}
+
+
+def run_handler(path: str, records: int) -> dict:
+    """Run the handler in a fresh interpreter with the package imported from `path`"""
+    env = dict(os.environ, PYTHONPATH=path)
+    script = "import sys\n" + HANDLER.format(record=repr(RECORD), records=records)
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        # Run from the checkout, since `-c` puts the working directory first on the path
+        cwd=path,
+        env=env,
+        text=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=os.getcwd())
+    parser.add_argument("--records", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_handler(args.path, args.records) for _ in range(args.repeat)]
+    init_ms = min(result["init_ms"] for result in results)
+    invoke_ms = min(result["invoke_ms"] for result in results)
+    rss_mib = min(result["rss_mib"] for result in results)
+    print(f"init    {init_ms:8.1f} ms")
+    print(f"invoke  {invoke_ms:8.1f} ms ({args.records} records)")
+    print(f"memory  {rss_mib:8.1f} MiB (max RSS growth)")
+    print(f"boto3   {'imported' if results[0]['boto3'] else 'not imported'}")
+
+
+if __name__ == "__main__":
+    main()
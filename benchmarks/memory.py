@@ -0,0 +1,43 @@
+"""
+Measure the memory used by an organization model with 10k accounts
+
+    python -m benchmarks.memory [--accounts 10000] [--no-compact]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from .synthetic import build_organization, generate_api_data
+
+
+def measure(accounts: int, compact: bool = True) -> int:
+    """Return the bytes allocated by an organization model"""
+    data = generate_api_data(accounts=accounts)
+    gc.collect()
+    tracemalloc.start()
+    org = build_organization(data)
+    # Organization.compact() doesn't exist in older versions
+    if compact and hasattr(org, "compact"):
+        org.compact()
+    del data
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del org
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--no-compact", action="store_true")
+    args = parser.parse_args()
+    used = measure(args.accounts, compact=not args.no_compact)
+    print(f"accounts: {args.accounts}")
+    print(f"total: {used / 1024 / 1024:.1f} MiB")
+    print(f"per account: {used / args.accounts:.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare fetch_all() running its phases one at a time and concurrently, against a moto
+organization with a fixed latency added to each API request
+
+    python -m benchmarks.phases [--ous 20] [--accounts 100] [--latency 0.02]
+"""
+
+import argparse
+import os
+import time
+
+from moto import mock_aws
+
+from aws_data_tools.client import APIClient
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+from aws_data_tools.models.phases import critical_path
+
+
+class SlowAPIClient(APIClient):
+    """An APIClient that sleeps before each request"""
+
+    latency: float = 0.0
+
+    def iter_pages(self, func: str, **kwargs):
+        for page in super().iter_pages(func, **kwargs):
+            time.sleep(self.latency)
+            yield page
+
+
+def seed(client: APIClient, ous: int, accounts: int) -> None:
+    """Create an organization with OUs under the root and accounts spread across them"""
+    client.api("create_organization", feature_set="ALL")
+    root_id = client.api("list_roots")[0]["id"]
+    client.api("enable_policy_type", root_id=root_id, policy_type="TAG_POLICY")
+    ou_ids = [
+        client.api("create_organizational_unit", name=f"ou-{i}", parent_id=root_id)[
+            "organizational_unit"
+        ]["id"]
+        for i in range(ous)
+    ]
+    for i in range(accounts):
+        account_id = client.api(
+            "create_account", account_name=f"a-{i}", email=f"a-{i}@example.com"
+        )["create_account_status"]["account_id"]
+        client.api(
+            "move_account",
+            account_id=account_id,
+            destination_parent_id=ou_ids[i % ous],
+            source_parent_id=root_id,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ous", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = SlowAPIClient("organizations")
+        seed(client, args.ous, args.accounts)
+        client.latency = args.latency
+        for parents in [False, True]:
+            for workers in [1, 4]:
+                start = time.perf_counter()
+                odb = OrganizationDataBuilder(
+                    client=client,
+                    include_account_parents=parents,
+                    max_phase_workers=workers,
+                    init_all=True,
+                )
+                elapsed = time.perf_counter() - start
+                path, seconds = critical_path(odb.phases(), odb.phase_timings)
+                print(
+                    f"parents={parents!s:<5} max_phase_workers={workers}: "
+                    f"{elapsed:5.2f} s (critical path {seconds:.2f} s: "
+                    f"{' -> '.join(path)})"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare the runtime a crawl plan estimates with the measured runtime of the crawl, and
+the crawl with the default worker pool and with the pool sized by the plan, against a
+moto organization with a fixed latency added to each API request
+
+    python -m benchmarks.planner [--ous 20] [--accounts 100] [--latency 0.02]
+        [--rate-limit 100]
+"""
+
+import argparse
+import os
+import time
+
+from moto import mock_aws
+
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+
+from .phases import SlowAPIClient, seed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ous", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        seed(SlowAPIClient("organizations"), args.ous, args.accounts)
+        client = SlowAPIClient("organizations", rate_limit=args.rate_limit)
+        client.latency = args.latency
+
+        start = time.perf_counter()
+        plan = OrganizationDataBuilder(
+            client=client, include_account_parents=True
+        ).plan_crawl()
+        print(f"plan: {time.perf_counter() - start:.2f} s")
+        print(plan.format())
+        for workers in [None, plan.recommended_max_workers]:
+            odb = OrganizationDataBuilder(client=client, include_account_parents=True)
+            if workers is not None:
+                odb.max_workers = workers
+            estimate = odb.plan_crawl(organization=None).estimated_seconds
+            start = time.perf_counter()
+            odb.fetch_all()
+            elapsed = time.perf_counter() - start
+            print(
+                f"max_workers={odb.max_workers:<2}: estimated {estimate:5.2f} s, "
+                f"measured {elapsed:5.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare the size of JSON dumps of a synthetic organization with and without deduped
+policy documents, and the memory used by the organizations loaded from them
+
+    python -m benchmarks.policy_documents [--accounts 10000]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from aws_data_tools.models.organizations import Organization
+
+from .synthetic import synthetic_organization
+
+
+def loaded_size(dump: str) -> int:
+    """
+    Return the bytes allocated by an organization loaded from a JSON dump, including
+    strings allocated when parsing it
+    """
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(dump)
+    org = Organization.from_dict(data, convert_keys=False)
+    del data
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del org
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10000)
+    args = parser.parse_args()
+
+    org = synthetic_organization(accounts=args.accounts)
+    for name, dump in [
+        ("to_json()", org.to_json()),
+        ("to_json(dedupe_policies=True)", org.to_json(dedupe_policies=True)),
+    ]:
+        size = len(dump.encode("utf-8")) / 1024 / 1024
+        memory = loaded_size(dump) / 1024 / 1024
+        print(f"{name:<30} {size:8.1f} MiB dump {memory:8.1f} MiB loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare describing policies serially with PolicyLoader, against a fake API with a fixed
+latency per call
+
+    python -m benchmarks.policy_loader [--policies 50] [--latency 0.05]
+"""
+
+import argparse
+import time
+
+from aws_data_tools.models.policy_loader import PolicyContentStore, PolicyLoader
+
+
+def fake_api(latency: float, summaries: dict[str, dict]):
+    """Return a fake API function that sleeps, then describes a policy"""
+
+    def api(func: str, policy_id: str) -> dict:
+        time.sleep(latency)
+        return {"policy": {"policy_summary": summaries[policy_id], "content": "{}"}}
+
+    return api
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--policies", type=int, default=50)
+    parser.add_argument("--aws-managed", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    summaries = [
+        {
+            "arn": f"arn:aws:organizations::aws:policy/p-{i}",
+            "aws_managed": i < args.aws_managed,
+            "id": f"p-{i}",
+            "type": "SERVICE_CONTROL_POLICY",
+        }
+        for i in range(args.policies)
+    ]
+    api = fake_api(args.latency, {s["id"]: s for s in summaries})
+
+    start = time.perf_counter()
+    for summary in summaries:
+        api("describe_policy", policy_id=summary["id"])
+    print(f"{'serial':<26} {time.perf_counter() - start:6.2f} s")
+
+    loader = PolicyLoader(api=api, store=PolicyContentStore())
+    for name in ["PolicyLoader (cold store)", "PolicyLoader (warm store)"]:
+        start = time.perf_counter()
+        loader.load(summaries)
+        print(f"{name:<26} {time.perf_counter() - start:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare concurrent lookups of account ancestors with and without coalescing identical
+calls in flight, against a moto organization with a fixed latency added to each API
+request. Each lookup uses its own NodeLoader, like requests handled by a web service,
+and all of them share one client.
+
+    python -m benchmarks.singleflight [--lookups 64] [--workers 16] [--latency 0.02]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+from moto import mock_aws
+
+from aws_data_tools.models.lazy import NodeLoader
+
+from .phases import SlowAPIClient, seed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ous", type=int, default=4)
+    parser.add_argument("--accounts", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        seed(SlowAPIClient("organizations"), args.ous, args.accounts)
+        account_ids = [
+            a["id"] for a in SlowAPIClient("organizations").api("list_accounts")
+        ]
+        for coalesce in [False, True]:
+            client = SlowAPIClient("organizations", coalesce=coalesce)
+            client.latency = args.latency
+            requests = []
+
+            def lookup(i: int) -> None:
+                loader = NodeLoader(client=client, max_workers=1)
+                loader.client.api("describe_organization")
+                loader.get_ancestors(account_ids[i % len(account_ids)])
+
+            original = client.iter_pages
+
+            def counting_iter_pages(func: str, **kwargs):
+                requests.append(func)
+                return original(func, **kwargs)
+
+            client.iter_pages = counting_iter_pages
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                list(pool.map(lookup, range(args.lookups)))
+            elapsed = time.perf_counter() - start
+            coalesced = sum(s["coalesced"] for s in client.coalescing_stats().values())
+            print(
+                f"coalesce={coalesce!s:<5}: {elapsed:5.2f} s, "
+                f"{len(requests)} requests, {coalesced} calls coalesced"
+            )
+
+
+if __name__ == "__main__":
+    main()
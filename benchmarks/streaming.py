@@ -0,0 +1,65 @@
+"""
+Measure how soon the structure of an organization (root, OUs, and accounts with their
+parents) is available when streaming a crawl, compared to waiting for fetch_all(),
+against a moto organization with a fixed latency added to each API request
+
+    python -m benchmarks.streaming [--ous 20] [--accounts 100] [--latency 0.02]
+        [--rate-limit 40]
+"""
+
+import argparse
+import os
+import time
+
+from moto import mock_aws
+
+from aws_data_tools.models.organizations import OrganizationDataBuilder
+from aws_data_tools.models.streaming import PHASE_COMPLETE
+
+from .phases import SlowAPIClient, seed
+
+STRUCTURE = {"organization", "ous", "accounts"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ous", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        os.environ.setdefault(key, "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        seed(SlowAPIClient("organizations"), args.ous, args.accounts)
+        client = SlowAPIClient("organizations", rate_limit=args.rate_limit)
+        client.latency = args.latency
+
+        start = time.perf_counter()
+        OrganizationDataBuilder(
+            client=client, include_account_parents=True, init_all=True
+        )
+        elapsed = time.perf_counter() - start
+        print(f"fetch_all()                        : structure {elapsed:5.2f} s")
+
+        for strict in [False, True]:
+            odb = OrganizationDataBuilder(client=client, include_account_parents=True)
+            start = time.perf_counter()
+            remaining = set(STRUCTURE)
+            structure = None
+            for event in odb.iter_crawl(strict_priorities=strict):
+                if event.event == PHASE_COMPLETE:
+                    remaining.discard(event.phase)
+                    if structure is None and len(remaining) == 0:
+                        structure = time.perf_counter() - start
+            elapsed = time.perf_counter() - start
+            print(
+                f"iter_crawl(strict_priorities={strict!s:<5}): "
+                f"structure {structure:5.2f} s, complete {elapsed:5.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
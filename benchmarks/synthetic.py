@@ -0,0 +1,158 @@
+"""
+Generate synthetic organization data shaped like Organizations API responses
+"""
+
+import json
+from typing import Any
+
+from aws_data_tools.models.organizations import (
+    Account,
+    EffectivePolicy,
+    Organization,
+    OrganizationalUnit,
+    ParChild,
+    Policy,
+    PolicySummaryForTarget,
+    PolicyTargetSummary,
+    Root,
+)
+
+ORG_ID = "o-exampleorgid"
+ROOT_ID = "r-exmp"
+POLICY_CONTENT = json.dumps(
+    {
+        "tags": {
+            f"tag{i}": {
+                "tag_key": {"@@assign": f"Tag{i}"},
+                "tag_value": {"@@assign": [f"value-{j}" for j in range(10)]},
+                "enforced_for": {"@@assign": ["ec2:instance", "s3:bucket"]},
+            }
+            for i in range(10)
+        }
+    }
+)
+
+
+def generate_api_data(
+    accounts: int = 10000, ous: int = 500, fanout: int = 20
+) -> dict[str, Any]:
+    """
+    Return raw, snake_cased API data for a synthetic organization. The data is passed
+    through a JSON round trip so repeated values are distinct string objects, like
+    they would be when parsed from real API responses.
+    """
+    ou_data = []
+    for i in range(ous):
+        parent_id = ROOT_ID if i < fanout else ou_data[i % fanout]["id"]
+        ou_data.append(
+            {
+                "arn": f"arn:aws:organizations::111111111111:ou/{ORG_ID}/ou-{i}",
+                "id": f"ou-exmp-{i:08d}",
+                "name": f"OU {i}",
+                "parent_id": parent_id,
+            }
+        )
+    account_data = [
+        {
+            "arn": f"arn:aws:organizations::111111111111:account/{ORG_ID}/{i:012d}",
+            "email": f"account-{i}@example.com",
+            "id": f"{i:012d}",
+            "joined_method": "CREATED",
+            "joined_timestamp": "2021-11-23 00:00:00+00:00",
+            "name": f"account-{i}",
+            "status": "ACTIVE",
+            "parent_id": ou_data[i % ous]["id"],
+            "tags": {"Environment": "prod" if i % 2 else "dev", "Team": f"t{i % 40}"},
+        }
+        for i in range(accounts)
+    ]
+    policy_data = [
+        {
+            "policy_summary": {
+                "arn": f"arn:aws:organizations::111111111111:policy/{ORG_ID}/p-{i}",
+                "aws_managed": False,
+                "id": f"p-exmp{i:04d}",
+                "name": f"TagPolicy{i}",
+                "type": "TAG_POLICY",
+            },
+            "content": POLICY_CONTENT,
+        }
+        for i in range(5)
+    ]
+    return json.loads(
+        json.dumps({"ous": ou_data, "accounts": account_data, "policies": policy_data})
+    )
+
+
+def build_organization(data: dict[str, Any]) -> Organization:
+    """
+    Build an organization from raw data the same way OrganizationDataBuilder does,
+    including parents, policy attachments, and effective policies
+    """
+    root = Root(
+        arn=f"arn:aws:organizations::111111111111:root/{ORG_ID}/{ROOT_ID}",
+        id=ROOT_ID,
+        name="Root",
+        policy_types=[],
+    )
+    policies = [Policy.from_dict(p) for p in data["policies"]]
+    for policy in policies:
+        policy.targets = []
+    ous = []
+    for raw in data["ous"]:
+        raw = dict(raw)
+        parent_id = raw.pop("parent_id")
+        ou = OrganizationalUnit.from_dict(raw)
+        parent_type = "ROOT" if parent_id == ROOT_ID else "ORGANIZATIONAL_UNIT"
+        ou.parent = ParChild.from_dict({"id": parent_id, "type": parent_type})
+        ous.append(ou)
+    accounts = []
+    for i, raw in enumerate(data["accounts"]):
+        raw = dict(raw)
+        parent_id = raw.pop("parent_id")
+        tags = raw.pop("tags")
+        account = Account.from_dict(raw)
+        account.parent = ParChild.from_dict(
+            {"id": parent_id, "type": "ORGANIZATIONAL_UNIT"}
+        )
+        account.tags = tags
+        policy = policies[i % len(policies)].policy_summary
+        account.policies = [
+            PolicySummaryForTarget.from_dict({"id": policy.id, "type": policy.type})
+        ]
+        account.effective_policies = [
+            EffectivePolicy.from_dict(
+                {
+                    "last_updated_timestamp": "2021-11-23 00:00:00+00:00",
+                    "policy_content": json.loads(json.dumps(POLICY_CONTENT)),
+                    "policy_type": "TAG_POLICY",
+                    "target_id": account.id,
+                }
+            )
+        ]
+        accounts.append(account)
+        policies[i % len(policies)].targets.append(
+            PolicyTargetSummary.from_dict(
+                {
+                    "arn": account.arn,
+                    "name": account.name,
+                    "target_id": account.id,
+                    "type": "ACCOUNT",
+                }
+            )
+        )
+    org = Organization(
+        arn=f"arn:aws:organizations::111111111111:organization/{ORG_ID}",
+        id=ORG_ID,
+        feature_set="ALL",
+        root=root,
+        organizational_units=ous,
+        accounts=accounts,
+        policies=policies,
+    )
+    return org
+
+
+def synthetic_organization(**kwargs) -> Organization:
+    """Return a synthetic organization model"""
+    return build_organization(generate_api_data(**kwargs))